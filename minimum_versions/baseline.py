@@ -0,0 +1,95 @@
+import json
+from dataclasses import dataclass
+
+from tlz.dicttoolz import keyfilter, merge
+
+from minimum_versions.cache import atomic_write
+
+format_version = 1
+
+
+@dataclass
+class Change:
+    package: str
+    # one of "violation", "bump" or "policy"
+    kind: str
+    before: str
+    after: str
+
+
+def baseline_entries(tables, ignored_violations):
+    # {env: {package: [required, policy, status]}}, from the rows of the bump tables
+    entries = {}
+    for env, rows in tables.items():
+        entries[env] = {}
+        for name, required, _, policy, _, status in rows:
+            if status == ">" and name in ignored_violations:
+                status = "="
+            entries[env][name] = [required, policy, status]
+
+    return entries
+
+
+def load_baseline(path):
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if data.get("version") != format_version:
+        return None
+
+    return data["environments"]
+
+
+def save_baseline(path, previous, entries, environments=()):
+    # previous entries are only kept for the environments of the current run that
+    # weren't evaluated again, e.g. with --changed-since
+    kept = keyfilter(lambda env: env in environments, previous or {})
+    data = {"version": format_version, "environments": merge(kept, entries)}
+
+    atomic_write(path, json.dumps(data, separators=(",", ":"), sort_keys=True))
+
+
+def is_violation(status):
+    return status in (">", "!")
+
+
+def describe(entry):
+    if entry is None:
+        return ""
+
+    required, policy, _ = entry
+    return f"{required or 'unpinned'} (policy {policy})"
+
+
+def package_changes(name, before, after):
+    changes = []
+
+    old_status = before[2] if before is not None else None
+    _, policy, status = after
+    if is_violation(status) and not is_violation(old_status):
+        changes.append(Change(name, "violation", describe(before), describe(after)))
+    if status == "<" and old_status != "<":
+        changes.append(Change(name, "bump", describe(before), describe(after)))
+    # violations and bumps already show the policy before and after
+    if not changes and before is not None and before[1] != policy:
+        changes.append(Change(name, "policy", before[1], policy))
+
+    return changes
+
+
+def diff_baseline(previous, entries):
+    # {env: [Change, ...]}, only for environments with changes
+    changes = {}
+    for env, packages in entries.items():
+        previous_packages = previous.get(env, {})
+        env_changes = [
+            change
+            for name, entry in packages.items()
+            for change in package_changes(name, previous_packages.get(name), entry)
+        ]
+        if env_changes:
+            changes[env] = env_changes
+
+    return changes
@@ -0,0 +1,208 @@
+import difflib
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from minimum_versions.environments import conda, pixi, pypi
+from minimum_versions.versions import comparison_version
+
+_table_re = re.compile(r"^\s*\[(?P<name>[^\[\]]+)\]\s*(?:#.*)?$")
+_string_re = re.compile(r"(?P<quote>[\"'])(?P<text>[^\"']*)(?P=quote)")
+_version_key_re = re.compile(
+    r"(?P<key>version\s*=\s*)(?P<quote>[\"'])(?P<text>[^\"']*)(?P=quote)"
+)
+_conda_pin_re = re.compile(r"^(?P<head>[^=<>!~\s]+\s*[=<>!~]*\s*)(?P<version>[^\s#]+)")
+_pypi_lower_pin_re = re.compile(
+    r"(?P<operator>~=|==|>=|>)?\s*(?P<version>[0-9]+(?:\.[0-9]+)*)(?P<wildcard>\.\*)?"
+)
+
+
+def bump_targets(environments, policy_versions):
+    targets = {}
+    for env, specs in environments.items():
+        env_targets = {}
+        for spec in specs:
+            if spec.version is None:
+                continue
+
+            policy_version = comparison_version(policy_versions[spec.name].version)
+            if spec.version < policy_version:
+                env_targets[spec.name] = policy_version
+
+        targets[env] = env_targets
+
+    return targets
+
+
+def rewrite_conda_environment(text, targets):
+    env = yaml.safe_load(text)
+
+    replacements = {}
+    for dep in env["dependencies"]:
+        if not isinstance(dep, str):
+            continue
+
+        spec, _ = conda.parse_spec(dep)
+        version = targets.get(spec.name.strip())
+        if version is None:
+            continue
+
+        replacements[dep] = _conda_pin_re.sub(
+            lambda m: f"{m.group('head')}{version}", dep, count=1
+        )
+
+    lines = text.splitlines(keepends=True)
+    for dep, new in replacements.items():
+        line_re = re.compile(
+            rf"^(?P<prefix>\s*-\s*(?P<quote>[\"']?)){re.escape(dep)}(?=(?P=quote)\s*(?:#|$))"
+        )
+        lines = [
+            line_re.sub(lambda m: f"{m.group('prefix')}{new}", line) for line in lines
+        ]
+
+    return "".join(lines)
+
+
+def format_pixi_pin(old, version):
+    if "," in old or old.endswith(".*"):
+        return f"{version}.*"
+    elif old.startswith(">="):
+        return f">={version}"
+    else:
+        return str(version)
+
+
+def format_pypi_pin(old, version):
+    # replace the lower bound, keeping the operator and any upper bounds
+    clauses = [clause.strip() for clause in old.split(",")]
+    for index, clause in enumerate(clauses):
+        match = _pypi_lower_pin_re.fullmatch(clause)
+        if match is None or match.group("operator") not in (
+            None,
+            "~=",
+            "==",
+            ">=",
+            ">",
+        ):
+            continue
+
+        operator = match.group("operator") or ""
+        wildcard = match.group("wildcard") or ""
+        clauses[index] = f"{operator}{version}{wildcard}"
+        break
+
+    return ",".join(clauses)
+
+
+pin_formatters = {"dependencies": format_pixi_pin, "pypi-dependencies": format_pypi_pin}
+
+
+def normalize_table_name(name):
+    return tuple(part.strip().strip("\"'") for part in name.split("."))
+
+
+def rewrite_pixi_value(value, version, format_pin=format_pixi_pin):
+    # either a bare string or an inline table with a "version" key
+    if value.lstrip().startswith("{"):
+        regex, group = _version_key_re, "key"
+    else:
+        regex, group = _string_re, None
+
+    def replace(match):
+        prefix = match.group(group) if group is not None else ""
+        quote = match.group("quote")
+        new = format_pin(match.group("text"), version)
+
+        return f"{prefix}{quote}{new}{quote}"
+
+    return regex.sub(replace, value, count=1)
+
+
+def rewrite_pixi_manifest(text, targets, prefix=()):
+    # targets: {(feature, table, name): version}
+    tables = {}
+    for (feature, key, name), version in targets.items():
+        table = (key,) if feature == "default" else ("feature", feature, key)
+        tables.setdefault(prefix + table, {})[name] = (version, pin_formatters[key])
+
+    current = None
+    lines = []
+    for line in text.splitlines(keepends=True):
+        if (match := _table_re.match(line)) is not None:
+            current = normalize_table_name(match.group("name"))
+        elif current in tables:
+            for name, (version, format_pin) in tables[current].items():
+                key_re = re.compile(
+                    rf"^(?P<key>\s*(?P<quote>[\"']?){re.escape(name)}(?P=quote)\s*=\s*)(?P<value>.*)$",
+                    flags=re.DOTALL,
+                )
+                if (match := key_re.match(line)) is not None:
+                    value = rewrite_pixi_value(
+                        match.group("value"), version, format_pin
+                    )
+                    line = f"{match.group('key')}{value}"
+                    break
+
+        lines.append(line)
+
+    return "".join(lines)
+
+
+def pixi_table_prefix(manifest_path):
+    return ("tool", "pixi") if manifest_path.name == "pyproject.toml" else ()
+
+
+def find_pixi_pin(pixi_config, features, name):
+    # the pin of a package comes from the last feature that defines it, and conda
+    # dependencies take precedence over PyPI dependencies
+    for table, normalize in [
+        ("dependencies", str),
+        ("pypi-dependencies", pypi.normalize_name),
+    ]:
+        for feature in reversed(features):
+            pins = pixi.feature_table(pixi_config, feature, table, {})
+            for key in pins:
+                if normalize(key) == name:
+                    return feature, table, key
+
+    return None
+
+
+def pixi_targets(pixi_config, environment_targets):
+    targets = {}
+    for env, env_targets in environment_targets.items():
+        features = pixi.environment_features(pixi_config, env)
+        for name, version in env_targets.items():
+            location = find_pixi_pin(pixi_config, features, name)
+            if location is not None:
+                targets[location] = version
+
+    return targets
+
+
+def rewrite_file(path, rewrite):
+    old = path.read_text()
+    new = rewrite(old)
+
+    diff = "".join(
+        difflib.unified_diff(
+            old.splitlines(keepends=True),
+            new.splitlines(keepends=True),
+            fromfile=f"a/{path}",
+            tofile=f"b/{path}",
+        )
+    )
+    return path, old, new, diff
+
+
+def rewrite_files(rewrites, dry_run=False):
+    with ThreadPoolExecutor() as executor:
+        results = list(executor.map(lambda item: rewrite_file(*item), rewrites.items()))
+
+    if not dry_run:
+        for path, old, new, _ in results:
+            if new != old:
+                path.write_text(new)
+
+    return {path: diff for path, _, _, diff in results}
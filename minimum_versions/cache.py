@@ -0,0 +1,229 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+missing = object()
+
+
+def default_cache_dir():
+    if path := os.environ.get("MINIMUM_VERSIONS_CACHE_DIR"):
+        return pathlib.Path(path)
+
+    base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / "minimum-versions"
+
+
+def atomic_write(path, text):
+    # concurrent writers each use their own temporary file, and readers only ever
+    # see complete files
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode="w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class ReleaseCache:
+    def __init__(self, maxsize=4096, ttl=3600, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=missing):
+        entry = self._data.get(key, missing)
+        if entry is missing:
+            self.stats.misses += 1
+            return default
+
+        value, expires = entry
+        if expires is not None and self.clock() >= expires:
+            del self._data[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+
+        return value
+
+    def put(self, key, value):
+        expires = self.clock() + self.ttl if self.ttl is not None else None
+
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+
+
+def cache_filename(key):
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+
+class SharedCache:
+    # a cache directory that can be shared between concurrent processes
+    def __init__(
+        self,
+        root,
+        encode=lambda value: value,
+        decode=lambda data: data,
+        ttl=3600,
+        max_size=256 * 2**20,
+        clock=time.time,
+    ):
+        if fcntl is None:
+            raise RuntimeError("Shared caches require advisory file locks (fcntl).")
+
+        self.root = pathlib.Path(root)
+        self.encode = encode
+        self.decode = decode
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.stats = CacheStats()
+
+        self._written = 0
+
+    def _entry_path(self, key):
+        return self.root / "entries" / f"{cache_filename(key)}.json"
+
+    def _lock_path(self, key):
+        return self.root / "locks" / f"{cache_filename(key)}.lock"
+
+    def get(self, key, default=missing):
+        path = self._entry_path(key)
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self.stats.misses += 1
+            return default
+
+        if entry["expires"] is not None and self.clock() >= entry["expires"]:
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return default
+
+        # the modification time doubles as the last use for the eviction
+        with contextlib.suppress(OSError):
+            os.utime(path)
+
+        self.stats.hits += 1
+        return self.decode(entry["value"])
+
+    def put(self, key, value):
+        expires = self.clock() + self.ttl if self.ttl is not None else None
+        data = json.dumps({"expires": expires, "value": self.encode(value)})
+
+        atomic_write(self._entry_path(key), data)
+
+        self._written += len(data)
+        if self._written > self.max_size // 16:
+            self.evict()
+
+    def acquire(self, keys):
+        # locks are always taken in the same order, so processes can't deadlock
+        lock_dir = self.root / "locks"
+        lock_dir.mkdir(parents=True, exist_ok=True)
+
+        files = []
+        try:
+            for path in sorted(set(map(self._lock_path, keys))):
+                f = open(path, mode="a")
+                files.append(f)
+                fcntl.flock(f, fcntl.LOCK_EX)
+        except BaseException:
+            self.release(files)
+            raise
+
+        return files
+
+    def release(self, files):
+        for f in reversed(files):
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+    def evict(self):
+        self._written = 0
+
+        lock_dir = self.root / "locks"
+        lock_dir.mkdir(parents=True, exist_ok=True)
+        with open(lock_dir / "evict.lock", mode="a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # another process is already evicting
+                return
+
+            entries = []
+            with contextlib.suppress(FileNotFoundError):
+                for entry in os.scandir(self.root / "entries"):
+                    with contextlib.suppress(FileNotFoundError):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            size = sum(size for _, size, _ in entries)
+            for _, entry_size, path in sorted(entries):
+                if size <= self.max_size:
+                    break
+
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+                size -= entry_size
+                self.stats.evictions += 1
+
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+@contextlib.asynccontextmanager
+async def single_flight(cache, keys):
+    # caches shared between processes lock the keys while they are being fetched
+    acquire = getattr(cache, "acquire", None)
+    if acquire is None:
+        yield False
+        return
+
+    files = await asyncio.to_thread(acquire, list(keys))
+    try:
+        yield True
+    finally:
+        cache.release(files)
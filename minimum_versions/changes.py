@@ -0,0 +1,174 @@
+import hashlib
+import json
+import pathlib
+import subprocess
+import tomllib
+
+import yaml
+from rattler.exceptions import InvalidVersionError
+from tlz.itertoolz import concat
+
+from minimum_versions.cache import atomic_write
+from minimum_versions.environments import split_specifier
+from minimum_versions.formatting import lookup_spec_release
+from minimum_versions.snapshot import decode_release, encode_release
+
+
+def verify_ref(ref):
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise ValueError(f"Unknown git ref: {ref!r}")
+
+
+def git_show(ref, path):
+    path = pathlib.Path(path)
+    # "./" makes the path relative to the working directory of the command
+    result = subprocess.run(
+        ["git", "show", f"{ref}:./{path.name}"],
+        cwd=path.parent,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+
+    return result.stdout
+
+
+def parse_environment_at(ref, specifier, manifest_path):
+    # imported here, so that validating without --changed-since doesn't load every
+    # environment parser
+    from minimum_versions.environments.conda import parse_conda_environment_text
+    from minimum_versions.environments.pixi import (
+        extract_pixi_config,
+        parse_pixi_config_environment,
+    )
+    from minimum_versions.environments.pypi import parse_pyproject_data
+
+    kind, path = split_specifier(specifier)
+
+    source_path = manifest_path if kind == "pixi" else path
+    if source_path is None:
+        return None
+
+    text = git_show(ref, source_path)
+    if text is None:
+        return None
+
+    try:
+        if kind == "conda":
+            return parse_conda_environment_text(text)
+        elif kind == "pixi":
+            pixi_config = extract_pixi_config(tomllib.loads(text), manifest_path)
+            return parse_pixi_config_environment(pixi_config, path)
+        elif kind == "pyproject":
+            return parse_pyproject_data(tomllib.loads(text), path)
+    except (ValueError, KeyError, TypeError, InvalidVersionError, yaml.YAMLError):
+        # the old version can't be parsed, so the environment has to be validated
+        return None
+
+    return None
+
+
+def changed_packages(old, new):
+    old_specs = {spec.name: spec for spec in old[0]}
+    return {spec.name for spec in new[0] if old_specs.get(spec.name) != spec}
+
+
+def specs_digest(parsed):
+    specs, _ = parsed
+    data = json.dumps(
+        [
+            [spec.name, str(spec.version), spec.source, str(spec.timestamp)]
+            for spec in specs
+        ]
+    )
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def find_changes(ref, environment_paths, parsed_environments, manifest_path, previous):
+    # environment_paths: {env name: specifier}, keyed like parsed_environments
+    changes = {}
+    for env, parsed in parsed_environments.items():
+        old = parse_environment_at(ref, environment_paths[env], manifest_path)
+        entry = previous["environments"].get(env)
+
+        # the previous status only applies to the specs it was computed from
+        if old is None or entry is None or entry.get("digest") != specs_digest(parsed):
+            changes[env] = {spec.name for spec in parsed[0]}
+        elif old != parsed:
+            changes[env] = changed_packages(old, parsed)
+
+    return changes
+
+
+def results_key(policy_text):
+    data = json.dumps([policy_text])
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class PreviousResults:
+    # the results of a different day are discarded, and replaced on save
+    def __init__(self, root, key, today):
+        self.path = root / f"{key}.json"
+        self.today = today
+
+    def load(self):
+        empty = {"environments": {}, "packages": {}}
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return empty
+
+        if data.get("date") != self.today.isoformat():
+            return empty
+
+        return data
+
+    def save(self, data):
+        atomic_write(self.path, json.dumps({**data, "date": self.today.isoformat()}))
+
+
+def update_results(previous, result, parsed_environments):
+    release_lookup = {
+        n: {r.version: r for r in releases} for n, releases in result.releases.items()
+    }
+
+    environments = dict(previous["environments"])
+    environments.update(
+        {
+            env: {
+                "status": result.status[env],
+                "digest": specs_digest(parsed_environments[env]),
+            }
+            for env in result.environments
+        }
+    )
+
+    packages = dict(previous["packages"])
+    for spec in concat(result.environments.values()):
+        entry = packages.get(spec.name, {"required": {}})
+        entry = {
+            "policy": encode_release(result.policy_versions[spec.name]),
+            "required": dict(entry["required"]),
+        }
+
+        if spec.version is not None:
+            release = lookup_spec_release(spec, release_lookup)
+            if not isinstance(release.version, str):
+                entry["required"][str(spec.version)] = encode_release(release)
+
+        packages[spec.name] = entry
+
+    return {"environments": environments, "packages": packages}
+
+
+def cached_releases(entry):
+    policy_release = decode_release(entry["policy"])
+    required = sorted(map(decode_release, entry["required"].values()))
+
+    return policy_release, required
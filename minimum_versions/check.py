@@ -0,0 +1,109 @@
+import datetime
+from dataclasses import dataclass
+
+from tlz.dicttoolz import merge
+from tlz.itertoolz import concat, groupby, partition_all, unique
+
+from minimum_versions.environments import Spec
+from minimum_versions.policy import find_policy_versions
+from minimum_versions.release import Release
+from minimum_versions.validation import (
+    drop_unknown_packages,
+    fetch_environment_releases,
+    filter_excluded,
+)
+from minimum_versions.versions import comparison_version, is_newer
+
+
+@dataclass
+class Violation:
+    environment: str
+    spec: Spec
+    policy_release: Release | None = None
+
+
+def check_priority(policy, name):
+    # overrides and long policy windows have the oldest minimum versions, so pins
+    # are more likely to be newer than what the policy allows
+    months = policy.package_months.get(name, policy.default_months)
+
+    return name not in policy.overrides, -months
+
+
+def check_batches(policy, environments, batch_size=8):
+    names = unique(spec.name for spec in concat(environments.values()))
+    groups = groupby(lambda name: check_priority(policy, name), names)
+
+    return [
+        list(batch)
+        for _, group in sorted(groups.items())
+        for batch in partition_all(batch_size, group)
+    ]
+
+
+async def check_environments(
+    policy,
+    parsed_environments,
+    today=None,
+    fetcher=None,
+    pypi_fetcher=None,
+    batch_size=8,
+):
+    environments, _ = filter_excluded(policy, parsed_environments)
+    environments = {
+        env: [spec for spec in specs if spec.name not in policy.ignored_violations]
+        for env, specs in environments.items()
+    }
+
+    # unpinned dependencies are violations that don't need any release data
+    unpinned = [
+        Violation(env, spec)
+        for env, specs in environments.items()
+        for spec in specs
+        if spec.version is None
+    ]
+    if unpinned:
+        return unpinned
+
+    if today is None:
+        today = datetime.date.today()
+
+    for batch in check_batches(policy, environments, batch_size=batch_size):
+        batch_environments = {
+            env: [spec for spec in specs if spec.name in batch]
+            for env, specs in environments.items()
+        }
+        conda_releases, pypi_releases = await fetch_environment_releases(
+            policy, batch_environments, fetcher=fetcher, pypi_fetcher=pypi_fetcher
+        )
+        package_releases = merge(pypi_releases, conda_releases)
+        batch_environments, _ = drop_unknown_packages(
+            batch_environments, package_releases
+        )
+        policy_versions = find_policy_versions(policy, today, package_releases)
+
+        violations = [
+            Violation(env, spec, policy_versions[spec.name])
+            for env, specs in batch_environments.items()
+            for spec in specs
+            if is_newer(
+                spec.version, comparison_version(policy_versions[spec.name].version)
+            )
+        ]
+        if violations:
+            return violations
+
+    return []
+
+
+def format_violation(violation):
+    spec = violation.spec
+    if violation.policy_release is None:
+        return f"{violation.environment}: {spec.name} is not pinned"
+
+    policy_release = violation.policy_release
+    return (
+        f"{violation.environment}: {spec.name}={spec.version} is newer than the"
+        f" policy minimum {comparison_version(policy_release.version)}"
+        f" ({policy_release.timestamp:%Y-%m-%d})"
+    )
@@ -0,0 +1,194 @@
+from collections import deque
+
+from rattler import MatchSpec
+from tlz.functoolz import identity
+from tlz.itertoolz import concat, groupby, unique
+
+from minimum_versions.release import process_records
+from minimum_versions.versions import comparison_version, minor_version
+
+
+def pin_spec(spec):
+    return f"{spec.name}={spec.version}"
+
+
+def conda_specs(specs):
+    # PyPI dependencies are not part of the conda dependency graph
+    return [spec for spec in specs if spec.source == "conda"]
+
+
+class DependencyGraph:
+    def __init__(self, records):
+        records = list(concat(records))
+
+        self.records = {
+            name: groupby(lambda r: r.version, group)
+            for name, group in groupby(lambda r: r.name.normalized, records).items()
+        }
+        self.releases = process_records([records])
+
+        self._matching = {}
+        self._dependencies = {}
+
+    def resolve_spec(self, spec_text):
+        resolved = self._matching.get(spec_text)
+        if resolved is not None:
+            return resolved
+
+        spec = MatchSpec(spec_text)
+        name = spec.name.normalized
+        versions = frozenset(
+            version
+            for version, builds in self.records.get(name, {}).items()
+            if any(spec.matches(build) for build in builds)
+        )
+        self._matching[spec_text] = (name, versions)
+
+        return name, versions
+
+    def matching_versions(self, spec_text):
+        _, versions = self.resolve_spec(spec_text)
+        return versions
+
+    def dependencies(self, name, version):
+        key = (name, version)
+        dependencies = self._dependencies.get(key)
+        if dependencies is not None:
+            return dependencies
+
+        # any build of the version can be selected, so each build is an alternative
+        # and only dependencies shared by all builds constrain the environment
+        per_build = []
+        for build in self.records[name][version]:
+            constraints = {}
+            for dep in build.depends:
+                dep_name, versions = self.resolve_spec(dep)
+                if dep_name in constraints:
+                    versions = constraints[dep_name] & versions
+                constraints[dep_name] = versions
+            per_build.append(constraints)
+
+        common = set.intersection(*(set(c) for c in per_build)) if per_build else set()
+        dependencies = {
+            dep_name: frozenset().union(*(c[dep_name] for c in per_build))
+            for dep_name in common
+        }
+        self._dependencies[key] = dependencies
+
+        return dependencies
+
+
+def resolve_closure(graph, specs, exclude):
+    pinned = {spec.name: spec for spec in specs if spec.version is not None}
+
+    nodes = {}
+    for spec in pinned.values():
+        versions = graph.matching_versions(pin_spec(spec))
+        if versions:
+            nodes[spec.name] = min(versions)
+
+    allowed = {}
+    parents = {}
+    queue = deque(nodes)
+    while queue:
+        name = queue.popleft()
+        for dep, versions in graph.dependencies(name, nodes[name]).items():
+            if dep.startswith("__") or dep in exclude:
+                continue
+
+            allowed[dep] = allowed[dep] & versions if dep in allowed else versions
+            parents.setdefault(dep, []).append((name, nodes[name]))
+
+            if dep in pinned or not allowed[dep]:
+                continue
+
+            # follow the lowest version that is still allowed
+            lowest = min(allowed[dep])
+            if dep not in nodes or nodes[dep] != lowest:
+                nodes[dep] = lowest
+                queue.append(dep)
+
+    return pinned, allowed, parents
+
+
+def format_parents(parents):
+    return ", ".join(unique(f"{name}={version}" for name, version in parents))
+
+
+def closure_warnings(graph, specs, exclude, policy_version):
+    pinned, allowed, parents = resolve_closure(graph, specs, exclude)
+
+    warnings = {}
+    for name, versions in allowed.items():
+        via = format_parents(parents[name])
+
+        if not versions:
+            message = f"no version satisfies the requirements of {via}"
+        elif name in pinned:
+            if versions & graph.matching_versions(pin_spec(pinned[name])):
+                continue
+
+            message = (
+                f"pinned version {pinned[name].version} is not allowed"
+                f" by the dependencies of {via}"
+            )
+        else:
+            policy_release = policy_version(name)
+            if policy_release is None:
+                continue
+
+            policy = comparison_version(policy_release.version)
+            # compare at the granularity of the policy version, like `validate`
+            project = minor_version if len(policy.segments()) == 2 else identity
+            lowest = min(versions)
+            highest = max(versions)
+
+            if project(lowest) > policy:
+                message = (
+                    f"transitive dependency through {via} requires >={lowest},"
+                    f" which is newer than the policy minimum {policy}"
+                )
+            elif project(highest) < policy:
+                message = (
+                    f"transitive dependency through {via} only allows <={highest},"
+                    f" which is older than the policy minimum {policy}"
+                )
+            else:
+                continue
+
+        warnings[name] = [message]
+
+    return warnings
+
+
+async def check_dependency_closure(policy, environments, today, gateway):
+    root_specs = [
+        pin_spec(spec) if spec.version is not None else spec.name
+        for spec in unique(
+            conda_specs(concat(environments.values())),
+            key=lambda s: (s.name, str(s.version)),
+        )
+    ]
+    records = await gateway.query(
+        policy.channels, policy.platforms, root_specs, recursive=True
+    )
+    graph = DependencyGraph(records)
+
+    policy_versions = {}
+
+    def policy_version(name):
+        if name not in policy_versions:
+            releases = graph.releases.get(name)
+            try:
+                policy_versions[name] = (
+                    policy.minimum_version(today, name, releases) if releases else None
+                )
+            except ValueError:
+                policy_versions[name] = None
+
+        return policy_versions[name]
+
+    return {
+        env: closure_warnings(graph, conda_specs(specs), policy.exclude, policy_version)
+        for env, specs in environments.items()
+    }
@@ -1,25 +1,110 @@
 import pathlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import cache
+from importlib.metadata import EntryPoint, entry_points
 
-from minimum_versions.environments.conda import parse_conda_environment
-from minimum_versions.environments.pixi import parse_pixi_environment
-from minimum_versions.environments.spec import Spec, compare_versions  # noqa: F401
+from tlz.itertoolz import groupby, unique
 
+from minimum_versions.environments.spec import (  # noqa: F401
+    Spec,
+    compare_versions,
+    find_violations,
+)
+
+entry_point_group = "minimum_versions.environments"
+
+# parsers are only imported once their kind is used
 kinds = {
-    "conda": parse_conda_environment,
-    "pixi": parse_pixi_environment,
+    "conda": "minimum_versions.environments.conda:parser",
+    "pixi": "minimum_versions.environments.pixi:parser",
+    "pyproject": "minimum_versions.environments.pypi:parser",
+    "pixi-lock": "minimum_versions.environments.lock:pixi_lock_parser",
+    "conda-lock": "minimum_versions.environments.lock:conda_lock_parser",
 }
 
 
-def parse_environment(specifier: str, manifest_path: pathlib.Path | None) -> list[Spec]:
-    split = specifier.split(":", maxsplit=1)
-    if len(split) == 1:
-        kind = "conda"
-        path = specifier
-    else:
-        kind, path = split
+@dataclass(frozen=True)
+class Parser:
+    parse: Callable
+    # parse many environments of the same kind at once, e.g. from a single manifest
+    parse_batch: Callable | None = None
+    # expand patterns like "pixi:*" into the names of the matching environments
+    expand: Callable | None = None
+
+
+@cache
+def load_reference(reference: str):
+    return EntryPoint(name=None, value=reference, group=entry_point_group).load()
+
 
+def find_parser(kind: str, specifier: str) -> Parser:
     parser = kinds.get(kind)
     if parser is None:
-        raise ValueError(f"Unknown kind {kind!r}, extracted from {specifier!r}.")
+        found = entry_points(group=entry_point_group, name=kind)
+        if not found:
+            raise ValueError(f"Unknown kind {kind!r}, extracted from {specifier!r}.")
+
+        parser = next(iter(found)).value
+
+    if isinstance(parser, str):
+        parser = load_reference(parser)
+
+    if not isinstance(parser, Parser):
+        parser = Parser(parse=parser)
+
+    return parser
+
+
+def split_specifier(specifier: str) -> tuple[str, str]:
+    split = specifier.split(":", maxsplit=1)
+    if len(split) == 1:
+        return "conda", specifier
+
+    kind, path = split
+    return kind, path
+
+
+def parse_environment(specifier: str, manifest_path: pathlib.Path | None) -> list[Spec]:
+    kind, path = split_specifier(specifier)
+
+    parser = find_parser(kind, specifier)
+
+    return parser.parse(path, manifest_path)
+
+
+def expand_specifiers(
+    specifiers: list[str], manifest_path: pathlib.Path | None
+) -> list[str]:
+    expanded = []
+    for specifier in specifiers:
+        kind, path = split_specifier(specifier)
+        parser = find_parser(kind, specifier)
+        if parser.expand is None:
+            expanded.append(specifier)
+            continue
+
+        expanded.extend(f"{kind}:{name}" for name in parser.expand(path, manifest_path))
+
+    return list(unique(expanded))
+
+
+def parse_environments(
+    specifiers: list[str], manifest_path: pathlib.Path | None
+) -> list[list[Spec]]:
+    by_kind = groupby(lambda item: split_specifier(item[1])[0], enumerate(specifiers))
+
+    parsed = {}
+    for kind, items in by_kind.items():
+        indices, kind_specifiers = zip(*items)
+        parser = find_parser(kind, kind_specifiers[0])
+
+        paths = [split_specifier(specifier)[1] for specifier in kind_specifiers]
+        if parser.parse_batch is not None:
+            results = parser.parse_batch(paths, manifest_path)
+        else:
+            results = [parser.parse(path, manifest_path) for path in paths]
+
+        parsed.update(zip(indices, results))
 
-    return parser(path, manifest_path)
+    return [parsed[index] for index in range(len(specifiers))]
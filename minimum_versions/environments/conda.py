@@ -1,9 +1,11 @@
 import pathlib
 
 import yaml
-from rattler import Version
+from rattler.exceptions import InvalidVersionError
 
+from minimum_versions.environments import Parser
 from minimum_versions.environments.spec import Spec
+from minimum_versions.versions import parse_version
 
 
 def parse_spec(spec_text):
@@ -18,7 +20,10 @@ def parse_spec(spec_text):
 
     if "=" in spec_text:
         name, version_text = spec_text.split("=", maxsplit=1)
-        version = Version(version_text)
+        try:
+            version = parse_version(version_text)
+        except InvalidVersionError as e:
+            raise ValueError(f"Invalid version in {spec_text!r}: {e}") from None
         segments = version.segments()
 
         if (len(segments) == 3 and segments[2] != [0]) or len(segments) > 3:
@@ -33,7 +38,11 @@ def parse_spec(spec_text):
 
 
 def parse_conda_environment(path: pathlib.Path, manifest_path: None):
-    env = yaml.safe_load(pathlib.Path(path).read_text())
+    return parse_conda_environment_text(pathlib.Path(path).read_text())
+
+
+def parse_conda_environment_text(text: str):
+    env = yaml.safe_load(text)
 
     specs = []
     warnings = []
@@ -44,3 +53,6 @@ def parse_conda_environment(path: pathlib.Path, manifest_path: None):
         warnings.append(warnings_)
 
     return specs, warnings
+
+
+parser = Parser(parse=parse_conda_environment)
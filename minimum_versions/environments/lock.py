@@ -0,0 +1,249 @@
+import datetime
+import pathlib
+from dataclasses import dataclass
+
+import yaml
+from rattler import Version
+
+from minimum_versions.environments import Parser, pypi
+from minimum_versions.environments.conda import parse_conda_environment
+from minimum_versions.environments.pixi import (
+    expand_pixi_environments,
+    load_pixi_config,
+    parse_pixi_config_environment,
+)
+from minimum_versions.environments.spec import Spec
+from minimum_versions.versions import minor_version, parse_version
+
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+conda_extensions = (".conda", ".tar.bz2")
+
+
+@dataclass(frozen=True)
+class LockedPackage:
+    name: str
+    version: Version
+    source: str
+    timestamp: datetime.datetime | None = None
+
+
+def build_value(event, events):
+    # scalars are kept as strings, the lock parsers convert the few values they need
+    if isinstance(event, yaml.ScalarEvent):
+        return event.value
+    elif isinstance(event, yaml.SequenceStartEvent):
+        items = []
+        for item_event in events:
+            if isinstance(item_event, yaml.SequenceEndEvent):
+                return items
+            items.append(build_value(item_event, events))
+    elif isinstance(event, yaml.MappingStartEvent):
+        mapping = {}
+        for key_event in events:
+            if isinstance(key_event, yaml.MappingEndEvent):
+                return mapping
+            key = build_value(key_event, events)
+            mapping[key] = build_value(next(events), events)
+    else:
+        raise ValueError(f"Unsupported yaml construct in lock file: {event}")
+
+
+def iter_lock_entries(path):
+    # yields (key, value) for each top-level key, and (key, item) for each item of
+    # top-level lists, so the package lists are never held in memory as a whole
+    with open(path, mode="rb") as f:
+        events = yaml.parse(f, Loader=Loader)
+
+        # skip the start of the stream and of the document
+        next(events)
+        next(events)
+        if not isinstance(next(events), yaml.MappingStartEvent):
+            raise ValueError(f"{path} is not a valid lock file.")
+
+        for event in events:
+            if isinstance(event, yaml.MappingEndEvent):
+                return
+
+            key = build_value(event, events)
+            value_event = next(events)
+            if isinstance(value_event, yaml.SequenceStartEvent):
+                for item_event in events:
+                    if isinstance(item_event, yaml.SequenceEndEvent):
+                        break
+                    yield key, build_value(item_event, events)
+            else:
+                yield key, build_value(value_event, events)
+
+
+def parse_lock_timestamp(value):
+    if value is None:
+        return None
+
+    timestamp = int(value)
+    # conda timestamps are in milliseconds, except for some very old packages
+    if timestamp > 253402300799:
+        timestamp /= 1000
+
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.UTC)
+
+
+def conda_filename_info(url):
+    filename = url.rsplit("/", maxsplit=1)[-1]
+    for extension in conda_extensions:
+        if filename.endswith(extension):
+            name, version, _ = filename.removesuffix(extension).rsplit("-", maxsplit=2)
+            return name, version
+
+    raise ValueError(f"Can't extract the package name from {url!r}.")
+
+
+def locked_specs(names, locked):
+    # locked: {name: [LockedPackage, ...]}, one per platform
+    specs = []
+    warnings = []
+    for name, source in names:
+        packages = locked.get(name)
+        if not packages:
+            specs.append(Spec(name, None, source=source))
+            warnings.append((name, ["package is missing from the lock file"]))
+            continue
+
+        package = max(packages, key=lambda p: p.version)
+        package_warnings = []
+        if len({p.version for p in packages}) > 1:
+            package_warnings.append(
+                "package is locked to different versions on different platforms."
+                f" Using the newest ({package.version})."
+            )
+
+        version = minor_version(package.version)
+        specs.append(
+            Spec(name, version, source=package.source, timestamp=package.timestamp)
+        )
+        warnings.append((name, package_warnings))
+
+    return specs, warnings
+
+
+def pixi_lock_package(entry):
+    if "conda" in entry or entry.get("kind") == "conda":
+        url = entry.get("conda", entry.get("url"))
+        name, version = conda_filename_info(url)
+        return url, LockedPackage(
+            name=entry.get("name", name),
+            version=parse_version(entry.get("version", version)),
+            source="conda",
+            timestamp=parse_lock_timestamp(entry.get("timestamp")),
+        )
+    else:
+        url = entry.get("pypi", entry.get("url"))
+        return url, LockedPackage(
+            name=pypi.normalize_name(entry["name"]),
+            version=parse_version(entry["version"]),
+            source="pypi",
+        )
+
+
+def parse_pixi_lock_environments(names: list[str], manifest_path: pathlib.Path | None):
+    if manifest_path is None:
+        raise ValueError("--manifest-path is required for pixi lock environments.")
+
+    pixi_config = load_pixi_config(manifest_path)
+    feature_cache = {}
+    wanted = {}
+    for env in names:
+        specs, _ = parse_pixi_config_environment(pixi_config, env, feature_cache)
+        wanted[env] = [(spec.name, spec.source) for spec in specs]
+
+    wanted_names = {name for env_names in wanted.values() for name, _ in env_names}
+
+    environment_urls = {}
+    packages = {}
+    for key, value in iter_lock_entries(manifest_path.parent / "pixi.lock"):
+        if key == "environments":
+            environment_urls = {
+                env: {
+                    entry.get("conda", entry.get("pypi"))
+                    for platform_entries in value[env].get("packages", {}).values()
+                    for entry in platform_entries
+                }
+                for env in names
+                if env in value
+            }
+        elif key == "packages":
+            url, package = pixi_lock_package(value)
+            if package.name in wanted_names:
+                packages[url] = package
+
+    results = []
+    for env in names:
+        if env not in environment_urls:
+            raise ValueError(f"Environment {env!r} is missing from the lock file.")
+
+        locked = {}
+        for url in environment_urls[env]:
+            if (package := packages.get(url)) is not None:
+                locked.setdefault(package.name, []).append(package)
+
+        results.append(locked_specs(wanted[env], locked))
+
+    return results
+
+
+def parse_pixi_lock_environment(name: str, manifest_path: pathlib.Path | None):
+    [result] = parse_pixi_lock_environments([name], manifest_path)
+
+    return result
+
+
+def parse_conda_lock_environment(path: str, manifest_path: pathlib.Path | None):
+    path = pathlib.Path(path)
+
+    sources = []
+    locked = {}
+    for key, value in iter_lock_entries(path):
+        if key == "metadata":
+            sources = value.get("sources", [])
+        elif key == "package":
+            source = "conda" if value.get("manager", "conda") == "conda" else "pypi"
+            name = (
+                value["name"]
+                if source == "conda"
+                else pypi.normalize_name(value["name"])
+            )
+            locked.setdefault(name, []).append(
+                LockedPackage(
+                    name=name,
+                    version=parse_version(value["version"]),
+                    source=source,
+                    timestamp=parse_lock_timestamp(value.get("timestamp")),
+                )
+            )
+
+    # only report the direct dependencies, if the environment files are available
+    source_paths = [
+        path.parent / source
+        for source in sources
+        if source.endswith((".yml", ".yaml")) and (path.parent / source).exists()
+    ]
+    if source_paths:
+        names = list(
+            dict.fromkeys(
+                (spec.name, spec.source)
+                for source_path in source_paths
+                for spec in parse_conda_environment(source_path, None)[0]
+            )
+        )
+    else:
+        names = [(name, packages[0].source) for name, packages in locked.items()]
+
+    return locked_specs(names, locked)
+
+
+pixi_lock_parser = Parser(
+    parse=parse_pixi_lock_environment,
+    parse_batch=parse_pixi_lock_environments,
+    expand=expand_pixi_environments,
+)
+conda_lock_parser = Parser(parse=parse_conda_lock_environment)
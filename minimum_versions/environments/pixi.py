@@ -2,10 +2,12 @@ import pathlib
 import re
 import tomllib
 
-from rattler import Version
 from tlz.dicttoolz import get_in, merge
+from tlz.itertoolz import concat
 
+from minimum_versions.environments import Parser, pypi
 from minimum_versions.environments.spec import Spec
+from minimum_versions.versions import parse_version
 
 _version_re = r"[0-9]+\.[0-9]+(?:\.[0-9]+|\.\*)?"
 version_re = re.compile(f"(?P<version>{_version_re})")
@@ -13,6 +15,13 @@ lower_pin_re = re.compile(rf">=(?P<version>{_version_re})$")
 tight_pin_re = re.compile(rf">=(?P<lower>{_version_re}),<(?P<upper>{_version_re})")
 exclusion_pin_re = re.compile(rf"!=(?P<excluded>{_version_re})$")
 
+# pins that refer to a source instead of a version can't be checked
+source_keys = {"path", "git", "url"}
+
+
+def is_source_dependency(pin):
+    return isinstance(pin, dict) and bool(pin.keys() & source_keys)
+
 
 def parse_spec(name, version_text: str | dict):
     # "*" => None
@@ -56,7 +65,7 @@ def parse_spec(name, version_text: str | dict):
         raise ValueError(f"Unsupported version spec: {version_text}")
 
     if raw_version is not None:
-        version = Version(raw_version.removesuffix(".*"))
+        version = parse_version(raw_version.removesuffix(".*"))
         segments = version.segments()
         if (len(segments) == 3 and segments[2] != [0]) or len(segments) > 3:
             warnings.append(
@@ -68,13 +77,7 @@ def parse_spec(name, version_text: str | dict):
     return Spec(name, version), (name, warnings)
 
 
-def parse_pixi_environment(name: str, manifest_path: pathlib.Path | None):
-    if manifest_path is None:
-        raise ValueError("--manifest-path is required for pixi environments.")
-
-    with manifest_path.open(mode="rb") as f:
-        data = tomllib.load(f)
-
+def extract_pixi_config(data, manifest_path: pathlib.Path):
     if manifest_path.name == "pyproject.toml":
         pixi_config = get_in(["tool", "pixi"], data, None)
         if pixi_config is None:
@@ -84,6 +87,17 @@ def parse_pixi_environment(name: str, manifest_path: pathlib.Path | None):
     else:
         pixi_config = data
 
+    return pixi_config
+
+
+def load_pixi_config(manifest_path: pathlib.Path):
+    with manifest_path.open(mode="rb") as f:
+        data = tomllib.load(f)
+
+    return extract_pixi_config(data, manifest_path)
+
+
+def environment_features(pixi_config, name: str):
     environment_definitions = pixi_config.get("environments")
     if environment_definitions is None:
         raise ValueError("Can't find environments in the pixi config.")
@@ -95,14 +109,14 @@ def parse_pixi_environment(name: str, manifest_path: pathlib.Path | None):
         raise ValueError(f"Unknown environment: {name}")
 
     if isinstance(env, list):
-        feature_names = env
+        feature_names = list(env)
     elif isinstance(env, dict) and env.keys() - {"features", "no-default-feature"}:
         raise ValueError(
             "Options other than 'features' and 'no-default-feature'"
             f" are not supported. Got {env}."
         )
     elif isinstance(env, dict):
-        feature_names = env["features"]
+        feature_names = list(env["features"])
         if not env.get("no-default-feature", False):
             feature_names.insert(0, "default")
     else:
@@ -114,47 +128,106 @@ def parse_pixi_environment(name: str, manifest_path: pathlib.Path | None):
     if unknown_features:
         raise ValueError(f"unknown features: {', '.join(unknown_features)}")
 
-    features = [
-        (
-            get_in([feature, "dependencies"], all_features, {})
-            if feature != "default"
-            else pixi_config.get("dependencies", {})
-        )
-        for feature in feature_names
-    ]
+    return feature_names
 
-    local_package_name = get_in(["package", "name"], pixi_config, None)
-    pins = {
-        name: pin
-        for name, pin in merge(features).items()
-        # skip the local package, if any
-        if name != local_package_name
-    }
 
-    specs = []
-    warnings = []
+def feature_table(pixi_config, feature: str, key: str, default=None):
+    if feature == "default":
+        return pixi_config.get(key, default)
 
-    pypi_dependencies = {
-        feature: (
-            get_in([feature, "pypi-dependencies"], all_features)
-            if feature != "default"
-            else pixi_config.get("pypi-dependencies", [])
-        )
-        for feature in feature_names
-    }
-    with_pypi_dependencies = {
-        feature: bool(deps) for feature, deps in pypi_dependencies.items() if deps
+    return get_in(["feature", feature, key], pixi_config, default)
+
+
+def parse_feature(pixi_config, feature: str):
+    local_package_name = get_in(["package", "name"], pixi_config, None)
+
+    parsed = {}
+    tables = [("dependencies", parse_spec), ("pypi-dependencies", pypi.parse_spec)]
+    for key, parser in tables:
+        parsed[key] = {}
+        for package_name, pin in feature_table(pixi_config, feature, key, {}).items():
+            # the local package and source dependencies can't be checked
+            if package_name == local_package_name or is_source_dependency(pin):
+                continue
+
+            try:
+                parsed[key][package_name] = parser(package_name, pin)
+            except ValueError as e:
+                e.add_note(f"feature {feature}: {package_name}{pin}")
+                raise
+
+    return parsed["dependencies"], parsed["pypi-dependencies"]
+
+
+def parse_pixi_config_environment(pixi_config, name: str, feature_cache=None):
+    # feature_cache: {feature name: parsed feature}, shared between environments
+    if feature_cache is None:
+        feature_cache = {}
+
+    feature_names = environment_features(pixi_config, name)
+    for feature in feature_names:
+        if feature not in feature_cache:
+            feature_cache[feature] = parse_feature(pixi_config, feature)
+
+    features = [feature_cache[feature] for feature in feature_names]
+    pins = merge(conda for conda, _ in features)
+    pypi_pins = {
+        package_name: parsed
+        for package_name, parsed in merge(pypi_ for _, pypi_ in features).items()
+        # conda packages take precedence
+        if package_name not in pins
     }
-    for feature in with_pypi_dependencies:
-        warnings.append((f"feature:{feature}", ["Ignored PyPI dependencies."]))
-    for package_name, pin in pins.items():
-        try:
-            spec, warnings_ = parse_spec(package_name, pin)
-        except ValueError as e:
-            e.add_note(f"environment {name}: {package_name}{pin}")
-            raise
 
+    specs, warnings = [], []
+    for spec, warnings_ in concat([pins.values(), pypi_pins.values()]):
         specs.append(spec)
         warnings.append(warnings_)
 
     return specs, warnings
+
+
+def list_environments(manifest_path: pathlib.Path | None):
+    if manifest_path is None:
+        raise ValueError("--manifest-path is required for pixi environments.")
+
+    environment_definitions = load_pixi_config(manifest_path).get("environments")
+    if environment_definitions is None:
+        raise ValueError("Can't find environments in the pixi config.")
+
+    return list(environment_definitions)
+
+
+def expand_pixi_environments(name: str, manifest_path: pathlib.Path | None):
+    if name != "*":
+        return [name]
+
+    return list_environments(manifest_path)
+
+
+def parse_pixi_environment(name: str, manifest_path: pathlib.Path | None):
+    if manifest_path is None:
+        raise ValueError("--manifest-path is required for pixi environments.")
+
+    pixi_config = load_pixi_config(manifest_path)
+
+    return parse_pixi_config_environment(pixi_config, name)
+
+
+def parse_pixi_environments(names: list[str], manifest_path: pathlib.Path | None):
+    if manifest_path is None:
+        raise ValueError("--manifest-path is required for pixi environments.")
+
+    pixi_config = load_pixi_config(manifest_path)
+
+    feature_cache = {}
+    return [
+        parse_pixi_config_environment(pixi_config, name, feature_cache)
+        for name in names
+    ]
+
+
+parser = Parser(
+    parse=parse_pixi_environment,
+    parse_batch=parse_pixi_environments,
+    expand=expand_pixi_environments,
+)
@@ -0,0 +1,115 @@
+import pathlib
+import re
+import tomllib
+
+from minimum_versions.environments import Parser
+from minimum_versions.environments.spec import Spec
+from minimum_versions.versions import parse_version
+
+_version_re = r"[0-9]+(?:\.[0-9]+)*(?:\.\*)?"
+requirement_re = re.compile(
+    r"^\s*(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)\s*"
+    r"(?:\[(?P<extras>[^\]]*)\])?\s*"
+    r"(?P<specifier>[^;@]*?)\s*"
+    r"(?:@(?P<url>[^;]*))?\s*"
+    r"(?:;(?P<marker>.*))?$"
+)
+clause_re = re.compile(r"^(?P<operator>~=|===|==|!=|<=|>=|<|>)?\s*(?P<version>.+)$")
+version_re = re.compile(rf"^{_version_re}$")
+
+
+def normalize_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def parse_spec(name, version_text: str | dict):
+    # "*" => None
+    # ">=x.y" => "x.y"
+    # "==x.y.*" / "x.y.*" / "~=x.y" => "x.y"
+    # ">=x.y,<z" => "x.y"
+    # ">x.y" => "x.y" (+ warning)
+
+    name = normalize_name(name)
+
+    if isinstance(version_text, dict):
+        version_text = version_text.get("version", "*")
+
+    warnings = []
+    lower_pins = []
+    for clause in filter(None, (c.strip() for c in version_text.split(","))):
+        if clause == "*":
+            continue
+
+        match = clause_re.match(clause)
+        operator = match.group("operator") or "=="
+        version = match.group("version").strip()
+        if operator in ("<", "<=", "!="):
+            # upper bounds and exclusions don't affect the minimum version
+            continue
+        elif operator == "===" or version_re.match(version) is None:
+            raise ValueError(f"Unsupported version spec: {version_text}")
+        elif operator == ">":
+            warnings.append(
+                f"package must be pinned with an inclusive lower bound: {version_text!r}."
+                " Using the version as the lower bound instead."
+            )
+
+        lower_pins.append(parse_version(version.removesuffix(".*")))
+
+    if lower_pins:
+        version = max(lower_pins)
+        segments = version.segments()
+        if (len(segments) == 3 and segments[2] != [0]) or len(segments) > 3:
+            warnings.append(
+                f"package should be pinned to a minor version (got {version})"
+            )
+    else:
+        version = None
+
+    return Spec(name, version, source="pypi"), (name, warnings)
+
+
+def parse_requirement(requirement: str):
+    match = requirement_re.match(requirement)
+    if match is None:
+        raise ValueError(f"Invalid requirement: {requirement!r}")
+
+    if match.group("url") is not None:
+        # direct references can't be checked against the index
+        return None
+
+    return parse_spec(match.group("name"), match.group("specifier") or "*")
+
+
+def parse_pyproject_environment(path: str, manifest_path: pathlib.Path | None):
+    with pathlib.Path(path).open(mode="rb") as f:
+        data = tomllib.load(f)
+
+    return parse_pyproject_data(data, path)
+
+
+def parse_pyproject_data(data, path):
+    dependencies = data.get("project", {}).get("dependencies")
+    if dependencies is None:
+        raise ValueError(f"Can't find 'project.dependencies' in {path}.")
+
+    specs = []
+    warnings = []
+    for requirement in dependencies:
+        try:
+            parsed = parse_requirement(requirement)
+        except ValueError as e:
+            e.add_note(f"{path}: {requirement}")
+            raise
+
+        if parsed is None:
+            continue
+
+        spec, warnings_ = parsed
+        specs.append(spec)
+        warnings.append(warnings_)
+
+    return specs, warnings
+
+
+parser = Parser(parse=parse_pyproject_environment)
@@ -1,12 +1,18 @@
-from dataclasses import dataclass
+import datetime
+from dataclasses import dataclass, field
 
 from rattler import Version
 
+from minimum_versions.versions import comparison_version, is_newer
+
 
 @dataclass
 class Spec:
     name: str
     version: Version | None
+    source: str = "conda"
+    # release date of the locked build, for specs from lock files
+    timestamp: datetime.datetime | None = field(default=None, compare=False)
 
 
 def compare_versions(environments, policy_versions, ignored_violations):
@@ -15,7 +21,9 @@ def compare_versions(environments, policy_versions, ignored_violations):
     for env, specs in environments.items():
         violations = {
             spec.name: spec.version is None
-            or spec.version > policy_versions[spec.name].version
+            or is_newer(
+                spec.version, comparison_version(policy_versions[spec.name].version)
+            )
             for spec in specs
         }
         status[env] = any(
@@ -30,3 +38,21 @@ def compare_versions(environments, policy_versions, ignored_violations):
         }
 
     return status, warnings
+
+
+def find_violations(environments, policy_versions, ignored_violations):
+    # {env: names of the packages that are newer than the policy allows}
+    return {
+        env: [
+            spec.name
+            for spec in specs
+            if spec.name not in ignored_violations
+            and (
+                spec.version is None
+                or is_newer(
+                    spec.version, comparison_version(policy_versions[spec.name].version)
+                )
+            )
+        ]
+        for env, specs in environments.items()
+    }
@@ -2,8 +2,10 @@ import datetime
 
 from rich.style import Style
 from rich.table import Column, Table
+from rich.text import Text
 
 from minimum_versions.release import Release
+from minimum_versions.versions import comparison_version, minor_version
 
 
 def lookup_spec_release(spec, releases):
@@ -31,7 +33,50 @@ def version_comparison_symbol(required, policy):
         return "="
 
 
-def format_bump_table(specs, policy_versions, releases, warnings, ignored_violations):
+def bump_table_rows(specs, policy_versions, releases, warnings):
+    rows = []
+    for spec in specs:
+        policy_release = policy_versions[spec.name]
+        policy_version = comparison_version(policy_release.version)
+        policy_date = policy_release.timestamp
+
+        required_version = spec.version
+        if required_version is None:
+            warnings[spec.name].append(
+                "Unpinned dependency. Consider pinning or ignoring this dependency."
+            )
+            required_date = None
+        elif spec.timestamp is not None:
+            required_date = spec.timestamp
+        else:
+            required_date = lookup_spec_release(spec, releases).timestamp
+
+        rows.append(
+            (
+                spec.name,
+                str(required_version) if required_version is not None else "",
+                f"{required_date:%Y-%m-%d}" if required_date is not None else "",
+                str(policy_version),
+                f"{policy_date:%Y-%m-%d}",
+                version_comparison_symbol(required_version, policy_version),
+            )
+        )
+
+    return rows
+
+
+def format_platform_versions(versions):
+    return ", ".join(
+        f"{platform}: {minor_version(release.version)}"
+        for platform, release in versions.items()
+    )
+
+
+def render_bump_table(rows, warnings, ignored_violations, platform_versions=None):
+    # only show the per-platform minimums if any of them diverge
+    show_platforms = bool(platform_versions) and any(
+        row[0] in platform_versions for row in rows
+    )
     table = Table(
         Column("Package", width=20),
         Column("Required", width=8),
@@ -39,6 +84,7 @@ def format_bump_table(specs, policy_versions, releases, warnings, ignored_violat
         Column("Policy", width=8),
         "Policy (date)",
         "Status",
+        *(["Platforms"] if show_platforms else []),
     )
 
     heading_style = Style(color="#ff0000", bold=True)
@@ -50,35 +96,17 @@ def format_bump_table(specs, policy_versions, releases, warnings, ignored_violat
         "!": warning_style,
     }
 
-    for spec in specs:
-        policy_release = policy_versions[spec.name]
-        policy_version = policy_release.version.with_segments(0, 2)
-        policy_date = policy_release.timestamp
-
-        required_version = spec.version
-        if required_version is None:
-            warnings[spec.name].append(
-                "Unpinned dependency. Consider pinning or ignoring this dependency."
-            )
-            required_date = None
-        else:
-            required_date = lookup_spec_release(spec, releases).timestamp
-
-        status = version_comparison_symbol(required_version, policy_version)
-        if status == ">" and spec.name in ignored_violations:
+    for row in rows:
+        name, *_, status = row
+        if status == ">" and name in ignored_violations:
             style = warning_style
         else:
             style = styles[status]
 
-        table.add_row(
-            spec.name,
-            str(required_version) if required_version is not None else "",
-            f"{required_date:%Y-%m-%d}" if required_date is not None else "",
-            str(policy_version),
-            f"{policy_date:%Y-%m-%d}",
-            status,
-            style=style,
-        )
+        if show_platforms:
+            row = (*row, format_platform_versions(platform_versions.get(name, {})))
+
+        table.add_row(*row, style=style)
 
     grid = Table.grid(expand=True, padding=(0, 2))
     grid.add_column(style=heading_style, vertical="middle")
@@ -106,3 +134,127 @@ def format_bump_table(specs, policy_versions, releases, warnings, ignored_violat
         grid.add_row("Warnings", warning_table)
 
     return grid
+
+
+def format_bump_table(specs, policy_versions, releases, warnings, ignored_violations):
+    rows = bump_table_rows(specs, policy_versions, releases, warnings)
+
+    return render_bump_table(rows, warnings, ignored_violations)
+
+
+def format_solve_table(results):
+    table = Table(Column("Platform", width=20), "Status", "Message")
+
+    styles = {
+        True: Style(color="#008700", bold=True),
+        False: Style(color="#ff0000", bold=True),
+    }
+
+    for platform, result in results.items():
+        table.add_row(
+            platform,
+            "solvable" if result.solvable else "unsolvable",
+            result.message,
+            style=styles[result.solvable],
+        )
+
+    return table
+
+
+def format_history_table(results):
+    envs = list(results[0].violations) if results else []
+    table = Table("Commit", "Date", *envs)
+
+    ok_style = Style(color="#008700", bold=True)
+    violation_style = Style(color="#ff0000", bold=True)
+
+    for result in results:
+        cells = []
+        for env in envs:
+            violations = result.violations[env]
+            if violations is None:
+                cells.append("")
+            elif violations:
+                cells.append(Text(", ".join(violations), style=violation_style))
+            else:
+                cells.append(Text("ok", style=ok_style))
+
+        table.add_row(result.commit[:10], f"{result.date:%Y-%m-%d}", *cells)
+
+    return table
+
+
+def format_simulation_table(packages, configurations):
+    table = Table("Months", "Date", "Failing", "Violations", *packages)
+
+    ok_style = Style(color="#008700", bold=True)
+    violation_style = Style(color="#ff0000", bold=True)
+
+    for configuration in configurations:
+        violations = configuration.violations
+        failing = sum(1 for names in violations.values() if names)
+        style = violation_style if failing else ok_style
+
+        table.add_row(
+            str(configuration.months),
+            f"{configuration.date:%Y-%m-%d}",
+            Text(f"{failing}/{len(violations)}", style=style),
+            str(sum(len(names) for names in violations.values())),
+            *(
+                str(minor_version(configuration.policy_versions[name].version))
+                for name in packages
+            ),
+        )
+
+    return table
+
+
+def format_baseline_changes(changes):
+    table = Table("Environment", "Package", "Change", "Before", "After")
+
+    styles = {
+        "violation": Style(color="#ff0000", bold=True),
+        "bump": Style(color="#d78700", bold=True),
+        "policy": Style(),
+    }
+    labels = {
+        "violation": "new violation",
+        "bump": "bump possible",
+        "policy": "policy changed",
+    }
+
+    for env, env_changes in changes.items():
+        for change in env_changes:
+            table.add_row(
+                env,
+                change.package,
+                labels[change.kind],
+                change.before,
+                change.after,
+                style=styles[change.kind],
+            )
+
+    return table
+
+
+def format_pin_table(pins):
+    table = Table("Repository", "Environment", "Package", "Required", "Policy")
+
+    styles = {
+        ">": Style(color="#ff0000", bold=True),
+        "=": Style(color="#008700", bold=True),
+        "<": Style(color="#d78700", bold=True),
+        "!": Style(color="#ffff00", bold=True),
+    }
+
+    for pin in pins:
+        table.add_row(
+            pin.repository,
+            pin.environment,
+            pin.package,
+            pin.required or "",
+            pin.policy,
+            style=styles[pin.status],
+        )
+
+    return table
@@ -0,0 +1,289 @@
+import datetime
+import pathlib
+import subprocess
+import tempfile
+from dataclasses import dataclass
+
+import yaml
+from rattler.exceptions import InvalidVersionError
+from tlz.dicttoolz import merge
+from tlz.itertoolz import concat, groupby, unique
+
+from minimum_versions.environments import (
+    find_violations,
+    parse_environment,
+    split_specifier,
+)
+from minimum_versions.validation import (
+    drop_unknown_packages,
+    fetch_environment_releases,
+    filter_excluded,
+)
+
+# kinds where the specifier names an environment of the manifest instead of a file
+manifest_kinds = {"pixi", "pixi-lock"}
+# errors of environments that can't be parsed at a revision
+parse_errors = (ValueError, KeyError, TypeError, InvalidVersionError, yaml.YAMLError)
+
+
+@dataclass
+class CommitResult:
+    commit: str
+    date: datetime.date
+    # {env: names of the violating packages}, or None if the environment is missing
+    violations: dict
+
+
+def git(root, *args, input=None):
+    result = subprocess.run(
+        ["git", *args], cwd=root, input=input, capture_output=True, check=True
+    )
+    return result.stdout
+
+
+def repository_root(path):
+    path = pathlib.Path(path).resolve()
+    output = git(path if path.is_dir() else path.parent, "rev-parse", "--show-toplevel")
+
+    return pathlib.Path(output.decode().strip())
+
+
+def list_commits(root, paths, since=None):
+    args = ["log", "--format=%H %cI"]
+    if since is not None:
+        args.append(f"--since={since.isoformat()}")
+
+    output = git(root, *args, "--", *paths).decode()
+    commits = [
+        (commit, datetime.datetime.fromisoformat(date).date())
+        for commit, date in (line.split() for line in output.splitlines())
+    ]
+
+    # oldest first
+    return commits[::-1]
+
+
+def parse_batch_check(output):
+    # one line per request: "<sha> <type> <size>", or "<request> missing"
+    return [
+        None if line.endswith(" missing") else line.split()[0]
+        for line in output.decode().splitlines()
+    ]
+
+
+def parse_batch_output(output):
+    contents = []
+    position = 0
+    while position < len(output):
+        end = output.index(b"\n", position)
+        header = output[position:end].decode()
+        if header.endswith(" missing"):
+            contents.append(None)
+            position = end + 1
+            continue
+
+        size = int(header.split()[2])
+        contents.append(output[end + 1 : end + 1 + size])
+        # the content is followed by a newline
+        position = end + 1 + size + 1
+
+    return contents
+
+
+def resolve_blobs(root, commits, paths):
+    # {commit: (blob sha of each path, or None)}, in a single git call
+    requests = [f"{commit}:{path}" for commit, _ in commits for path in paths]
+    shas = iter(
+        parse_batch_check(
+            git(root, "cat-file", "--batch-check", input="\n".join(requests).encode())
+        )
+    )
+
+    return {commit: tuple(next(shas) for _ in paths) for commit, _ in commits}
+
+
+def read_blobs(root, shas):
+    shas = [sha for sha in unique(shas) if sha is not None]
+    if not shas:
+        return {}
+
+    output = git(root, "cat-file", "--batch", input="\n".join(shas).encode())
+
+    return dict(zip(shas, parse_batch_output(output)))
+
+
+def relative_specifiers(environment_paths, root):
+    specifiers = []
+    for specifier in environment_paths:
+        kind, path = split_specifier(specifier)
+        if kind not in manifest_kinds:
+            path = pathlib.Path(path).resolve().relative_to(root).as_posix()
+
+        specifiers.append((kind, path))
+
+    return specifiers
+
+
+def history_paths(specifiers, manifest_path):
+    paths = [path for kind, path in specifiers if kind not in manifest_kinds]
+
+    if manifest_path is not None:
+        paths.append(manifest_path)
+        if any(kind == "pixi-lock" for kind, _ in specifiers):
+            paths.append(pathlib.PurePosixPath(manifest_path).parent / "pixi.lock")
+
+    return [str(path) for path in unique(paths)]
+
+
+def parse_revision(names, specifiers, manifest_path, files):
+    # the parsers read files, so the blobs are written to a temporary tree
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = pathlib.Path(tmpdir)
+        for path, content in files.items():
+            if content is None:
+                continue
+
+            target = tmpdir / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+
+        if manifest_path is not None:
+            manifest_path = tmpdir / manifest_path
+
+        parsed = {}
+        for name, (kind, path) in zip(names, specifiers):
+            if kind in manifest_kinds:
+                source, required = path, manifest_path
+            else:
+                source = required = tmpdir / path
+
+            if required is None or not required.exists():
+                parsed[name] = None
+                continue
+
+            try:
+                parsed[name] = parse_environment(f"{kind}:{source}", manifest_path)
+            except parse_errors:
+                # broken revisions are reported like missing environments
+                parsed[name] = None
+
+        return parsed
+
+
+def parse_history(root, commits, names, specifiers, manifest_path):
+    paths = history_paths(specifiers, manifest_path)
+    blobs = resolve_blobs(root, commits, paths)
+    contents = read_blobs(root, concat(blobs.values()))
+
+    # revisions where none of the files changed are only parsed once
+    parsed = {}
+    revisions = []
+    for commit, date in commits:
+        key = blobs[commit]
+        if key not in parsed:
+            files = {path: contents.get(sha) for path, sha in zip(paths, key)}
+            parsed[key] = parse_revision(names, specifiers, manifest_path, files)
+
+        revisions.append((commit, date, parsed[key]))
+
+    return revisions
+
+
+def policy_versions_by_date(policy, revisions, package_releases):
+    needed = groupby(
+        lambda item: item[0],
+        unique(
+            (spec.name, date)
+            for _, date, environments in revisions
+            for spec in concat(environments.values())
+        ),
+    )
+
+    return {
+        name: policy.minimum_versions(
+            [date for _, date in items], name, package_releases[name]
+        )
+        for name, items in needed.items()
+    }
+
+
+def evaluate_history(policy, revisions, package_releases):
+    policy_versions = policy_versions_by_date(policy, revisions, package_releases)
+
+    results = []
+    for commit, date, environments in revisions:
+        versions = {
+            spec.name: policy_versions[spec.name][date]
+            for spec in concat(environments.values())
+        }
+        violations = find_violations(environments, versions, policy.ignored_violations)
+        results.append(CommitResult(commit, date, violations))
+
+    return results
+
+
+def history_root(specifiers, manifest_path):
+    if manifest_path is not None:
+        return repository_root(manifest_path)
+
+    path = next((path for kind, path in specifiers if kind not in manifest_kinds), None)
+    if path is None:
+        raise ValueError(
+            "Can't find the git repository: pass an environment file,"
+            " or --manifest-path for manifest environments."
+        )
+
+    return repository_root(path)
+
+
+async def replay_history(
+    policy,
+    environment_paths,
+    manifest_path=None,
+    since=None,
+    fetcher=None,
+    pypi_fetcher=None,
+):
+    # environment_paths: {env name: specifier}
+    names = list(environment_paths)
+    specifiers = [split_specifier(path) for path in environment_paths.values()]
+
+    root = history_root(specifiers, manifest_path)
+    specifiers = relative_specifiers(environment_paths.values(), root)
+    if manifest_path is not None:
+        manifest_path = pathlib.Path(manifest_path).resolve().relative_to(root)
+        manifest_path = manifest_path.as_posix()
+
+    commits = list_commits(root, history_paths(specifiers, manifest_path), since=since)
+
+    revisions = []
+    for commit, date, parsed in parse_history(
+        root, commits, names, specifiers, manifest_path
+    ):
+        available = {
+            env: result for env, result in parsed.items() if result is not None
+        }
+        environments, _ = filter_excluded(policy, available)
+        revisions.append((commit, date, environments))
+
+    # a single fetch covers every package that appears anywhere in the history
+    all_environments = {
+        (commit, env): specs
+        for commit, _, environments in revisions
+        for env, specs in environments.items()
+    }
+    conda_releases, pypi_releases = await fetch_environment_releases(
+        policy, all_environments, fetcher=fetcher, pypi_fetcher=pypi_fetcher
+    )
+
+    package_releases = merge(pypi_releases, conda_releases)
+    revisions = [
+        (commit, date, drop_unknown_packages(environments, package_releases)[0])
+        for commit, date, environments in revisions
+    ]
+
+    results = evaluate_history(policy, revisions, package_releases)
+    for result in results:
+        result.violations = {name: result.violations.get(name) for name in names}
+
+    return results
@@ -0,0 +1,122 @@
+import datetime
+import operator
+import re
+import sqlite3
+from dataclasses import dataclass
+
+from rattler.exceptions import InvalidVersionError
+
+from minimum_versions.versions import parse_version
+
+schema = """
+CREATE TABLE IF NOT EXISTS pins (
+    repository TEXT NOT NULL,
+    environment TEXT NOT NULL,
+    package TEXT NOT NULL,
+    required TEXT,
+    policy TEXT NOT NULL,
+    status TEXT NOT NULL,
+    updated TEXT NOT NULL,
+    PRIMARY KEY (repository, environment, package)
+);
+CREATE INDEX IF NOT EXISTS pins_package ON pins (package);
+"""
+
+query_re = re.compile(
+    r"^(?P<name>[A-Za-z0-9_.-]+)\s*(?:(?P<operator><=|>=|==|=|<|>)\s*(?P<version>\S+))?$"
+)
+operators = {
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "=": operator.eq,
+    ">=": operator.ge,
+    ">": operator.gt,
+}
+
+
+@dataclass
+class Pin:
+    repository: str
+    environment: str
+    package: str
+    required: str | None
+    policy: str
+    status: str
+
+
+@dataclass
+class PinQuery:
+    package: str
+    operator: str | None = None
+    version: str | None = None
+
+    def matches(self, pin):
+        if self.operator is None:
+            return True
+        elif pin.required is None:
+            # unpinned packages don't have a version to compare
+            return False
+
+        compare = operators[self.operator]
+        return compare(parse_version(pin.required), parse_version(self.version))
+
+
+def parse_query(text):
+    match = query_re.match(text.strip())
+    if match is None:
+        raise ValueError(f"Invalid query {text!r}, expected e.g. 'numpy<1.26'.")
+
+    if match["version"] is not None:
+        try:
+            parse_version(match["version"])
+        except InvalidVersionError as e:
+            raise ValueError(f"Invalid version in query {text!r}: {e}") from None
+
+    return PinQuery(match["name"], match["operator"], match["version"])
+
+
+class PinIndex:
+    def __init__(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(schema)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def update(self, repository, tables, now=None):
+        # replaces the pins of the given environments, leaving all others alone
+        if now is None:
+            now = datetime.datetime.now(datetime.UTC)
+
+        rows = [
+            (repository, env, name, required or None, policy, status, now.isoformat())
+            for env, env_rows in tables.items()
+            for name, required, _, policy, _, status in env_rows
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM pins WHERE repository = ? AND environment = ?",
+                [(repository, env) for env in tables],
+            )
+            self.connection.executemany(
+                "INSERT INTO pins VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def query(self, query):
+        cursor = self.connection.execute(
+            "SELECT repository, environment, package, required, policy, status"
+            " FROM pins WHERE package = ? ORDER BY repository, environment",
+            (query.package,),
+        )
+        pins = (Pin(*row) for row in cursor)
+
+        return [pin for pin in pins if query.matches(pin)]
@@ -0,0 +1,359 @@
+import asyncio
+import datetime
+import json
+import re
+import threading
+import tomllib
+from functools import lru_cache
+
+from tlz.dicttoolz import merge
+
+from minimum_versions.environments import compare_versions, conda, pixi, pypi
+from minimum_versions.validation import fetch_environment_releases
+from minimum_versions.versions import comparison_version
+
+severity_error = 1
+severity_warning = 2
+
+conda_item_re = re.compile(r"^(?P<indent>\s*)-\s+(?P<spec>[^\s#]+)")
+top_level_key_re = re.compile(r"^(?P<key>[A-Za-z_][\w-]*):")
+table_re = re.compile(r"^\s*\[(?P<table>[^\]]+)\]")
+pixi_entry_re = re.compile(r"^\s*(?P<name>[A-Za-z0-9_.\"-]+)\s*=")
+
+
+def document_kind(uri):
+    if uri.endswith(("pixi.toml", "pyproject.toml")):
+        return "pixi"
+    elif uri.endswith((".yml", ".yaml")):
+        return "conda"
+
+    return None
+
+
+def conda_dependency_lines(text):
+    # yields (line number, start, end, spec text) of the conda dependencies
+    in_dependencies = False
+    item_indent = None
+    for lineno, line in enumerate(text.splitlines()):
+        if (match := top_level_key_re.match(line)) is not None:
+            in_dependencies = match["key"] == "dependencies"
+            item_indent = None
+            continue
+        elif not in_dependencies or (match := conda_item_re.match(line)) is None:
+            continue
+
+        indent = len(match["indent"])
+        if item_indent is None:
+            item_indent = indent
+        if indent != item_indent or match["spec"].endswith(":"):
+            # nested lists, like the pip dependencies
+            continue
+
+        yield lineno, match.start("spec"), match.end("spec"), match["spec"]
+
+
+def pixi_table_source(table):
+    *_, key = table.strip().rsplit(".", maxsplit=1)
+    if key == "dependencies":
+        return "conda"
+    elif key == "pypi-dependencies":
+        return "pypi"
+
+    return None
+
+
+def pixi_dependency_lines(text):
+    # yields (line number, start, end, source, entry text) of the dependency tables
+    source = None
+    for lineno, line in enumerate(text.splitlines()):
+        if (match := table_re.match(line)) is not None:
+            source = pixi_table_source(match["table"])
+            continue
+        elif source is None or (match := pixi_entry_re.match(line)) is None:
+            continue
+
+        yield lineno, match.start("name"), len(line.rstrip()), source, line
+
+
+@lru_cache(maxsize=4096)
+def parse_conda_line(spec_text):
+    # unchanged lines are never parsed twice
+    try:
+        return conda.parse_spec(spec_text)
+    except ValueError as e:
+        return e
+
+
+@lru_cache(maxsize=4096)
+def parse_pixi_line(source, line):
+    try:
+        [(name, pin)] = tomllib.loads(line).items()
+    except (tomllib.TOMLDecodeError, ValueError) as e:
+        return ValueError(f"Can't parse the dependency: {e}")
+
+    if pixi.is_source_dependency(pin):
+        return None
+
+    parser = pixi.parse_spec if source == "conda" else pypi.parse_spec
+    try:
+        return parser(name, pin)
+    except ValueError as e:
+        return e
+
+
+def parse_document(kind, text):
+    # [(line number, start, end, parsed)], where parsed is (spec, warnings), an
+    # exception, or None for dependencies that can't be checked
+    if kind == "conda":
+        return [
+            (lineno, start, end, parse_conda_line(spec_text))
+            for lineno, start, end, spec_text in conda_dependency_lines(text)
+        ]
+    elif kind == "pixi":
+        return [
+            (lineno, start, end, parse_pixi_line(source, line))
+            for lineno, start, end, source, line in pixi_dependency_lines(text)
+        ]
+
+    return []
+
+
+def diagnostic(lineno, start, end, severity, message):
+    return {
+        "range": {
+            "start": {"line": lineno, "character": start},
+            "end": {"line": lineno, "character": end},
+        },
+        "severity": severity,
+        "source": "minimum-versions",
+        "message": message,
+    }
+
+
+def violation_message(spec, policy_release):
+    if spec.version is None:
+        return f"{spec.name} is not pinned"
+
+    return (
+        f"{spec.name}={spec.version} is newer than the policy minimum"
+        f" {comparison_version(policy_release.version)}"
+        f" ({policy_release.timestamp:%Y-%m-%d})"
+    )
+
+
+class LanguageServer:
+    def __init__(
+        self, policy, fetcher=None, pypi_fetcher=None, today=None, debounce=0.2
+    ):
+        self.policy = policy
+        self.fetcher = fetcher
+        self.pypi_fetcher = pypi_fetcher
+        self.today = today
+        self.debounce = debounce
+
+        self.documents = {}
+        # {name: policy release, or None for unknown packages}, for `policy_date`
+        self.policy_versions = {}
+        self.policy_date = None
+
+        self.running = False
+        self.output = None
+        self._timers = {}
+        self._write_lock = threading.Lock()
+        self._diagnose_lock = threading.Lock()
+
+    def find_policy_versions(self, specs):
+        today = self.today if self.today is not None else datetime.date.today()
+        if today != self.policy_date:
+            self.policy_versions = {}
+            self.policy_date = today
+
+        new_specs = [spec for spec in specs if spec.name not in self.policy_versions]
+        if not new_specs:
+            return self.policy_versions
+
+        try:
+            conda_releases, pypi_releases = asyncio.run(
+                fetch_environment_releases(
+                    self.policy,
+                    {None: new_specs},
+                    fetcher=self.fetcher,
+                    pypi_fetcher=self.pypi_fetcher,
+                )
+            )
+            releases = merge(pypi_releases, conda_releases)
+        except ValueError:
+            # e.g. packages that are missing from a snapshot
+            releases = {}
+
+        for spec in new_specs:
+            package_releases = releases.get(spec.name)
+            try:
+                self.policy_versions[spec.name] = (
+                    self.policy.minimum_version(today, spec.name, package_releases)
+                    if package_releases
+                    else None
+                )
+            except ValueError:
+                self.policy_versions[spec.name] = None
+
+        return self.policy_versions
+
+    def diagnose(self, kind, text):
+        diagnostics = []
+        specs = {}
+        for lineno, start, end, parsed in parse_document(kind, text):
+            if parsed is None:
+                continue
+            elif isinstance(parsed, Exception):
+                diagnostics.append(
+                    diagnostic(lineno, start, end, severity_warning, str(parsed))
+                )
+                continue
+
+            spec, (_, warnings) = parsed
+            if spec.name in self.policy.exclude:
+                continue
+
+            diagnostics.extend(
+                diagnostic(lineno, start, end, severity_warning, message)
+                for message in warnings
+            )
+            specs[(lineno, start, end)] = spec
+
+        policy_versions = self.find_policy_versions(list(specs.values()))
+
+        environments = {}
+        for key, spec in specs.items():
+            if policy_versions.get(spec.name) is None:
+                diagnostics.append(
+                    diagnostic(
+                        *key, severity_warning, f"no releases found for {spec.name}"
+                    )
+                )
+                continue
+
+            environments[key] = [spec]
+
+        status, violation_warnings = compare_versions(
+            environments, policy_versions, self.policy.ignored_violations
+        )
+        for key, [spec] in environments.items():
+            if status[key]:
+                message = violation_message(spec, policy_versions[spec.name])
+                diagnostics.append(diagnostic(*key, severity_error, message))
+
+            diagnostics.extend(
+                diagnostic(*key, severity_warning, f"{spec.name}: {message}")
+                for message in violation_warnings[key].get(spec.name, [])
+            )
+
+        return sorted(diagnostics, key=lambda d: d["range"]["start"]["line"])
+
+    def publish(self, uri):
+        with self._diagnose_lock:
+            text = self.documents.get(uri)
+            if text is None:
+                diagnostics = []
+            else:
+                diagnostics = self.diagnose(document_kind(uri), text)
+
+        self.notify(
+            "textDocument/publishDiagnostics",
+            {"uri": uri, "diagnostics": diagnostics},
+        )
+
+    def schedule(self, uri):
+        # only the last of a quick succession of edits is diagnosed
+        if (timer := self._timers.pop(uri, None)) is not None:
+            timer.cancel()
+
+        timer = threading.Timer(self.debounce, self.publish, args=(uri,))
+        timer.daemon = True
+        self._timers[uri] = timer
+        timer.start()
+
+    def write(self, message):
+        body = json.dumps(message).encode()
+        with self._write_lock:
+            self.output.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            self.output.flush()
+
+    def notify(self, method, params):
+        self.write({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def handle(self, message):
+        method = message.get("method")
+        params = message.get("params", {})
+        request_id = message.get("id")
+
+        result = None
+        if method == "initialize":
+            result = {
+                "capabilities": {"textDocumentSync": 1},
+                "serverInfo": {"name": "minimum-versions"},
+            }
+        elif method == "textDocument/didOpen":
+            document = params["textDocument"]
+            if document_kind(document["uri"]) is not None:
+                self.documents[document["uri"]] = document["text"]
+                self.publish(document["uri"])
+        elif method == "textDocument/didChange":
+            uri = params["textDocument"]["uri"]
+            if uri in self.documents:
+                # full document sync, the last change has the current text
+                self.documents[uri] = params["contentChanges"][-1]["text"]
+                self.schedule(uri)
+        elif method == "textDocument/didClose":
+            uri = params["textDocument"]["uri"]
+            if uri in self.documents:
+                del self.documents[uri]
+                if (timer := self._timers.pop(uri, None)) is not None:
+                    timer.cancel()
+                self.notify(
+                    "textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []}
+                )
+        elif method == "exit":
+            self.running = False
+        elif method not in ("initialized", "shutdown") and request_id is not None:
+            self.write(
+                {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "error": {"code": -32601, "message": f"Unknown method: {method}"},
+                }
+            )
+            return
+
+        if request_id is not None:
+            self.write({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+    def serve(self, input, output):
+        self.output = output
+        self.running = True
+        while self.running:
+            message = read_message(input)
+            if message is None:
+                break
+
+            self.handle(message)
+
+        for timer in self._timers.values():
+            timer.cancel()
+
+
+def read_message(stream):
+    headers = {}
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+
+        line = line.decode().strip()
+        if not line:
+            break
+
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    return json.loads(stream.read(int(headers["content-length"])))
@@ -1,20 +1,73 @@
+import asyncio
 import datetime
 import os.path
 import pathlib
 import sys
+from functools import partial
 from typing import Any
 
 import rich_click as click
 from rich.console import Console
 from rich.panel import Panel
+from rich.syntax import Syntax
 from rich.table import Table
-from tlz.dicttoolz import merge_with
-from tlz.itertoolz import concat, unique
 
-from minimum_versions.environments import compare_versions, parse_environment
-from minimum_versions.formatting import format_bump_table
-from minimum_versions.policy import find_policy_versions, parse_policy
-from minimum_versions.release import fetch_releases
+from minimum_versions import environments
+from minimum_versions.baseline import (
+    baseline_entries,
+    diff_baseline,
+    load_baseline,
+    save_baseline,
+)
+from minimum_versions.cache import ReleaseCache, SharedCache, default_cache_dir
+from minimum_versions.changes import (
+    PreviousResults,
+    find_changes,
+    results_key,
+    update_results,
+    verify_ref,
+)
+from minimum_versions.check import check_environments, format_violation
+from minimum_versions.environments import split_specifier
+from minimum_versions.formatting import (
+    format_baseline_changes,
+    format_history_table,
+    format_pin_table,
+    format_simulation_table,
+    format_solve_table,
+    render_bump_table,
+)
+from minimum_versions.history import history_root, replay_history
+from minimum_versions.index import PinIndex, parse_query
+from minimum_versions.metrics import (
+    collect_metrics,
+    format_openmetrics,
+    make_metrics_server,
+    peak_rss,
+)
+from minimum_versions.policy import parse_policy
+from minimum_versions.pypi import PyPIFetcher, default_index_url
+from minimum_versions.recording import RecordingGateway
+from minimum_versions.release import ReleaseFetcher, default_gateway
+from minimum_versions.sharding import parse_shard, select_shard
+from minimum_versions.simulate import default_months, simulate_environments
+from minimum_versions.snapshot import (
+    SnapshotFetcher,
+    SnapshotPyPIFetcher,
+    decode_package_releases,
+    encode_package_releases,
+    export_snapshot,
+)
+from minimum_versions.solve import SolveCache
+from minimum_versions.validation import (
+    ResultCache,
+    fetch_environment_releases,
+    filter_excluded,
+    find_packages,
+    find_sources,
+    validate_changed_environments,
+    validate_environments,
+)
 
 click.rich_click.SHOW_ARGUMENTS = True
 
@@ -36,14 +89,74 @@ class _Path(click.Path):
         return super().convert(value, param, ctx)
 
 
-def merge_warnings(*warnings):
-    def merge_lists(v):
-        return list(concat(v))
+pypi_index_option = click.option(
+    "--pypi-index-url",
+    "pypi_index_url",
+    type=str,
+    default=default_index_url,
+    help="The PyPI simple index to query for the releases of PyPI dependencies.",
+)
+
+
+shared_cache_option = click.option(
+    "--shared-cache",
+    "shared_cache",
+    is_flag=True,
+    default=False,
+    help=(
+        "Share release data and repodata with concurrent processes through the"
+        " cache directory."
+    ),
+)
+
+
+low_memory_option = click.option(
+    "--low-memory",
+    "low_memory",
+    is_flag=True,
+    default=False,
+    help=(
+        "Query one channel and platform at a time to reduce the peak memory usage,"
+        " at the cost of a slower fetch."
+    ),
+)
+
 
-    def merge_env(values):
-        return merge_with(merge_lists, *values)
+def make_fetchers(
+    snapshot_path, pypi_index_url, shared_cache_dir=None, low_memory=False
+):
+    if snapshot_path is not None:
+        return SnapshotFetcher(snapshot_path), SnapshotPyPIFetcher(snapshot_path)
+
+    if shared_cache_dir is None:
+        fetcher = ReleaseFetcher(low_memory=True) if low_memory else None
+        return fetcher, PyPIFetcher(index_url=pypi_index_url)
+
+    cache = SharedCache(
+        shared_cache_dir / "releases",
+        encode=encode_package_releases,
+        decode=decode_package_releases,
+    )
+    fetcher = ReleaseFetcher(
+        gateway=default_gateway(cache_dir=shared_cache_dir / "repodata"),
+        cache=cache,
+        low_memory=low_memory,
+    )
+    return fetcher, PyPIFetcher(index_url=pypi_index_url, cache=cache)
 
-    return merge_with(merge_env, *warnings)
+
+def environment_name(specifier):
+    return specifier.rsplit(os.path.sep, maxsplit=1)[-1]
+
+
+def parse_environments(environment_paths, manifest_path):
+    environment_paths = environments.expand_specifiers(environment_paths, manifest_path)
+    parsed = environments.parse_environments(environment_paths, manifest_path)
+
+    return {
+        environment_name(path): result
+        for path, result in zip(environment_paths, parsed)
+    }
 
 
 @click.group()
@@ -61,67 +174,815 @@ def main():
 )
 @click.option("--today", type=parse_date, default=None)
 @click.option("--policy", "policy_file", type=click.File(mode="r"), required=True)
-def validate(today, policy_file, manifest_path, environment_paths):
+@click.option(
+    "--snapshot",
+    "snapshot_path",
+    type=_Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Load the release data from a snapshot instead of querying the channels.",
+)
+@click.option(
+    "--recursive",
+    is_flag=True,
+    default=False,
+    help="Also check the dependency closure of the pinned packages.",
+)
+@click.option(
+    "--solve",
+    is_flag=True,
+    default=False,
+    help="Check that the environments can be solved on the policy's platforms.",
+)
+@click.option(
+    "--cache-dir",
+    "cache_dir",
+    type=_Path(file_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Directory for cached results. Defaults to the user cache directory.",
+)
+@click.option(
+    "--no-cache",
+    "no_cache",
+    is_flag=True,
+    default=False,
+    help="Don't read or write the cached results of previous runs.",
+)
+@click.option(
+    "--changed-since",
+    "changed_since",
+    type=str,
+    default=None,
+    help=(
+        "Only validate the environments that changed since the given git ref."
+        " The status of the others is taken from the previous run."
+    ),
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes used to evaluate the environments.",
+)
+@click.option(
+    "--shard",
+    type=str,
+    default=None,
+    help=(
+        "Only validate the i-th of N deterministic subsets of the environments,"
+        " given as 'i/N'."
+    ),
+)
+@click.option(
+    "--baseline",
+    "baseline_path",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help=(
+        "Compare with the results stored in this file, only show what changed,"
+        " and update the file."
+    ),
+)
+@click.option(
+    "--index",
+    "index_path",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Store the pins of the validated environments in this index for `query`.",
+)
+@click.option(
+    "--repository",
+    type=str,
+    default=None,
+    help=(
+        "Name of the repository in the index."
+        " Defaults to the name of the current directory."
+    ),
+)
+@click.option(
+    "--per-platform",
+    "per_platform",
+    is_flag=True,
+    default=False,
+    help=(
+        "Also compute the policy minimum versions of every platform, and show"
+        " where they differ from the combined minimum versions."
+    ),
+)
+@shared_cache_option
+@low_memory_option
+@pypi_index_option
+def validate(
+    today,
+    policy_file,
+    manifest_path,
+    environment_paths,
+    snapshot_path,
+    recursive,
+    solve,
+    cache_dir,
+    no_cache,
+    changed_since,
+    jobs,
+    shard,
+    baseline_path,
+    index_path,
+    repository,
+    per_platform,
+    shared_cache,
+    low_memory,
+    pypi_index_url,
+):
+    console = Console()
+
+    if per_platform and snapshot_path is not None:
+        raise click.UsageError("--per-platform can't be combined with --snapshot.")
+    if per_platform and changed_since is not None:
+        raise click.UsageError("--per-platform can't be combined with --changed-since.")
+    if no_cache and changed_since is not None:
+        raise click.UsageError(
+            "--changed-since needs the cached results of the previous run,"
+            " and can't be combined with --no-cache."
+        )
+    if (recursive or solve) and snapshot_path is not None:
+        raise click.UsageError(
+            "--recursive and --solve can't be combined with --snapshot."
+        )
+    if (recursive or solve) and changed_since is not None:
+        raise click.UsageError(
+            "--recursive and --solve can't be combined with --changed-since."
+        )
+
+    environment_paths = environments.expand_specifiers(environment_paths, manifest_path)
+    if shard is not None:
+        try:
+            index, count = parse_shard(shard)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--shard") from None
+
+        environment_paths = select_shard(environment_paths, index, count)
+
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    if today is None:
+        today = datetime.date.today()
+
+    policy_text = policy_file.read()
+    policy = parse_policy(policy_text)
+    parsed_environments = parse_environments(environment_paths, manifest_path)
+
+    if no_cache:
+        previous_results = None
+        previous = {"environments": {}, "packages": {}}
+    else:
+        previous_results = PreviousResults(
+            cache_dir / "results", results_key(policy_text), today
+        )
+        previous = previous_results.load()
+
+    fetcher, pypi_fetcher = make_fetchers(
+        snapshot_path,
+        pypi_index_url,
+        cache_dir if shared_cache else None,
+        low_memory=low_memory,
+    )
+    if changed_since is not None:
+        try:
+            verify_ref(changed_since)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--changed-since") from None
+
+        changes = find_changes(
+            changed_since,
+            {environment_name(path): path for path in environment_paths},
+            parsed_environments,
+            manifest_path,
+            previous,
+        )
+        unchanged = {
+            env: previous["environments"][env]["status"]
+            for env in parsed_environments
+            if env not in changes
+        }
+        result = asyncio.run(
+            validate_changed_environments(
+                policy,
+                parsed_environments,
+                changes,
+                previous,
+                today,
+                fetcher=fetcher,
+                pypi_fetcher=pypi_fetcher,
+            )
+        )
+    else:
+        unchanged = {}
+        result = asyncio.run(
+            validate_environments(
+                policy,
+                parsed_environments,
+                today,
+                fetcher=fetcher,
+                recursive=recursive,
+                solve=solve,
+                solve_cache=None if no_cache else SolveCache(cache_dir / "solves"),
+                pypi_fetcher=pypi_fetcher,
+                result_cache=(
+                    None if no_cache else ResultCache(cache_dir / "environments")
+                ),
+                jobs=jobs,
+                per_platform=per_platform,
+            )
+        )
+
+    if previous_results is not None:
+        previous_results.save(update_results(previous, result, parsed_environments))
+    if index_path is not None:
+        with PinIndex(index_path) as index:
+            index.update(repository or pathlib.Path.cwd().name, result.tables)
+
+    baseline = load_baseline(baseline_path) if baseline_path is not None else None
+    if baseline is not None:
+        entries = baseline_entries(result.tables, policy.ignored_violations)
+        changes = diff_baseline(baseline, entries)
+        if changes:
+            console.print(format_baseline_changes(changes))
+        else:
+            console.print(f"No changes since the baseline in {baseline_path}.")
+
+        save_baseline(
+            baseline_path, baseline, entries, environments=parsed_environments
+        )
+    else:
+        grids = {
+            env: render_bump_table(
+                rows,
+                result.warnings[env],
+                policy.ignored_violations,
+                platform_versions=result.platform_versions,
+            )
+            for env, rows in result.tables.items()
+        }
+        root_grid = Table.grid()
+        root_grid.add_column()
+
+        for env, grid in grids.items():
+            if env in result.solves:
+                grid.add_row("Solve", format_solve_table(result.solves[env]))
+
+            root_grid.add_row(Panel(grid, title=env, expand=True))
+
+        console.print(root_grid)
+
+        if baseline_path is not None:
+            save_baseline(
+                baseline_path,
+                None,
+                baseline_entries(result.tables, policy.ignored_violations),
+            )
+
+    if low_memory and (rss := peak_rss()) is not None:
+        console.print(
+            f"Fetched the release data in {result.timings.get('fetch', 0):.1f}s,"
+            f" peak memory {rss / 2**20:.0f} MiB",
+            highlight=False,
+        )
+
+    for env, status in unchanged.items():
+        outcome = "failed" if status else "passed"
+        console.print(f"{env}: unchanged since {changed_since}, previously {outcome}")
+
+    status_code = 1 if any(result.status.values()) or any(unchanged.values()) else 0
+    sys.exit(status_code)
+
+
+@main.command()
+@click.argument("environment_paths", type=str, nargs=-1)
+@click.option(
+    "--manifest-path",
+    "manifest_path",
+    type=_Path(exists=True, path_type=pathlib.Path),
+    default=None,
+)
+@click.option("--today", type=parse_date, default=None)
+@click.option("--policy", "policy_file", type=click.File(mode="r"), required=True)
+@click.option(
+    "--snapshot",
+    "snapshot_path",
+    type=_Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Load the release data from a snapshot instead of querying the channels.",
+)
+@shared_cache_option
+@low_memory_option
+@pypi_index_option
+def check(
+    today,
+    policy_file,
+    manifest_path,
+    environment_paths,
+    snapshot_path,
+    shared_cache,
+    low_memory,
+    pypi_index_url,
+):
     console = Console()
 
     policy = parse_policy(policy_file)
+    parsed_environments = parse_environments(environment_paths, manifest_path)
 
-    parsed_environments = {
-        path.rsplit(os.path.sep, maxsplit=1)[-1]: parse_environment(path, manifest_path)
-        for path in environment_paths
-    }
+    fetcher, pypi_fetcher = make_fetchers(
+        snapshot_path,
+        pypi_index_url,
+        default_cache_dir() if shared_cache else None,
+        low_memory=low_memory,
+    )
+    violations = asyncio.run(
+        check_environments(
+            policy,
+            parsed_environments,
+            today,
+            fetcher=fetcher,
+            pypi_fetcher=pypi_fetcher,
+        )
+    )
 
-    spec_warnings = {
-        env: {n: w for n, w in warnings_ if n not in policy.exclude}
-        for env, (_, warnings_) in parsed_environments.items()
-    }
-    environments = {
-        env: [spec for spec in specs if spec.name not in policy.exclude]
-        for env, (specs, _) in parsed_environments.items()
-    }
+    for violation in violations:
+        console.print(format_violation(violation), highlight=False)
+
+    sys.exit(1 if violations else 0)
+
+
+@main.command()
+@click.argument("environment_paths", type=str, nargs=-1)
+@click.option(
+    "--manifest-path",
+    "manifest_path",
+    type=_Path(exists=True, path_type=pathlib.Path),
+    default=None,
+)
+@click.option("--policy", "policy_file", type=click.File(mode="r"), required=True)
+@click.option(
+    "--since",
+    type=parse_date,
+    default=None,
+    help="Only replay commits after this date.",
+)
+@click.option(
+    "--snapshot",
+    "snapshot_path",
+    type=_Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Load the release data from a snapshot instead of querying the channels.",
+)
+@pypi_index_option
+def history(
+    policy_file, manifest_path, environment_paths, since, snapshot_path, pypi_index_url
+):
+    console = Console()
 
-    all_packages = list(
-        unique(
-            spec.name
-            for spec in concat(environments.values())
-            if spec.name not in policy.exclude
+    policy = parse_policy(policy_file)
+    # patterns are expanded using the current manifest
+    environment_paths = environments.expand_specifiers(environment_paths, manifest_path)
+    try:
+        history_root(list(map(split_specifier, environment_paths)), manifest_path)
+    except ValueError as e:
+        raise click.UsageError(str(e)) from None
+
+    fetcher, pypi_fetcher = make_fetchers(snapshot_path, pypi_index_url)
+    results = asyncio.run(
+        replay_history(
+            policy,
+            {environment_name(path): path for path in environment_paths},
+            manifest_path=manifest_path,
+            since=since,
+            fetcher=fetcher,
+            pypi_fetcher=pypi_fetcher,
         )
     )
 
-    package_releases = fetch_releases(policy.channels, policy.platforms, all_packages)
+    console.print(format_history_table(results))
 
-    if today is None:
-        today = datetime.date.today()
 
-    policy_versions = find_policy_versions(policy, today, package_releases)
+@main.command()
+@click.argument("environment_paths", type=str, nargs=-1)
+@click.option(
+    "--manifest-path",
+    "manifest_path",
+    type=_Path(exists=True, path_type=pathlib.Path),
+    default=None,
+)
+@click.option("--today", type=parse_date, default=None)
+@click.option("--policy", "policy_file", type=click.File(mode="r"), required=True)
+@click.option(
+    "--snapshot",
+    "snapshot_path",
+    type=_Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Load the release data from a snapshot instead of querying the channels.",
+)
+@click.option(
+    "--output",
+    "-o",
+    "output_path",
+    type=click.Path(dir_okay=False, writable=True, path_type=pathlib.Path),
+    default=None,
+    help="Write the metrics to a file instead of stdout.",
+)
+@click.option(
+    "--port",
+    type=int,
+    default=None,
+    help="Serve the metrics on this port instead of printing them once.",
+)
+@click.option("--host", type=str, default="127.0.0.1", show_default=True)
+@shared_cache_option
+@low_memory_option
+@pypi_index_option
+def metrics(
+    today,
+    policy_file,
+    manifest_path,
+    environment_paths,
+    snapshot_path,
+    output_path,
+    port,
+    host,
+    shared_cache,
+    low_memory,
+    pypi_index_url,
+):
+    policy = parse_policy(policy_file)
+
+    fetcher, pypi_fetcher = make_fetchers(
+        snapshot_path,
+        pypi_index_url,
+        default_cache_dir() if shared_cache else None,
+        low_memory=low_memory,
+    )
+    if port is not None and snapshot_path is None and not shared_cache:
+        # keep the release data in memory between scrapes, also in low-memory mode
+        cache = ReleaseCache()
+        fetcher = ReleaseFetcher(cache=cache, low_memory=low_memory)
+        pypi_fetcher = PyPIFetcher(index_url=pypi_index_url, cache=cache)
+
+    def collect():
+        result = asyncio.run(
+            validate_environments(
+                policy,
+                parse_environments(environment_paths, manifest_path),
+                today,
+                fetcher=fetcher,
+                pypi_fetcher=pypi_fetcher,
+            )
+        )
+        families = collect_metrics(
+            policy, result, cache=getattr(fetcher, "cache", None)
+        )
+
+        return format_openmetrics(families)
+
+    if port is not None:
+        server = make_metrics_server((host, port), collect)
+        with server:
+            server.serve_forever()
+    elif output_path is not None:
+        output_path.write_text(collect())
+    else:
+        click.echo(collect(), nl=False)
+
+
+@main.command()
+@click.argument("environment_paths", type=str, nargs=-1)
+@click.option(
+    "--manifest-path",
+    "manifest_path",
+    type=_Path(exists=True, path_type=pathlib.Path),
+    default=None,
+)
+@click.option("--policy", "policy_file", type=click.File(mode="r"), required=True)
+@click.option(
+    "--months",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=default_months,
+    show_default=True,
+    help="Policy windows to simulate, in months. Can be given multiple times.",
+)
+@click.option(
+    "--date",
+    "dates",
+    type=parse_date,
+    multiple=True,
+    help="Dates to simulate. Can be given multiple times. Defaults to today.",
+)
+@click.option(
+    "--package",
+    "packages",
+    type=str,
+    multiple=True,
+    help=(
+        "Packages whose window is changed. Defaults to the packages that use the"
+        " default window."
+    ),
+)
+@click.option(
+    "--snapshot",
+    "snapshot_path",
+    type=_Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Load the release data from a snapshot instead of querying the channels.",
+)
+@shared_cache_option
+@low_memory_option
+@pypi_index_option
+def simulate(
+    policy_file,
+    manifest_path,
+    environment_paths,
+    months,
+    dates,
+    packages,
+    snapshot_path,
+    shared_cache,
+    low_memory,
+    pypi_index_url,
+):
+    console = Console()
+
+    policy = parse_policy(policy_file)
+    parsed_environments = parse_environments(environment_paths, manifest_path)
 
-    status, violation_warnings = compare_versions(
-        environments, policy_versions, policy.ignored_violations
+    fetcher, pypi_fetcher = make_fetchers(
+        snapshot_path,
+        pypi_index_url,
+        default_cache_dir() if shared_cache else None,
+        low_memory=low_memory,
+    )
+    varied, configurations = asyncio.run(
+        simulate_environments(
+            policy,
+            parsed_environments,
+            list(months),
+            list(dates) or [datetime.date.today()],
+            packages=list(packages) or None,
+            fetcher=fetcher,
+            pypi_fetcher=pypi_fetcher,
+        )
     )
 
-    warnings = merge_warnings(spec_warnings, violation_warnings)
+    console.print(format_simulation_table(varied, configurations))
+
+
+@main.command()
+@click.argument("queries", type=str, nargs=-1, required=True)
+@click.option(
+    "--index",
+    "index_path",
+    type=_Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    required=True,
+    help="The index written by `validate --index`.",
+)
+def query(queries, index_path):
+    console = Console()
+
+    try:
+        parsed = [parse_query(text) for text in queries]
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="QUERIES") from None
+
+    with PinIndex(index_path) as index:
+        pins = [pin for query in parsed for pin in index.query(query)]
+
+    console.print(format_pin_table(pins))
 
-    release_lookup = {
-        n: {r.version: r for r in releases} for n, releases in package_releases.items()
-    }
 
-    grids = {
-        env: format_bump_table(
-            specs,
-            policy_versions,
-            release_lookup,
-            warnings[env],
-            policy.ignored_violations,
+@main.command()
+@click.option("--today", type=parse_date, default=None)
+@click.option("--policy", "policy_file", type=click.File(mode="r"), required=True)
+@click.option(
+    "--snapshot",
+    "snapshot_path",
+    type=_Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Load the release data from a snapshot instead of querying the channels.",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=0.2,
+    show_default=True,
+    help="Seconds to wait after an edit before updating the diagnostics.",
+)
+@shared_cache_option
+@pypi_index_option
+def lsp(today, policy_file, snapshot_path, debounce, shared_cache, pypi_index_url):
+    # the environment parsers are only imported by the commands that need them
+    from minimum_versions.lsp import LanguageServer
+
+    policy = parse_policy(policy_file)
+
+    fetcher, pypi_fetcher = make_fetchers(
+        snapshot_path, pypi_index_url, default_cache_dir() if shared_cache else None
+    )
+    if fetcher is None:
+        # the server is long-running, so the release data is kept in memory
+        cache = ReleaseCache()
+        fetcher = ReleaseFetcher(cache=cache)
+        pypi_fetcher = PyPIFetcher(index_url=pypi_index_url, cache=cache)
+
+    server = LanguageServer(
+        policy,
+        fetcher=fetcher,
+        pypi_fetcher=pypi_fetcher,
+        today=today,
+        debounce=debounce,
+    )
+    server.serve(sys.stdin.buffer, sys.stdout.buffer)
+
+
+@main.group()
+def snapshot():
+    pass
+
+
+@snapshot.command("export")
+@click.argument("environment_paths", type=str, nargs=-1)
+@click.option(
+    "--manifest-path",
+    "manifest_path",
+    type=_Path(exists=True, path_type=pathlib.Path),
+    default=None,
+)
+@click.option("--policy", "policy_file", type=click.File(mode="r"), required=True)
+@click.option(
+    "--output",
+    "-o",
+    "output_path",
+    type=click.Path(dir_okay=False, writable=True, path_type=pathlib.Path),
+    required=True,
+)
+@pypi_index_option
+def export(policy_file, manifest_path, environment_paths, output_path, pypi_index_url):
+    policy = parse_policy(policy_file)
+
+    environments, _ = filter_excluded(
+        policy, parse_environments(environment_paths, manifest_path)
+    )
+
+    _, pypi_fetcher = make_fetchers(None, pypi_index_url)
+    package_releases, pypi_releases = asyncio.run(
+        fetch_environment_releases(policy, environments, pypi_fetcher=pypi_fetcher)
+    )
+
+    # record the packages the index doesn't know, so replaying skips them as well
+    _, pypi_packages = find_sources(environments)
+    export_snapshot(
+        output_path,
+        package_releases,
+        policy.channels,
+        policy.platforms,
+        pypi_releases={name: pypi_releases.get(name) for name in pypi_packages},
+    )
+
+
+@snapshot.command("record")
+@click.argument("environment_paths", type=str, nargs=-1)
+@click.option(
+    "--manifest-path",
+    "manifest_path",
+    type=_Path(exists=True, path_type=pathlib.Path),
+    default=None,
+)
+@click.option("--policy", "policy_file", type=click.File(mode="r"), required=True)
+@click.option(
+    "--output",
+    "-o",
+    "output_path",
+    type=click.Path(dir_okay=False, writable=True, path_type=pathlib.Path),
+    required=True,
+)
+def record(policy_file, manifest_path, environment_paths, output_path):
+    policy = parse_policy(policy_file)
+
+    environments, _ = filter_excluded(
+        policy, parse_environments(environment_paths, manifest_path)
+    )
+
+    gateway = RecordingGateway(default_gateway())
+    fetcher = ReleaseFetcher(gateway=gateway)
+    asyncio.run(
+        fetcher.fetch(
+            policy.channels,
+            policy.platforms,
+            find_packages(environments, source="conda"),
         )
-        for env, specs in environments.items()
-    }
-    root_grid = Table.grid()
-    root_grid.add_column()
+    )
 
-    for env, grid in grids.items():
-        root_grid.add_row(Panel(grid, title=env, expand=True))
+    gateway.save(output_path)
 
-    console.print(root_grid)
 
-    status_code = 1 if any(status.values()) else 0
-    sys.exit(status_code)
+@main.command()
+@click.argument("environment_paths", type=str, nargs=-1)
+@click.option(
+    "--manifest-path",
+    "manifest_path",
+    type=_Path(exists=True, path_type=pathlib.Path),
+    default=None,
+)
+@click.option("--today", type=parse_date, default=None)
+@click.option("--policy", "policy_file", type=click.File(mode="r"), required=True)
+@click.option(
+    "--snapshot",
+    "snapshot_path",
+    type=_Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Load the release data from a snapshot instead of querying the channels.",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Show the changes as a diff instead of rewriting the files.",
+)
+@shared_cache_option
+@low_memory_option
+@pypi_index_option
+def bump(
+    today,
+    policy_file,
+    manifest_path,
+    environment_paths,
+    snapshot_path,
+    dry_run,
+    shared_cache,
+    low_memory,
+    pypi_index_url,
+):
+    from minimum_versions.bump import (
+        bump_targets,
+        pixi_table_prefix,
+        pixi_targets,
+        rewrite_conda_environment,
+        rewrite_files,
+        rewrite_pixi_manifest,
+    )
+    from minimum_versions.environments.pixi import load_pixi_config
+
+    console = Console()
+
+    policy = parse_policy(policy_file)
+    environment_paths = environments.expand_specifiers(environment_paths, manifest_path)
+    parsed_environments = parse_environments(environment_paths, manifest_path)
+
+    fetcher, pypi_fetcher = make_fetchers(
+        snapshot_path,
+        pypi_index_url,
+        default_cache_dir() if shared_cache else None,
+        low_memory=low_memory,
+    )
+    result = asyncio.run(
+        validate_environments(
+            policy,
+            parsed_environments,
+            today,
+            fetcher=fetcher,
+            pypi_fetcher=pypi_fetcher,
+        )
+    )
+    targets = bump_targets(result.environments, result.policy_versions)
+
+    rewrites = {}
+    pixi_environment_targets = {}
+    for specifier in environment_paths:
+        kind, path = split_specifier(specifier)
+        env_targets = targets[environment_name(specifier)]
+
+        if kind == "conda":
+            rewrites[pathlib.Path(path)] = partial(
+                rewrite_conda_environment, targets=env_targets
+            )
+        elif kind == "pixi":
+            pixi_environment_targets[path] = env_targets
+        else:
+            raise click.UsageError(f"Can't bump environments of kind {kind!r}.")
+
+    if pixi_environment_targets:
+        pixi_config = load_pixi_config(manifest_path)
+        rewrites[manifest_path] = partial(
+            rewrite_pixi_manifest,
+            targets=pixi_targets(pixi_config, pixi_environment_targets),
+            prefix=pixi_table_prefix(manifest_path),
+        )
+
+    diffs = rewrite_files(rewrites, dry_run=dry_run)
+
+    for path, diff in diffs.items():
+        if not diff:
+            continue
+
+        if dry_run:
+            console.print(Syntax(diff, "diff"))
+        else:
+            console.print(f"Updated {path}")
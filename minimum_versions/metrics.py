@@ -0,0 +1,185 @@
+import datetime
+import sys
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from minimum_versions.formatting import lookup_spec_release
+from minimum_versions.versions import comparison_version, is_newer
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+content_type = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# average length of a month in days
+month_length = 365.25 / 12
+
+
+@dataclass
+class MetricFamily:
+    name: str
+    type: str
+    help: str
+    samples: list = field(default_factory=list)
+
+    def add(self, value, **labels):
+        self.samples.append((labels, value))
+
+
+def as_date(timestamp):
+    if isinstance(timestamp, datetime.datetime):
+        return timestamp.date()
+
+    return timestamp
+
+
+def lag_months(required_date, policy_date):
+    days = (as_date(policy_date) - as_date(required_date)).days
+
+    return days / month_length
+
+
+def peak_rss():
+    # in bytes, or None where it can't be measured
+    if resource is None:
+        return None
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, other platforms kibibytes
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def collect_metrics(policy, result, cache=None):
+    lag = MetricFamily(
+        "minimum_versions_package_lag_months",
+        "gauge",
+        "Months the required version was released before the policy minimum version.",
+    )
+    violations = MetricFamily(
+        "minimum_versions_violations",
+        "gauge",
+        "Number of packages that are newer than the policy allows.",
+    )
+    durations = MetricFamily(
+        "minimum_versions_step_duration_seconds",
+        "gauge",
+        "Duration of the last fetch and evaluation of the release data.",
+    )
+
+    release_lookup = {
+        n: {r.version: r for r in releases} for n, releases in result.releases.items()
+    }
+    for env, specs in result.environments.items():
+        count = 0
+        for spec in specs:
+            policy_release = result.policy_versions[spec.name]
+            policy_version = comparison_version(policy_release.version)
+            if spec.version is None or is_newer(spec.version, policy_version):
+                count += spec.name not in policy.ignored_violations
+
+            if spec.version is None:
+                continue
+
+            if spec.timestamp is not None:
+                required_date = spec.timestamp
+            else:
+                required_release = lookup_spec_release(spec, release_lookup)
+                if isinstance(required_release.version, str):
+                    # the required version is unknown
+                    continue
+                required_date = required_release.timestamp
+
+            if required_date is None:
+                continue
+
+            lag.add(
+                lag_months(required_date, policy_release.timestamp),
+                environment=env,
+                package=spec.name,
+            )
+
+        violations.add(count, environment=env)
+
+    for step, duration in result.timings.items():
+        durations.add(duration, step=step)
+
+    families = [lag, violations, durations]
+
+    if (rss := peak_rss()) is not None:
+        memory = MetricFamily(
+            "minimum_versions_peak_rss_bytes",
+            "gauge",
+            "Peak resident memory of the process.",
+        )
+        memory.add(rss)
+        families.append(memory)
+
+    if cache is not None:
+        lookups = MetricFamily(
+            "minimum_versions_cache_lookups",
+            "counter",
+            "Lookups of the release cache.",
+        )
+        lookups.add(cache.stats.hits, result="hit")
+        lookups.add(cache.stats.misses, result="miss")
+        families.append(lookups)
+
+    return families
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_sample(name, labels, value):
+    if labels:
+        formatted = ",".join(f'{k}="{escape_label(v)}"' for k, v in labels.items())
+        name = f"{name}{{{formatted}}}"
+
+    return f"{name} {value:g}" if isinstance(value, float) else f"{name} {value}"
+
+
+def format_openmetrics(families):
+    lines = []
+    for family in families:
+        lines.append(f"# TYPE {family.name} {family.type}")
+        lines.append(f"# HELP {family.name} {family.help}")
+
+        # counters have a "_total" suffix on their samples
+        sample_name = (
+            f"{family.name}_total" if family.type == "counter" else family.name
+        )
+        lines.extend(
+            format_sample(sample_name, labels, value)
+            for labels, value in family.samples
+        )
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = self.server.collect().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_metrics_server(address, collect):
+    # scrapes are handled one at a time, so they can share the fetchers and caches
+    server = HTTPServer(address, MetricsHandler)
+    server.collect = collect
+
+    return server
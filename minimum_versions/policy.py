@@ -7,6 +7,8 @@ from dateutil.relativedelta import relativedelta
 from rattler import Version
 from tlz.dicttoolz import valmap
 
+from minimum_versions.versions import parse_version
+
 schema = {
     "type": "object",
     "properties": {
@@ -77,8 +79,22 @@ class Policy:
     exclude: list[str] = field(default_factory=list)
 
     def minimum_version(self, today, package_name, releases):
+        return self.minimum_versions([today], package_name, releases)[today]
+
+    def minimum_versions(self, dates, package_name, releases):
+        policy_months = self.package_months.get(package_name, self.default_months)
+        grid = self.minimum_versions_grid(
+            [policy_months], dates, package_name, releases
+        )
+
+        return grid[policy_months]
+
+    def minimum_versions_grid(self, months, dates, package_name, releases):
+        # {months: {date: release}}, filtering the releases only once for all
+        # combinations of policy windows and dates
         if (override := self.overrides.get(package_name)) is not None:
-            return find_release(releases, version=override)
+            release = find_release(releases, version=override)
+            return {months_: {today: release for today in dates} for months_ in months}
 
         suitable_releases = [
             release for release in releases if is_suitable_release(release)
@@ -86,15 +102,19 @@ class Policy:
         if not suitable_releases:
             raise ValueError(f"Cannot find valid releases for {package_name}")
 
-        policy_months = self.package_months.get(package_name, self.default_months)
+        release_dates = [release.timestamp.date() for release in suitable_releases]
 
-        cutoff_date = today - relativedelta(months=policy_months)
+        grid = {}
+        for months_ in months:
+            minimum_versions = grid[months_] = {}
+            for today in dates:
+                cutoff_date = today - relativedelta(months=months_)
+                index = bisect.bisect_left(release_dates, cutoff_date)
+                minimum_versions[today] = suitable_releases[
+                    index - 1 if index > 0 else 0
+                ]
 
-        index = bisect.bisect_left(
-            suitable_releases, cutoff_date, key=lambda x: x.timestamp.date()
-        )
-
-        return suitable_releases[index - 1 if index > 0 else 0]
+        return grid
 
 
 def parse_policy(f):
@@ -116,7 +136,7 @@ def parse_policy(f):
         package_months=package_policy["packages"],
         default_months=package_policy["default"],
         ignored_violations=package_policy["ignored_violations"],
-        overrides=valmap(Version, package_policy["overrides"]),
+        overrides=valmap(parse_version, package_policy["overrides"]),
     )
 
 
@@ -125,3 +145,27 @@ def find_policy_versions(policy, today, releases):
         name: policy.minimum_version(today, name, package_releases)
         for name, package_releases in releases.items()
     }
+
+
+def find_platform_versions(policy, today, policy_versions, releases, platform_releases):
+    # {name: {platform: release}}, only for the platforms where the minimum version
+    # differs from the one computed from the releases of all platforms
+    platform_versions = {}
+    for name in platform_releases.timestamps:
+        if name in policy.overrides or name not in policy_versions:
+            continue
+
+        for platform in platform_releases.platforms:
+            on_platform = platform_releases.releases(name, releases[name], platform)
+            if not on_platform:
+                continue
+
+            try:
+                release = policy.minimum_version(today, name, on_platform)
+            except ValueError:
+                continue
+
+            if release.version != policy_versions[name].version:
+                platform_versions.setdefault(name, {})[platform] = release
+
+    return platform_versions
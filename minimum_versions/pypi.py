@@ -0,0 +1,177 @@
+import asyncio
+import datetime
+import json
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from rattler.exceptions import InvalidVersionError
+
+from minimum_versions.cache import missing, single_flight
+from minimum_versions.release import Release
+from minimum_versions.versions import parse_version
+
+default_index_url = "https://pypi.org/simple"
+simple_api_media_type = "application/vnd.pypi.simple.v1+json"
+
+sdist_extensions = (".tar.gz", ".tar.bz2", ".tar.xz", ".tgz", ".zip", ".tar")
+
+
+def version_from_filename(filename):
+    if filename.endswith(".whl"):
+        return filename.split("-")[1]
+
+    for extension in sdist_extensions:
+        if filename.endswith(extension):
+            stem = filename.removesuffix(extension)
+            return stem.rsplit("-", maxsplit=1)[-1]
+
+    return None
+
+
+def parse_upload_time(text):
+    timestamp = datetime.datetime.fromisoformat(text)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=datetime.UTC)
+
+    return timestamp
+
+
+def releases_from_files(files):
+    # files: iterable of (version, upload time, yanked)
+    earliest = {}
+    for version_text, upload_time, yanked in files:
+        if version_text is None or upload_time is None or yanked:
+            continue
+
+        try:
+            version = parse_version(version_text)
+        except InvalidVersionError:
+            continue
+
+        timestamp = parse_upload_time(upload_time)
+        if version not in earliest or timestamp < earliest[version]:
+            earliest[version] = timestamp
+
+    return sorted(
+        Release(version=version, build_number=0, timestamp=timestamp)
+        for version, timestamp in earliest.items()
+    )
+
+
+def parse_simple_page(data):
+    return releases_from_files(
+        (
+            version_from_filename(file["filename"]),
+            file.get("upload-time"),
+            bool(file.get("yanked", False)),
+        )
+        for file in data["files"]
+    )
+
+
+def parse_json_page(data):
+    return releases_from_files(
+        (version, file.get("upload_time_iso_8601"), file.get("yanked", False))
+        for version, files in data["releases"].items()
+        for file in files
+    )
+
+
+class PyPIFetcher:
+    def __init__(
+        self,
+        index_url=default_index_url,
+        api="simple",
+        cache=None,
+        max_concurrent_requests=16,
+        timeout=60,
+    ):
+        if api not in ("simple", "json"):
+            raise ValueError(f"Unknown PyPI api: {api!r}")
+
+        self.index_url = index_url.rstrip("/")
+        self.api = api
+        self.cache = cache
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_requests)
+        self._in_flight = {}
+
+    def _request(self, name):
+        if self.api == "simple":
+            url = f"{self.index_url}/{name}/"
+            headers = {"Accept": simple_api_media_type}
+        else:
+            url = f"{self.index_url}/{name}/json"
+            headers = {"Accept": "application/json"}
+
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    async def _fetch_package(self, name):
+        key = ("pypi", self.index_url, name)
+        async with single_flight(self.cache, [key]) as locked:
+            # another process might have fetched it while we were waiting
+            if locked and (cached := self._lookup(name)) is not missing:
+                return cached
+
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(self._executor, self._request, name)
+
+            if data is None:
+                releases = None
+            elif self.api == "simple":
+                releases = parse_simple_page(data)
+            else:
+                releases = parse_json_page(data)
+
+            if self.cache is not None:
+                self.cache.put(key, releases)
+
+        return releases
+
+    def _lookup(self, name):
+        if self.cache is None:
+            return missing
+
+        return self.cache.get(("pypi", self.index_url, name))
+
+    async def fetch(self, packages):
+        found = {}
+        queries = {}
+        for name in packages:
+            if (cached := self._lookup(name)) is not missing:
+                found[name] = cached
+            elif (query := self._in_flight.get(name)) is not None:
+                queries[name] = query
+            else:
+                query = asyncio.ensure_future(self._fetch_package(name))
+                query.add_done_callback(partial(self._forget, name))
+                self._in_flight[name] = query
+                queries[name] = query
+
+        results = await asyncio.gather(*map(asyncio.shield, queries.values()))
+        found.update(zip(queries, results))
+
+        return {name: found[name] for name in packages if found.get(name) is not None}
+
+    def _forget(self, name, _):
+        self._in_flight.pop(name, None)
+
+
+async def fetch_pypi_releases(packages, fetcher=None):
+    if not packages:
+        return {}
+
+    if fetcher is None:
+        fetcher = PyPIFetcher()
+
+    return await fetcher.fetch(packages)
@@ -0,0 +1,115 @@
+import datetime
+import gzip
+import json
+from dataclasses import dataclass
+
+from rattler import PackageName, Version
+from tlz.itertoolz import groupby
+
+from minimum_versions.versions import parse_version
+
+format_version = 1
+
+
+@dataclass(frozen=True)
+class RecordedRecord:
+    # the subset of the repodata record used to compute releases
+    name: PackageName
+    version: Version
+    build_number: int
+    timestamp: datetime.datetime | None
+    channel: str
+    subdir: str
+
+
+def encode_record(channel, record):
+    timestamp = record.timestamp.isoformat() if record.timestamp is not None else None
+    return [
+        channel,
+        record.subdir,
+        record.name.normalized,
+        str(record.version),
+        record.build_number,
+        timestamp,
+    ]
+
+
+def decode_record(data):
+    channel, subdir, name, version, build_number, timestamp = data
+    return RecordedRecord(
+        name=PackageName(name),
+        version=parse_version(version),
+        build_number=build_number,
+        timestamp=(
+            datetime.datetime.fromisoformat(timestamp)
+            if timestamp is not None
+            else None
+        ),
+        channel=channel,
+        subdir=subdir,
+    )
+
+
+def export_recording(path, rows):
+    data = {"version": format_version, "records": sorted(rows, key=json.dumps)}
+
+    # mtime=0 makes the compressed file byte-for-byte reproducible
+    payload = json.dumps(data, separators=(",", ":")).encode()
+    with open(path, mode="wb") as f:
+        f.write(gzip.compress(payload, mtime=0))
+
+
+def load_recording(path):
+    with gzip.open(path, mode="rb") as f:
+        data = json.loads(f.read())
+
+    if data.get("version") != format_version:
+        raise ValueError(
+            f"Unsupported recording format: {data.get('version')!r}"
+            f" (expected {format_version})"
+        )
+
+    return [decode_record(row) for row in data["records"]]
+
+
+class RecordingGateway:
+    def __init__(self, gateway):
+        self.gateway = gateway
+        self.rows = {}
+
+    async def query(self, channels, platforms, specs, recursive=True):
+        results = await self.gateway.query(
+            channels, platforms, specs, recursive=recursive
+        )
+
+        # the gateway returns one list of records per channel
+        for channel, records in zip(channels, results):
+            for record in records:
+                row = encode_record(str(channel), record)
+                self.rows[json.dumps(row)] = row
+
+        return results
+
+    def save(self, path):
+        export_recording(path, self.rows.values())
+
+
+class ReplayGateway:
+    def __init__(self, path):
+        self.records = groupby(
+            lambda r: (r.channel, r.subdir, r.name.normalized), load_recording(path)
+        )
+
+    async def query(self, channels, platforms, specs, recursive=True):
+        if recursive:
+            raise ValueError("Recorded queries can't be replayed recursively.")
+
+        return [
+            [
+                record
+                for platform in platforms
+                for name in specs
+                for record in self.records.get((str(channel), platform, name), [])
+            ]
+            for channel in channels
+        ]
@@ -1,11 +1,15 @@
 import asyncio
 import datetime
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from functools import partial
+from itertools import product
 
 from rattler import Gateway, Version
 from rattler.networking import Client
 from tlz.functoolz import curry, pipe
-from tlz.itertoolz import concat, groupby
+from tlz.itertoolz import concat, groupby, unique
+
+from minimum_versions.cache import missing, single_flight
 
 
 @dataclass(order=True)
@@ -47,12 +51,7 @@ def deduplicate_releases(package_info):
     }
 
 
-def fetch_releases(channels, platforms, all_packages):
-    gateway = Gateway(client=Client.default_client(timeout=120))
-
-    query = gateway.query(channels, platforms, all_packages, recursive=False)
-    records = asyncio.run(query)
-
+def process_records(records):
     return pipe(
         records,
         concat,
@@ -60,3 +59,239 @@ def fetch_releases(channels, platforms, all_packages):
         curry(filter_releases, lambda r: r.timestamp is not None),
         deduplicate_releases,
     )
+
+
+def default_gateway(cache_dir=None):
+    return Gateway(cache_dir=cache_dir, client=Client.default_client(timeout=120))
+
+
+def combine_releases(releases):
+    # merge the releases of multiple subdirs, keeping the earliest release of each version
+    return deduplicate_releases(
+        {name: sorted(concat(groups)) for name, groups in releases.items()}
+    )
+
+
+def fold_releases(earliest, releases):
+    # earliest: {name: {version: release}}, keeping the earliest release of each version
+    for name, package_releases in releases.items():
+        versions = earliest.setdefault(name, {})
+        for release in package_releases:
+            current = versions.get(release.version)
+            if current is None or release.timestamp < current.timestamp:
+                versions[release.version] = release
+
+    return earliest
+
+
+def fold_platform_releases(earliest, index, count, releases):
+    # earliest: {name: {version: [earliest release, [earliest timestamp per platform]]}}
+    for name, package_releases in releases.items():
+        versions = earliest.setdefault(name, {})
+        for release in package_releases:
+            entry = versions.get(release.version)
+            if entry is None:
+                entry = versions[release.version] = [release, [None] * count]
+            elif release.timestamp < entry[0].timestamp:
+                entry[0] = release
+
+            timestamps = entry[1]
+            if timestamps[index] is None or release.timestamp < timestamps[index]:
+                timestamps[index] = release.timestamp
+
+    return earliest
+
+
+@dataclass
+class PlatformReleases:
+    platforms: tuple[str, ...]
+    # {name: [timestamps per platform]}, aligned with the combined releases and
+    # `None` for versions that don't exist on a platform
+    timestamps: dict
+
+    def releases(self, name, combined, platform):
+        index = self.platforms.index(platform)
+        return [
+            replace(release, timestamp=timestamps[index])
+            for release, timestamps in zip(combined, self.timestamps[name], strict=True)
+            if timestamps[index] is not None
+        ]
+
+
+def split_platform_releases(earliest, platforms, packages):
+    combined = {}
+    timestamps = {}
+    for name in packages:
+        if name not in earliest:
+            continue
+
+        entries = sorted(earliest[name].values(), key=lambda entry: entry[0])
+        combined[name] = [release for release, _ in entries]
+        timestamps[name] = [
+            tuple(platform_timestamps) for _, platform_timestamps in entries
+        ]
+
+    return combined, PlatformReleases(tuple(platforms), timestamps)
+
+
+class ReleaseFetcher:
+    def __init__(self, gateway=None, cache=None, low_memory=False):
+        self.gateway = gateway if gateway is not None else default_gateway()
+        self.cache = cache
+        # query the subdirs one at a time, and drop their repodata after reducing it
+        self.low_memory = low_memory
+        self._in_flight = {}
+
+    async def _query(self, channel, platform, packages):
+        keys = {name: (channel, platform, name) for name in packages}
+        async with single_flight(self.cache, keys.values()) as locked:
+            results = {}
+            if locked:
+                # another process might have fetched them while we were waiting
+                results = {
+                    name: cached
+                    for name, key in keys.items()
+                    if (cached := self._lookup(key)) is not missing
+                }
+
+            remaining = [name for name in packages if name not in results]
+            if remaining:
+                records = await self.gateway.query(
+                    [channel], [platform], remaining, recursive=False
+                )
+                releases = process_records(records)
+
+                for name in remaining:
+                    # `None` marks packages that don't exist in this subdir
+                    results[name] = releases.get(name)
+                    if self.cache is not None:
+                        self.cache.put(keys[name], results[name])
+
+        return results
+
+    def _forget(self, keys, _):
+        for key in keys:
+            self._in_flight.pop(key, None)
+
+    def _lookup(self, key):
+        if self.cache is None:
+            return missing
+
+        return self.cache.get(key)
+
+    async def _fetch_subdir(self, channel, platform, packages):
+        found = {}
+        to_query = []
+        for name in packages:
+            cached = self._lookup((channel, platform, name))
+            if cached is not missing:
+                found[name] = cached
+            else:
+                to_query.append(name)
+
+        if to_query:
+            found.update(await self._query(channel, platform, to_query))
+            if hasattr(self.gateway, "clear_repodata_cache"):
+                self.gateway.clear_repodata_cache(channel, [platform])
+
+        # `None` marks packages that don't exist in this subdir
+        return {
+            name: releases for name, releases in found.items() if releases is not None
+        }
+
+    async def _fetch_sequentially(self, channels, platforms, packages):
+        earliest = {}
+        for channel, platform in product(channels, platforms):
+            fold_releases(
+                earliest, await self._fetch_subdir(channel, platform, packages)
+            )
+
+        return {
+            name: sorted(earliest[name].values())
+            for name in packages
+            if name in earliest
+        }
+
+    async def _fetch_concurrently(self, subdirs, packages):
+        found = {}
+        queries = {}
+        for channel, platform in subdirs:
+            to_query = []
+            for name in packages:
+                key = (channel, platform, name)
+                if (cached := self._lookup(key)) is not missing:
+                    found[key] = cached
+                elif (query := self._in_flight.get(key)) is not None:
+                    # join the identical query that is already running
+                    queries[key] = query
+                else:
+                    to_query.append(name)
+
+            if not to_query:
+                continue
+
+            query = asyncio.ensure_future(self._query(channel, platform, to_query))
+            keys = [(channel, platform, name) for name in to_query]
+            self._in_flight.update(dict.fromkeys(keys, query))
+            query.add_done_callback(partial(self._forget, keys))
+            queries.update(dict.fromkeys(keys, query))
+
+        await asyncio.gather(*map(asyncio.shield, unique(queries.values())))
+        found.update({key: query.result()[key[2]] for key, query in queries.items()})
+
+        return found
+
+    async def fetch(self, channels, platforms, packages):
+        if self.low_memory:
+            return await self._fetch_sequentially(channels, platforms, packages)
+
+        subdirs = list(product(channels, platforms))
+        found = await self._fetch_concurrently(subdirs, packages)
+
+        subdir_releases = {
+            name: [found[(channel, platform, name)] for channel, platform in subdirs]
+            for name in packages
+        }
+        return combine_releases(
+            {
+                name: [releases for releases in groups if releases is not None]
+                for name, groups in subdir_releases.items()
+                if any(releases is not None for releases in groups)
+            }
+        )
+
+    async def fetch_per_platform(self, channels, platforms, packages):
+        # the combined releases and the timestamps of each release per platform,
+        # folded in a single pass over the releases of all subdirs
+        earliest = {}
+        subdirs = list(product(channels, platforms))
+        if self.low_memory:
+            for channel, platform in subdirs:
+                releases = await self._fetch_subdir(channel, platform, packages)
+                fold_platform_releases(
+                    earliest, platforms.index(platform), len(platforms), releases
+                )
+        else:
+            found = await self._fetch_concurrently(subdirs, packages)
+            for channel, platform in subdirs:
+                releases = {
+                    name: found[(channel, platform, name)]
+                    for name in packages
+                    if found[(channel, platform, name)] is not None
+                }
+                fold_platform_releases(
+                    earliest, platforms.index(platform), len(platforms), releases
+                )
+
+        return split_platform_releases(earliest, platforms, packages)
+
+
+async def fetch_releases_async(channels, platforms, all_packages, fetcher=None):
+    if fetcher is None:
+        fetcher = ReleaseFetcher()
+
+    return await fetcher.fetch(channels, platforms, all_packages)
+
+
+def fetch_releases(channels, platforms, all_packages):
+    return asyncio.run(fetch_releases_async(channels, platforms, all_packages))
@@ -0,0 +1,55 @@
+import copyreg
+import re
+from functools import cache
+
+from rattler import Version
+
+from minimum_versions.snapshot import decode_releases, read_snapshot
+from minimum_versions.versions import parse_version
+
+shard_re = re.compile(r"^(?P<index>\d+)/(?P<count>\d+)$")
+
+
+# rattler versions can't be pickled, so they are sent to worker processes as strings
+copyreg.pickle(Version, lambda version: (parse_version, (str(version),)))
+
+
+def parse_shard(text):
+    match = shard_re.match(text)
+    if match is None:
+        raise ValueError(f"Invalid shard {text!r}, expected 'i/N'.")
+
+    index, count = int(match["index"]), int(match["count"])
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {text!r}, expected 1 <= i <= N.")
+
+    return index, count
+
+
+def select_shard(items, index, count):
+    # sorting makes the selection independent of the order of the arguments
+    selected = set(sorted(set(items))[index - 1 :: count])
+
+    return [item for item in items if item in selected]
+
+
+def split_shards(environments, count):
+    names = list(environments)
+    shards = [
+        {env: environments[env] for env in names[index::count]}
+        for index in range(count)
+    ]
+
+    return [shard for shard in shards if shard]
+
+
+@cache
+def read_shared_snapshot(path):
+    # a worker can receive more than one shard, but only reads the snapshot once
+    return read_snapshot(path)["packages"]
+
+
+def load_shared_releases(path, packages):
+    data = read_shared_snapshot(path)
+
+    return decode_releases(data, [name for name in packages if name in data])
@@ -0,0 +1,89 @@
+import datetime
+import itertools
+from dataclasses import dataclass
+
+from tlz.dicttoolz import merge
+
+from minimum_versions.environments import find_violations
+from minimum_versions.validation import (
+    drop_unknown_packages,
+    fetch_environment_releases,
+    filter_excluded,
+    find_packages,
+)
+
+default_months = [6, 9, 12, 18, 24, 30]
+
+
+@dataclass
+class Configuration:
+    months: int
+    date: datetime.date
+    policy_versions: dict
+    # {env: names of the violating packages}
+    violations: dict
+
+
+def varied_packages(policy, names, packages=None):
+    # by default, the windows of all packages that use the default window change
+    if packages is None:
+        return [name for name in names if name not in policy.package_months]
+
+    return [name for name in names if name in packages]
+
+
+def simulate(policy, environments, package_releases, months, dates, packages=None):
+    names = find_packages(environments)
+    varied = varied_packages(policy, names, packages)
+
+    # the minimum versions of all grid points are computed in one pass per package
+    grids = {
+        name: policy.minimum_versions_grid(months, dates, name, package_releases[name])
+        for name in varied
+    }
+    fixed = {
+        name: policy.minimum_versions(dates, name, package_releases[name])
+        for name in names
+        if name not in grids
+    }
+
+    configurations = []
+    for months_, date in itertools.product(months, dates):
+        policy_versions = merge(
+            {name: versions[date] for name, versions in fixed.items()},
+            {name: grid[months_][date] for name, grid in grids.items()},
+        )
+        violations = find_violations(
+            environments, policy_versions, policy.ignored_violations
+        )
+        configurations.append(Configuration(months_, date, policy_versions, violations))
+
+    return varied, configurations
+
+
+async def simulate_environments(
+    policy,
+    parsed_environments,
+    months,
+    dates,
+    packages=None,
+    fetcher=None,
+    pypi_fetcher=None,
+):
+    environments, _ = filter_excluded(policy, parsed_environments)
+
+    conda_releases, pypi_releases = await fetch_environment_releases(
+        policy, environments, fetcher=fetcher, pypi_fetcher=pypi_fetcher
+    )
+
+    package_releases = merge(pypi_releases, conda_releases)
+    environments, _ = drop_unknown_packages(environments, package_releases)
+
+    return simulate(
+        policy,
+        environments,
+        package_releases,
+        months,
+        dates,
+        packages=packages,
+    )
@@ -0,0 +1,121 @@
+import datetime
+import gzip
+import json
+
+from minimum_versions.release import Release
+from minimum_versions.versions import parse_version
+
+format_version = 1
+
+
+def encode_release(release):
+    timestamp = release.timestamp.isoformat() if release.timestamp is not None else None
+    return [str(release.version), release.build_number, timestamp]
+
+
+def decode_release(data):
+    version, build_number, timestamp = data
+    return Release(
+        version=parse_version(version),
+        build_number=build_number,
+        timestamp=(
+            datetime.datetime.fromisoformat(timestamp)
+            if timestamp is not None
+            else None
+        ),
+    )
+
+
+def encode_releases(releases):
+    return {
+        name: encode_package_releases(package_releases)
+        for name, package_releases in sorted(releases.items())
+    }
+
+
+def encode_package_releases(releases):
+    # `None` marks packages that don't exist
+    if releases is None:
+        return None
+
+    return [encode_release(release) for release in releases]
+
+
+def decode_package_releases(data):
+    if data is None:
+        return None
+
+    return [decode_release(release) for release in data]
+
+
+def export_snapshot(path, releases, channels, platforms, pypi_releases=None):
+    data = {
+        "version": format_version,
+        "channels": list(channels),
+        "platforms": list(platforms),
+        "packages": encode_releases(releases),
+        "pypi": encode_releases(pypi_releases or {}),
+    }
+
+    # mtime=0 makes the compressed file byte-for-byte reproducible
+    payload = json.dumps(data, separators=(",", ":")).encode()
+    with open(path, mode="wb") as f:
+        f.write(gzip.compress(payload, mtime=0))
+
+
+def read_snapshot(path):
+    with gzip.open(path, mode="rb") as f:
+        data = json.loads(f.read())
+
+    if data.get("version") != format_version:
+        raise ValueError(
+            f"Unsupported snapshot format: {data.get('version')!r}"
+            f" (expected {format_version})"
+        )
+
+    return data
+
+
+def decode_releases(data, packages):
+    missing = [name for name in packages if name not in data]
+    if missing:
+        raise ValueError(f"Packages missing from the snapshot: {', '.join(missing)}")
+
+    # packages the index doesn't know are left out, like the live fetchers do
+    return {
+        name: decode_package_releases(data[name])
+        for name in packages
+        if data[name] is not None
+    }
+
+
+def load_snapshot(path, channels, platforms, packages):
+    data = read_snapshot(path)
+
+    if data["channels"] != list(channels) or data["platforms"] != list(platforms):
+        raise ValueError(
+            "Snapshot was created for different channels or platforms:"
+            f" {data['channels']} / {data['platforms']}"
+        )
+
+    return decode_releases(data["packages"], packages)
+
+
+def load_pypi_snapshot(path, packages):
+    return decode_releases(read_snapshot(path).get("pypi", {}), packages)
+
+
+class SnapshotFetcher:
+    def __init__(self, path):
+        self.path = path
+
+    async def fetch(self, channels, platforms, packages):
+        return load_snapshot(self.path, channels, platforms, packages)
+
+
+class SnapshotPyPIFetcher:
+    def __init__(self, path):
+        self.path = path
+
+    async def fetch(self, packages):
+        return load_pypi_snapshot(self.path, packages)
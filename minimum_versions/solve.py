@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import asdict, dataclass
+
+from rattler import GenericVirtualPackage, PackageName, Version, solve
+from rattler.exceptions import SolverError
+
+from minimum_versions.cache import atomic_write
+from minimum_versions.closure import conda_specs, pin_spec
+
+
+@dataclass
+class SolveResult:
+    solvable: bool
+    message: str = ""
+
+
+archspecs = {
+    "64": "x86_64",
+    "aarch64": "aarch64",
+    "arm64": "arm64",
+    "ppc64le": "ppc64le",
+}
+
+
+def virtual_packages(platform):
+    os_name, _, arch = platform.partition("-")
+
+    versions = {
+        "linux": {"__unix": "0", "__linux": "5.10", "__glibc": "2.28"},
+        "osx": {"__unix": "0", "__osx": "13.0"},
+        "win": {"__win": "0"},
+    }.get(os_name, {})
+
+    packages = [
+        GenericVirtualPackage(PackageName(name), Version(version), "0")
+        for name, version in versions.items()
+    ]
+    if arch in archspecs:
+        packages.append(
+            GenericVirtualPackage(
+                PackageName("__archspec"), Version("1"), archspecs[arch]
+            )
+        )
+
+    return packages
+
+
+def solve_platforms(platforms):
+    # noarch packages can't be solved on their own
+    return [platform for platform in platforms if platform != "noarch"] or ["linux-64"]
+
+
+def match_specs(specs):
+    return sorted(
+        pin_spec(spec) if spec.version is not None else spec.name
+        for spec in conda_specs(specs)
+    )
+
+
+def solve_key(channels, platform, specs):
+    data = json.dumps([list(channels), platform, specs])
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class SolveCache:
+    def __init__(self, root, ttl=24 * 3600):
+        self.root = root
+        self.ttl = ttl
+
+    def get(self, key):
+        path = self.root / f"{key}.json"
+        try:
+            if self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl:
+                return None
+
+            return SolveResult(**json.loads(path.read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(self, key, result):
+        atomic_write(self.root / f"{key}.json", json.dumps(asdict(result)))
+
+
+async def solve_specs(gateway, channels, platform, specs):
+    try:
+        await solve(
+            channels,
+            specs,
+            gateway=gateway,
+            platforms=[platform, "noarch"],
+            virtual_packages=virtual_packages(platform),
+        )
+    except SolverError as e:
+        return SolveResult(solvable=False, message=str(e))
+
+    return SolveResult(solvable=True)
+
+
+async def solve_environments(policy, environments, gateway, cache=None):
+    platforms = solve_platforms(policy.platforms)
+
+    # the solves run on the rattler thread pool, so they are spread across cores
+    tasks = {}
+    cached = {}
+    keys = {}
+    for env, specs in environments.items():
+        match_specs_ = match_specs(specs)
+        for platform in platforms:
+            key = solve_key(policy.channels, platform, match_specs_)
+            keys[(env, platform)] = key
+
+            if key in tasks or key in cached:
+                continue
+
+            result = cache.get(key) if cache is not None else None
+            if result is not None:
+                cached[key] = result
+            else:
+                tasks[key] = solve_specs(
+                    gateway, policy.channels, platform, match_specs_
+                )
+
+    results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+    if cache is not None:
+        for key, result in results.items():
+            cache.put(key, result)
+    results.update(cached)
+
+    solves = {}
+    for (env, platform), key in keys.items():
+        solves.setdefault(env, {})[platform] = results[key]
+
+    return solves
@@ -0,0 +1,36 @@
+import datetime as dt
+
+import pytest
+from rattler import Version
+
+from minimum_versions.release import Release
+
+
+class FakeFetcher:
+    def __init__(self, releases):
+        self.releases = releases
+        self.requested = []
+
+    async def fetch(self, channels, platforms, packages):
+        self.requested.append(list(packages))
+        return {name: self.releases[name] for name in packages}
+
+
+@pytest.fixture
+def fake_fetcher():
+    return FakeFetcher
+
+
+@pytest.fixture
+def releases():
+    yield {
+        "numpy": [
+            Release(Version("1.24.0"), 0, dt.datetime(2022, 12, 18, tzinfo=dt.UTC)),
+            Release(Version("1.25.0"), 0, dt.datetime(2023, 6, 17, tzinfo=dt.UTC)),
+            Release(Version("1.26.0"), 0, dt.datetime(2023, 9, 16, tzinfo=dt.UTC)),
+        ],
+        "python": [
+            Release(Version("3.10.0"), 0, dt.datetime(2021, 10, 5, tzinfo=dt.UTC)),
+            Release(Version("3.11.0"), 0, dt.datetime(2022, 10, 25, tzinfo=dt.UTC)),
+        ],
+    }
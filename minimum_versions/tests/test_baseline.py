@@ -0,0 +1,129 @@
+import textwrap
+
+from click.testing import CliRunner
+
+from minimum_versions import baseline
+from minimum_versions.main import main
+from minimum_versions.snapshot import export_snapshot
+
+
+def test_baseline_entries():
+    tables = {
+        "env1": [
+            ("numpy", "1.26", "2023-09-16", "1.24", "2022-12-18", ">"),
+            ("python", "3.10", "2021-10-05", "3.10", "2021-10-05", "="),
+        ]
+    }
+
+    actual = baseline.baseline_entries(tables, ignored_violations=["numpy"])
+    expected = {
+        "env1": {"numpy": ["1.26", "1.24", "="], "python": ["3.10", "3.10", "="]}
+    }
+
+    assert actual == expected
+
+
+def test_diff_baseline():
+    previous = {
+        "env1": {
+            "numpy": ["1.25", "1.25", "="],
+            "python": ["3.10", "3.10", "="],
+            "scipy": ["1.11", "1.12", "<"],
+        },
+    }
+    entries = {
+        "env1": {
+            "numpy": ["1.25", "1.24", ">"],
+            "python": ["3.10", "3.11", "<"],
+            "scipy": ["1.11", "1.13", "<"],
+            "xarray": ["", "2024.1", "!"],
+        },
+        "env2": {"python": ["3.10", "3.10", "="]},
+    }
+
+    actual = baseline.diff_baseline(previous, entries)
+    expected = {
+        "env1": [
+            baseline.Change(
+                "numpy", "violation", "1.25 (policy 1.25)", "1.25 (policy 1.24)"
+            ),
+            baseline.Change(
+                "python", "bump", "3.10 (policy 3.10)", "3.10 (policy 3.11)"
+            ),
+            # policy changes are only reported on their own without other changes
+            baseline.Change("scipy", "policy", "1.12", "1.13"),
+            baseline.Change("xarray", "violation", "", "unpinned (policy 2024.1)"),
+        ]
+    }
+
+    assert actual == expected
+
+
+def test_save_baseline_prunes_environments(tmp_path):
+    path = tmp_path / "baseline.json"
+    previous = {
+        "env1": {"numpy": ["1.25", "1.25", "="]},
+        "env2": {"numpy": ["1.24", "1.25", "<"]},
+        "removed": {"numpy": ["1.24", "1.25", "<"]},
+    }
+    entries = {"env1": {"numpy": ["1.25", "1.26", "<"]}}
+
+    baseline.save_baseline(path, previous, entries, environments=["env1", "env2"])
+
+    assert baseline.load_baseline(path) == {
+        "env1": {"numpy": ["1.25", "1.26", "<"]},
+        "env2": {"numpy": ["1.24", "1.25", "<"]},
+    }
+
+
+def test_validate_baseline(tmp_path, releases):
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages:
+            python: 30
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    env_path = tmp_path / "env.yaml"
+    env_path.write_text("dependencies:\n  - python=3.10\n  - numpy=1.25\n")
+    baseline_path = tmp_path / "baseline.json"
+
+    runner = CliRunner(env={"MINIMUM_VERSIONS_CACHE_DIR": str(tmp_path / "cache")})
+
+    def validate(today):
+        return runner.invoke(
+            main,
+            [
+                "validate",
+                "--policy",
+                str(policy_path),
+                "--snapshot",
+                str(snapshot_path),
+                "--today",
+                today,
+                "--baseline",
+                str(baseline_path),
+                str(env_path),
+            ],
+            terminal_width=200,
+        )
+
+    first = validate("2024-09-01")
+    unchanged = validate("2024-09-02")
+    changed = validate("2024-12-01")
+
+    assert "Version summary" in first.output
+    assert baseline.load_baseline(baseline_path) is not None
+    assert unchanged.exit_code == 0
+    assert unchanged.output.startswith("No changes since the baseline")
+    assert "Version summary" not in changed.output
+    assert "bump possible" in changed.output
+    assert "policy changed" not in changed.output
@@ -0,0 +1,221 @@
+import datetime as dt
+import textwrap
+import tomllib
+
+import pytest
+from click.testing import CliRunner
+from rattler import Version
+
+from minimum_versions import bump
+from minimum_versions.environments import Spec
+from minimum_versions.main import main
+from minimum_versions.release import Release
+from minimum_versions.snapshot import export_snapshot
+
+
+@pytest.fixture
+def policy_versions():
+    yield {
+        "numpy": Release(Version("1.26.0"), 0, dt.datetime(2023, 9, 16)),
+        "pandas": Release(Version("2.1.0"), 0, dt.datetime(2023, 8, 30)),
+        "python": Release(Version("3.11.0"), 0, dt.datetime(2022, 10, 25)),
+    }
+
+
+def test_bump_targets(policy_versions):
+    environments = {
+        "env1": [
+            Spec("numpy", Version("1.24")),
+            Spec("pandas", Version("2.2")),
+            Spec("python", None),
+        ],
+        "env2": [Spec("python", Version("3.11"))],
+    }
+
+    actual = bump.bump_targets(environments, policy_versions)
+    expected = {"env1": {"numpy": Version("1.26")}, "env2": {}}
+
+    assert actual == expected
+
+
+def test_rewrite_conda_environment():
+    text = textwrap.dedent("""\
+        channels:
+          - conda-forge
+        dependencies:
+          # the minimum versions
+          - python=3.10  # keep
+          - numpy>=1.24
+          - "pandas=2.1"
+          - pip
+          - pip:
+              - numpy==1.24
+        """)
+    targets = {"python": Version("3.11"), "numpy": Version("1.26")}
+
+    actual = bump.rewrite_conda_environment(text, targets)
+    expected = textwrap.dedent("""\
+        channels:
+          - conda-forge
+        dependencies:
+          # the minimum versions
+          - python=3.11  # keep
+          - numpy>=1.26
+          - "pandas=2.1"
+          - pip
+          - pip:
+              - numpy==1.24
+        """)
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    ["old", "expected"],
+    (
+        ("1.24", "1.26"),
+        ("1.24.*", "1.26.*"),
+        (">=1.24", ">=1.26"),
+        (">=1.24.0,<1.25.0", "1.26.*"),
+    ),
+)
+def test_format_pixi_pin(old, expected):
+    assert bump.format_pixi_pin(old, Version("1.26")) == expected
+
+
+@pytest.mark.parametrize(
+    ["old", "expected"],
+    (
+        (">=1.24", ">=1.26"),
+        (">=1.24,<2", ">=1.26,<2"),
+        ("<2,>=1.24", "<2,>=1.26"),
+        ("==1.24.*", "==1.26.*"),
+        ("~=1.24", "~=1.26"),
+    ),
+)
+def test_format_pypi_pin(old, expected):
+    assert bump.format_pypi_pin(old, Version("1.26")) == expected
+
+
+def test_rewrite_pixi_manifest():
+    text = textwrap.dedent("""\
+        [tool.pixi.dependencies]
+        numpy = "1.24.*"  # comment
+        pandas = { version = "2.0.*", channel = "conda-forge" }
+
+        [tool.pixi.feature.py310.dependencies]
+        python = "3.10.*"
+
+        [tool.pixi.feature.py310.pypi-dependencies]
+        Requests = ">=2.20,<3"
+
+        [tool.pixi.feature.py311.dependencies]
+        python = "3.11.*"
+        numpy = "1.24.*"
+        """)
+    targets = {
+        ("default", "dependencies", "numpy"): Version("1.26"),
+        ("default", "dependencies", "pandas"): Version("2.1"),
+        ("py310", "dependencies", "python"): Version("3.11"),
+        ("py310", "pypi-dependencies", "Requests"): Version("2.31"),
+    }
+
+    actual = bump.rewrite_pixi_manifest(text, targets, prefix=("tool", "pixi"))
+    expected = textwrap.dedent("""\
+        [tool.pixi.dependencies]
+        numpy = "1.26.*"  # comment
+        pandas = { version = "2.1.*", channel = "conda-forge" }
+
+        [tool.pixi.feature.py310.dependencies]
+        python = "3.11.*"
+
+        [tool.pixi.feature.py310.pypi-dependencies]
+        Requests = ">=2.31,<3"
+
+        [tool.pixi.feature.py311.dependencies]
+        python = "3.11.*"
+        numpy = "1.24.*"
+        """)
+
+    assert actual == expected
+
+
+def test_pixi_targets():
+    pixi_config = tomllib.loads(textwrap.dedent("""\
+        [dependencies]
+        numpy = "1.24.*"
+        python = "3.10.*"
+
+        [pypi-dependencies]
+        typing_extensions = ">=4.5"
+
+        [feature.py311.dependencies]
+        python = "3.11.*"
+
+        [environments]
+        env1 = ["py311"]
+        env2 = { features = ["py311"] }
+        """))
+    environment_targets = {
+        "env1": {"python": Version("3.12")},
+        "env2": {
+            "numpy": Version("1.26"),
+            "python": Version("3.12"),
+            "typing-extensions": Version("4.8"),
+        },
+    }
+
+    actual = bump.pixi_targets(pixi_config, environment_targets)
+    expected = {
+        ("py311", "dependencies", "python"): Version("3.12"),
+        ("default", "dependencies", "numpy"): Version("1.26"),
+        ("default", "pypi-dependencies", "typing_extensions"): Version("4.8"),
+    }
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize("dry_run", (True, False))
+def test_bump_command(tmp_path, dry_run):
+    releases = {
+        "numpy": [
+            Release(Version("1.24.0"), 0, dt.datetime(2022, 12, 18, tzinfo=dt.UTC)),
+            Release(Version("1.25.0"), 0, dt.datetime(2023, 6, 17, tzinfo=dt.UTC)),
+        ],
+    }
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages: {}
+          default: 6
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    env_path = tmp_path / "env.yaml"
+    env_path.write_text("dependencies:\n  - numpy=1.24\n")
+
+    runner = CliRunner()
+    args = [
+        "bump",
+        "--policy",
+        str(policy_path),
+        "--snapshot",
+        str(snapshot_path),
+        "--today",
+        "2024-06-01",
+        str(env_path),
+    ]
+    result = runner.invoke(main, args + (["--dry-run"] if dry_run else []))
+
+    assert result.exit_code == 0, result.output
+    if dry_run:
+        assert "+  - numpy=1.25" in result.output
+        assert env_path.read_text() == "dependencies:\n  - numpy=1.24\n"
+    else:
+        assert env_path.read_text() == "dependencies:\n  - numpy=1.25\n"
@@ -0,0 +1,120 @@
+import os
+import threading
+
+import pytest
+
+from minimum_versions.cache import CacheStats, ReleaseCache, SharedCache, atomic_write
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction():
+    cache = ReleaseCache(maxsize=2, ttl=None)
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert cache.get("b", None) is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats == CacheStats(hits=3, misses=1, evictions=1)
+
+
+def test_ttl_expiration():
+    clock = FakeClock()
+    cache = ReleaseCache(maxsize=2, ttl=10, clock=clock)
+
+    cache.put("a", [])
+    clock.now = 9.5
+    assert cache.get("a") == []
+
+    clock.now = 10
+    assert cache.get("a", None) is None
+    assert len(cache) == 0
+    assert cache.stats == CacheStats(hits=1, misses=1, expirations=1)
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError, match="maxsize must be positive"):
+        ReleaseCache(maxsize=0)
+
+
+def test_shared_cache(tmp_path):
+    clock = FakeClock()
+    cache = SharedCache(tmp_path, ttl=10, clock=clock)
+    other = SharedCache(tmp_path, ttl=10, clock=clock)
+
+    cache.put(("conda-forge", "noarch", "a"), [1, 2])
+    assert other.get(("conda-forge", "noarch", "a")) == [1, 2]
+    assert other.get(("conda-forge", "noarch", "b"), None) is None
+
+    clock.now = 10
+    assert other.get(("conda-forge", "noarch", "a"), None) is None
+    assert other.stats == CacheStats(hits=1, misses=2, expirations=1)
+
+
+def test_shared_cache_size_eviction(tmp_path):
+    cache = SharedCache(tmp_path, ttl=None, max_size=1000)
+
+    for index in range(20):
+        cache.put(index, "x" * 100)
+        # make sure the modification times are ordered
+        path = cache._entry_path(index)
+        os.utime(path, (index, index))
+
+    cache.evict()
+
+    assert cache.get(19) == "x" * 100
+    assert cache.get(0, None) is None
+    assert sum(p.stat().st_size for p in (tmp_path / "entries").iterdir()) <= 1000
+
+
+def test_shared_cache_locks(tmp_path):
+    cache = SharedCache(tmp_path)
+    other = SharedCache(tmp_path)
+
+    files = cache.acquire(["a", "b"])
+    acquired = threading.Event()
+
+    def acquire_other():
+        other.release(other.acquire(["b"]))
+        acquired.set()
+
+    thread = threading.Thread(target=acquire_other)
+    thread.start()
+    assert not acquired.wait(0.2)
+
+    cache.release(files)
+    thread.join(timeout=5)
+    assert acquired.is_set()
+
+
+def test_atomic_write_concurrent(tmp_path):
+    path = tmp_path / "results" / "entry.json"
+    errors = []
+
+    def write(index):
+        try:
+            for _ in range(50):
+                atomic_write(path, f"writer {index}")
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert path.read_text().startswith("writer ")
+    assert [p.name for p in path.parent.iterdir()] == ["entry.json"]
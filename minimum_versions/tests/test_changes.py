@@ -0,0 +1,355 @@
+import asyncio
+import datetime as dt
+import subprocess
+import textwrap
+
+from click.testing import CliRunner
+from rattler import Version
+
+from minimum_versions import changes
+from minimum_versions.environments import Spec
+from minimum_versions.main import main
+from minimum_versions.policy import Policy
+from minimum_versions.snapshot import export_snapshot
+from minimum_versions.validation import (
+    validate_changed_environments,
+    validate_environments,
+)
+
+
+def git(path, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=path,
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_changed_packages():
+    old = ([Spec("numpy", Version("1.24")), Spec("python", Version("3.10"))], [])
+    new = (
+        [
+            Spec("numpy", Version("1.25")),
+            Spec("python", Version("3.10")),
+            Spec("pandas", None),
+        ],
+        [],
+    )
+
+    assert changes.changed_packages(old, new) == {"numpy", "pandas"}
+
+
+def test_parse_environment_at(tmp_path):
+    git(tmp_path, "init", "-q")
+    env_path = tmp_path / "env.yaml"
+    env_path.write_text("dependencies:\n  - numpy=1.24\n")
+    git(tmp_path, "add", "env.yaml")
+    git(tmp_path, "commit", "-q", "-m", "add env")
+
+    env_path.write_text("dependencies:\n  - numpy=1.25\n")
+
+    actual = changes.parse_environment_at("HEAD", str(env_path), None)
+    expected = ([Spec("numpy", Version("1.24"))], [("numpy", [])])
+
+    assert actual == expected
+    assert (
+        changes.parse_environment_at("HEAD", str(tmp_path / "new.yaml"), None) is None
+    )
+
+
+def test_parse_environment_at_malformed(tmp_path):
+    git(tmp_path, "init", "-q")
+    env_path = tmp_path / "env.yaml"
+    env_path.write_text("dependencies:\n  - numpy=1.\n")
+    git(tmp_path, "add", "env.yaml")
+    git(tmp_path, "commit", "-q", "-m", "add env")
+
+    # the environment is validated as if it were new
+    assert changes.parse_environment_at("HEAD", str(env_path), None) is None
+
+
+def test_find_changes_pairs_by_name(tmp_path):
+    git(tmp_path, "init", "-q")
+    for path, version in [("a/env.yaml", "1.24"), ("b/env.yaml", "1.25")]:
+        (tmp_path / path).parent.mkdir()
+        (tmp_path / path).write_text(f"dependencies:\n  - numpy={version}\n")
+    (tmp_path / "other.yaml").write_text("dependencies:\n  - python=3.10\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "add environments")
+
+    # the later of two environments with the same name wins, like when parsing
+    environment_paths = {
+        "env.yaml": str(tmp_path / "b/env.yaml"),
+        "other.yaml": str(tmp_path / "other.yaml"),
+    }
+    parsed_environments = {
+        env: changes.parse_environment_at("HEAD", path, None)
+        for env, path in environment_paths.items()
+    }
+    previous = {
+        "environments": {
+            env: {"status": False, "digest": changes.specs_digest(parsed)}
+            for env, parsed in parsed_environments.items()
+        }
+    }
+
+    actual = changes.find_changes(
+        "HEAD", environment_paths, parsed_environments, None, previous
+    )
+
+    assert actual == {}
+
+
+def test_validate_changed_since_same_names(tmp_path, monkeypatch, releases):
+    monkeypatch.chdir(tmp_path)
+
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages:
+            python: 30
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    for path, pin in [("a/env.yaml", "numpy=1.24"), ("b/env.yaml", "numpy=1.26")]:
+        (tmp_path / path).parent.mkdir()
+        (tmp_path / path).write_text(f"dependencies:\n  - {pin}\n")
+    (tmp_path / "other.yaml").write_text("dependencies:\n  - python=3.10\n")
+
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", "a", "b", "other.yaml")
+    git(tmp_path, "commit", "-q", "-m", "add environments")
+
+    args = [
+        "validate",
+        "--policy",
+        str(policy_path),
+        "--snapshot",
+        str(snapshot_path),
+        "--today",
+        "2024-06-01",
+        "--cache-dir",
+        str(tmp_path / "cache"),
+        "a/env.yaml",
+        "b/env.yaml",
+        "other.yaml",
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 1, result.output
+
+    result = runner.invoke(main, args + ["--changed-since", "HEAD"])
+    assert result.exit_code == 1, result.output
+    assert "env.yaml: unchanged since HEAD, previously failed" in result.output
+    assert "other.yaml: unchanged since HEAD, previously passed" in result.output
+
+
+def test_validate_changed_environments(releases, fake_fetcher):
+    policy = Policy(
+        package_months={"python": 30},
+        default_months=12,
+        channels=["conda-forge"],
+        platforms=["noarch"],
+    )
+    today = dt.date(2024, 6, 1)
+    parsed = {
+        "env1": (
+            [Spec("python", Version("3.10")), Spec("numpy", Version("1.24"))],
+            [],
+        ),
+        "env2": ([Spec("python", Version("3.10"))], []),
+    }
+
+    full = asyncio.run(
+        validate_environments(policy, parsed, today, fetcher=fake_fetcher(releases))
+    )
+    previous = changes.update_results(
+        {"environments": {}, "packages": {}}, full, parsed
+    )
+
+    parsed["env1"] = (
+        [Spec("python", Version("3.10")), Spec("numpy", Version("1.26"))],
+        [],
+    )
+    fetcher = fake_fetcher(releases)
+    actual = asyncio.run(
+        validate_changed_environments(
+            policy, parsed, {"env1": {"numpy"}}, previous, today, fetcher=fetcher
+        )
+    )
+
+    assert fetcher.requested == [["numpy"]]
+    assert list(actual.environments) == ["env1"]
+    assert actual.status == {"env1": True}
+    assert actual.policy_versions["python"] == full.policy_versions["python"]
+
+
+def test_validate_changed_since(tmp_path, monkeypatch, releases):
+    monkeypatch.chdir(tmp_path)
+
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages:
+            python: 30
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    (tmp_path / "env1.yaml").write_text("dependencies:\n  - numpy=1.24\n")
+    (tmp_path / "env2.yaml").write_text("dependencies:\n  - python=3.10\n")
+
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", "env1.yaml", "env2.yaml")
+    git(tmp_path, "commit", "-q", "-m", "add environments")
+
+    args = [
+        "validate",
+        "--policy",
+        str(policy_path),
+        "--snapshot",
+        str(snapshot_path),
+        "--today",
+        "2024-06-01",
+        "--cache-dir",
+        str(tmp_path / "cache"),
+        "env1.yaml",
+        "env2.yaml",
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0, result.output
+
+    (tmp_path / "env1.yaml").write_text("dependencies:\n  - numpy=1.26\n")
+
+    result = runner.invoke(main, args + ["--changed-since", "HEAD"])
+    assert result.exit_code == 1, result.output
+    assert "env2.yaml: unchanged since HEAD, previously passed" in result.output
+    assert "env1.yaml" in result.output
+
+    result = runner.invoke(main, args + ["--changed-since", "does-not-exist"])
+    assert result.exit_code == 2
+
+
+def test_validate_changed_since_stale_status(tmp_path, monkeypatch, releases):
+    monkeypatch.chdir(tmp_path)
+
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages: {}
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    (tmp_path / "env1.yaml").write_text("dependencies:\n  - numpy=1.26\n")
+
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", "env1.yaml")
+    git(tmp_path, "commit", "-q", "-m", "add environment")
+
+    args = [
+        "validate",
+        "--policy",
+        str(policy_path),
+        "--snapshot",
+        str(snapshot_path),
+        "--today",
+        "2024-06-01",
+        "--cache-dir",
+        str(tmp_path / "cache"),
+        "env1.yaml",
+    ]
+
+    # the previous run saw a working copy that differs from the committed file
+    (tmp_path / "env1.yaml").write_text("dependencies:\n  - numpy=1.24\n")
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0, result.output
+
+    git(tmp_path, "checkout", "-q", "env1.yaml")
+
+    result = runner.invoke(main, args + ["--changed-since", "HEAD"])
+    assert result.exit_code == 1, result.output
+    assert "unchanged since HEAD" not in result.output
+
+
+def test_previous_results_date(tmp_path):
+    data = {"environments": {"env1": {"status": False, "digest": "d"}}, "packages": {}}
+    changes.PreviousResults(tmp_path, "key", dt.date(2024, 6, 1)).save(data)
+
+    assert changes.PreviousResults(tmp_path, "key", dt.date(2024, 6, 1)).load() == {
+        **data,
+        "date": "2024-06-01",
+    }
+
+    # the results of an older day are not reused, and are replaced on save
+    later = changes.PreviousResults(tmp_path, "key", dt.date(2024, 6, 2))
+    assert later.load() == {"environments": {}, "packages": {}}
+
+    later.save(data)
+    assert [path.name for path in tmp_path.iterdir()] == ["key.json"]
+
+
+def test_validate_no_cache(tmp_path, monkeypatch, releases):
+    monkeypatch.chdir(tmp_path)
+
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages: {}
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    (tmp_path / "env1.yaml").write_text("dependencies:\n  - numpy=1.24\n")
+
+    args = [
+        "validate",
+        "--policy",
+        str(policy_path),
+        "--snapshot",
+        str(snapshot_path),
+        "--today",
+        "2024-06-01",
+        "--cache-dir",
+        str(tmp_path / "cache"),
+        "--no-cache",
+        "env1.yaml",
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert not (tmp_path / "cache").exists()
+
+    result = runner.invoke(main, args + ["--changed-since", "HEAD"])
+    assert result.exit_code == 2
@@ -0,0 +1,150 @@
+import asyncio
+import datetime as dt
+import textwrap
+
+import pytest
+from click.testing import CliRunner
+from rattler import Version
+
+from minimum_versions import check
+from minimum_versions.environments import Spec
+from minimum_versions.main import main
+from minimum_versions.policy import Policy
+from minimum_versions.release import Release
+from minimum_versions.snapshot import export_snapshot
+
+
+@pytest.fixture
+def policy():
+    yield Policy(
+        package_months={"python": 30},
+        default_months=12,
+        channels=["conda-forge"],
+        platforms=["noarch"],
+    )
+
+
+def test_check_batches(policy):
+    policy.overrides = {"pandas": Version("2.1")}
+    environments = {
+        "env1": [Spec("numpy", Version("1.24")), Spec("python", Version("3.10"))],
+        "env2": [Spec("pandas", Version("2.1")), Spec("scipy", None)],
+    }
+
+    actual = check.check_batches(policy, environments, batch_size=1)
+    expected = [["pandas"], ["python"], ["numpy"], ["scipy"]]
+
+    assert actual == expected
+
+
+def test_check_environments_unpinned(policy, releases, fake_fetcher):
+    fetcher = fake_fetcher(releases)
+    parsed = {"env1": ([Spec("numpy", Version("1.24")), Spec("python", None)], [])}
+
+    actual = asyncio.run(
+        check.check_environments(policy, parsed, dt.date(2024, 6, 1), fetcher=fetcher)
+    )
+
+    assert actual == [check.Violation("env1", Spec("python", None))]
+    assert fetcher.requested == []
+
+
+def test_check_environments_stops_early(policy, releases, fake_fetcher):
+    fetcher = fake_fetcher(releases)
+    parsed = {
+        "env1": ([Spec("numpy", Version("1.24")), Spec("python", Version("3.11"))], [])
+    }
+
+    actual = asyncio.run(
+        check.check_environments(
+            policy, parsed, dt.date(2024, 6, 1), fetcher=fetcher, batch_size=1
+        )
+    )
+
+    assert [(v.environment, v.spec.name) for v in actual] == [("env1", "python")]
+    assert fetcher.requested == [["python"]]
+    assert check.format_violation(actual[0]) == (
+        "env1: python=3.11 is newer than the policy minimum 3.10 (2021-10-05)"
+    )
+
+
+def test_check_environments_patch_override(policy, releases, fake_fetcher):
+    releases = releases | {
+        "numpy": sorted(
+            [
+                *releases["numpy"],
+                Release(Version("1.24.1"), 0, dt.datetime(2023, 1, 1, tzinfo=dt.UTC)),
+            ]
+        )
+    }
+    policy.overrides = {"numpy": Version("1.24.1")}
+    parsed = {
+        "env1": ([Spec("numpy", Version("1.24.1"))], []),
+        "env2": ([Spec("numpy", Version("1.25"))], []),
+    }
+
+    actual = asyncio.run(
+        check.check_environments(
+            policy, parsed, dt.date(2024, 6, 1), fetcher=fake_fetcher(releases)
+        )
+    )
+
+    assert [v.environment for v in actual] == ["env2"]
+    assert check.format_violation(actual[0]) == (
+        "env2: numpy=1.25 is newer than the policy minimum 1.24.1 (2023-01-01)"
+    )
+
+
+def test_check_environments_ignored(policy, releases, fake_fetcher):
+    policy.ignored_violations = ["python"]
+    fetcher = fake_fetcher(releases)
+    parsed = {"env1": ([Spec("numpy", Version("1.24")), Spec("python", None)], [])}
+
+    actual = asyncio.run(
+        check.check_environments(policy, parsed, dt.date(2024, 6, 1), fetcher=fetcher)
+    )
+
+    assert actual == []
+    assert fetcher.requested == [["numpy"]]
+
+
+@pytest.mark.parametrize(
+    ["numpy_version", "expected_exit_code"], (("1.24", 0), ("1.26", 1))
+)
+def test_check_command(tmp_path, releases, numpy_version, expected_exit_code):
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages:
+            python: 30
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    env_path = tmp_path / "env.yaml"
+    env_path.write_text(f"dependencies:\n  - python=3.10\n  - numpy={numpy_version}\n")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "check",
+            "--policy",
+            str(policy_path),
+            "--snapshot",
+            str(snapshot_path),
+            "--today",
+            "2024-06-01",
+            str(env_path),
+        ],
+    )
+
+    assert result.exit_code == expected_exit_code, result.output
+    if expected_exit_code:
+        assert "numpy=1.26 is newer than the policy minimum 1.24" in result.output
@@ -0,0 +1,146 @@
+import asyncio
+import datetime as dt
+
+import pytest
+from rattler import PackageRecord, RepoDataRecord, Version
+
+from minimum_versions import closure
+from minimum_versions.environments import Spec
+from minimum_versions.policy import Policy
+
+
+def make_record(name, version, timestamp, depends=()):
+    record = PackageRecord(
+        name, version, "0", 0, "noarch", depends=list(depends), noarch="generic"
+    )
+    record.timestamp = timestamp
+
+    file_name = f"{name}-{version}-0.conda"
+    return RepoDataRecord(
+        record,
+        file_name,
+        f"https://conda.anaconda.org/conda-forge/noarch/{file_name}",
+        "https://conda.anaconda.org/conda-forge/",
+    )
+
+
+@pytest.fixture
+def records():
+    yield [
+        make_record("a", "1.0.0", dt.datetime(2022, 1, 1), ["b >=2.1"]),
+        make_record("a", "1.1.0", dt.datetime(2023, 1, 1), ["b >=2.2", "__unix"]),
+        make_record("b", "2.0.0", dt.datetime(2021, 6, 1)),
+        make_record("b", "2.1.0", dt.datetime(2023, 1, 1), ["c <1.0"]),
+        make_record("b", "2.2.0", dt.datetime(2024, 5, 1)),
+        make_record("c", "0.9.0", dt.datetime(2020, 1, 1)),
+        make_record("c", "1.0.0", dt.datetime(2022, 1, 1)),
+    ]
+
+
+class FakeGateway:
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    async def query(self, channels, platforms, specs, recursive=True):
+        self.queries.append((list(specs), recursive))
+        return [self.records]
+
+
+def test_dependency_graph(records):
+    graph = closure.DependencyGraph([records])
+
+    assert graph.matching_versions("b >=2.1") == {Version("2.1.0"), Version("2.2.0")}
+    assert graph.dependencies("a", Version("1.1.0")) == {
+        "b": {Version("2.2.0")},
+        "__unix": frozenset(),
+    }
+
+
+@pytest.mark.parametrize(
+    ["specs", "expected"],
+    (
+        pytest.param(
+            [Spec("a", Version("1.1"))],
+            {
+                "b": [
+                    "transitive dependency through a=1.1.0 requires >=2.2.0,"
+                    " which is newer than the policy minimum 2.1"
+                ]
+            },
+            id="newer",
+        ),
+        pytest.param(
+            [Spec("a", Version("1.0"))],
+            {
+                "c": [
+                    "transitive dependency through b=2.1.0 only allows <=0.9.0,"
+                    " which is older than the policy minimum 1.0"
+                ]
+            },
+            id="older",
+        ),
+        pytest.param(
+            [Spec("a", Version("1.0")), Spec("b", Version("2.0"))],
+            {"b": ["pinned version 2.0 is not allowed by the dependencies of a=1.0.0"]},
+            id="pinned",
+        ),
+        pytest.param(
+            [Spec("a", Version("1.0")), Spec("b", Version("2.1"))],
+            {
+                "c": [
+                    "transitive dependency through b=2.1.0 only allows <=0.9.0,"
+                    " which is older than the policy minimum 1.0"
+                ]
+            },
+            id="compatible",
+        ),
+    ),
+)
+def test_check_dependency_closure(records, specs, expected):
+    gateway = FakeGateway(records)
+    policy = Policy({}, 12, channels=["conda-forge"], platforms=["noarch"])
+    environments = {
+        "env1": specs,
+        "env2": [
+            Spec("a", Version("1.0")),
+            Spec("requests", Version("2.31"), source="pypi"),
+        ],
+    }
+
+    actual = asyncio.run(
+        closure.check_dependency_closure(
+            policy, environments, dt.date(2024, 6, 1), gateway
+        )
+    )
+
+    assert len(gateway.queries) == 1
+    [(root_specs, _)] = gateway.queries
+    assert not any(spec.startswith("requests") for spec in root_specs)
+    assert actual["env1"] == expected
+
+
+def test_check_dependency_closure_patch_override(records):
+    records = [*records, make_record("b", "2.1.1", dt.datetime(2023, 6, 1))]
+    gateway = FakeGateway(records)
+    policy = Policy(
+        {},
+        12,
+        channels=["conda-forge"],
+        platforms=["noarch"],
+        overrides={"b": Version("2.1.1")},
+    )
+
+    actual = asyncio.run(
+        closure.check_dependency_closure(
+            policy, {"env1": [Spec("a", Version("1.1"))]}, dt.date(2024, 6, 1), gateway
+        )
+    )
+
+    # the patch release of the override is not truncated to 2.1
+    assert actual["env1"] == {
+        "b": [
+            "transitive dependency through a=1.1.0 requires >=2.2.0,"
+            " which is newer than the policy minimum 2.1.1"
+        ]
+    }
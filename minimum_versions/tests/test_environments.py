@@ -1,15 +1,33 @@
+import datetime as dt
 import io
 import pathlib
+import subprocess
+import sys
 import textwrap
 from dataclasses import dataclass
+from importlib.metadata import EntryPoint
 
 import pytest
 from rattler import Version
 
 from minimum_versions import environments
+from minimum_versions.environments import lock
 from minimum_versions.environments.spec import Spec
 
 
+def test_cli_imports_parsers_lazily():
+    code = (
+        "import sys, minimum_versions.main;"
+        " print(sorted(m for m in sys.modules"
+        " if m.startswith('minimum_versions.environments.')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "['minimum_versions.environments.spec']"
+
+
 @dataclass
 class FakeRecord:
     version: Version | None
@@ -33,6 +51,67 @@ def test_parse_environment(specifier, manifest_path, key, monkeypatch):
     assert actual is expected
 
 
+def test_parse_environment_entry_point(tmp_path, monkeypatch):
+    def fake_entry_points(group, name):
+        assert group == "minimum_versions.environments"
+        if name != "plugin":
+            return ()
+
+        value = "minimum_versions.environments.conda:parse_conda_environment"
+        return (EntryPoint(name=name, value=value, group=group),)
+
+    monkeypatch.setattr(environments, "entry_points", fake_entry_points)
+
+    path = tmp_path / "env.yaml"
+    path.write_text("dependencies:\n  - numpy=1.24\n")
+
+    actual = environments.parse_environment(f"plugin:{path}", None)
+    expected = ([Spec("numpy", Version("1.24"))], [("numpy", [])])
+
+    assert actual == expected
+    with pytest.raises(ValueError, match="Unknown kind 'unknown'"):
+        environments.parse_environment("unknown:a", None)
+
+
+def test_parse_environments_batch(monkeypatch):
+    calls = []
+
+    def parse_batch(paths, manifest_path):
+        calls.append(paths)
+        return [f"batch:{path}" for path in paths]
+
+    kinds = {
+        "conda": lambda path, manifest_path: f"single:{path}",
+        "pixi": environments.Parser(parse=None, parse_batch=parse_batch),
+    }
+    monkeypatch.setattr(environments, "kinds", kinds)
+
+    actual = environments.parse_environments(["pixi:env1", "a.yaml", "pixi:env2"], None)
+    expected = ["batch:env1", "single:a.yaml", "batch:env2"]
+
+    assert actual == expected
+    assert calls == [["env1", "env2"]]
+
+
+def test_expand_specifiers(tmp_path):
+    manifest_path = tmp_path / "pixi.toml"
+    manifest_path.write_text(textwrap.dedent("""\
+        [feature.test.dependencies]
+        a = "1.0.*"
+
+        [environments]
+        env1 = ["test"]
+        env2 = { features = ["test"] }
+        """))
+
+    actual = environments.expand_specifiers(
+        ["pixi:*", "pixi:env2", "b.yaml"], manifest_path
+    )
+    expected = ["pixi:env1", "pixi:env2", "b.yaml"]
+
+    assert actual == expected
+
+
 @pytest.mark.parametrize(
     ["envs", "ignored_violations", "expected", "expected_warnings"],
     (
@@ -317,8 +396,8 @@ class TestPixiEnvironment:
                     env1 = { features = [] }
                     """.rstrip()),
                 "pixi.toml",
-                [Spec("a", Version("1.0"))],
-                [("feature:default", ["Ignored PyPI dependencies."]), ("a", [])],
+                [Spec("a", Version("1.0")), Spec("b", Version("3.2"), source="pypi")],
+                [("a", []), ("b", [])],
                 id="pypi_dependencies-default",
             ),
             pytest.param(
@@ -333,8 +412,8 @@ class TestPixiEnvironment:
                     env1 = { features = ["feat1"] }
                     """.rstrip()),
                 "pixi.toml",
-                [Spec("a", Version("1.0"))],
-                [("feature:feat1", ["Ignored PyPI dependencies."]), ("a", [])],
+                [Spec("a", Version("1.0")), Spec("b", Version("3.2"), source="pypi")],
+                [("a", []), ("b", [])],
                 id="pypi_dependencies-feat1",
             ),
             pytest.param(
@@ -369,6 +448,27 @@ class TestPixiEnvironment:
                 [("c", [])],
                 id="local_package",
             ),
+            pytest.param(
+                textwrap.dedent("""\
+                    [package]
+                    name = "a"
+
+                    [dependencies]
+                    c = "3.1.*"
+                    d = { git = "https://github.com/org/d" }
+
+                    [pypi-dependencies]
+                    myproj = { path = ".", editable = true }
+                    e = { url = "https://example.com/e.tar.gz" }
+
+                    [environments]
+                    env1 = { features = [] }
+                    """.rstrip()),
+                "pixi.toml",
+                [Spec("c", Version("3.1"))],
+                [("c", [])],
+                id="source_dependencies",
+            ),
             pytest.param(
                 textwrap.dedent("""\
                     [feature.feature1.dependencies]
@@ -412,3 +512,297 @@ class TestPixiEnvironment:
         )
         assert actual_specs == expected_specs
         assert actual_warnings == expected_warnings
+
+    def test_parse_pixi_environments_features_once(self, tmp_path, monkeypatch):
+        manifest_path = tmp_path / "pixi.toml"
+        manifest_path.write_text(textwrap.dedent("""\
+            [dependencies]
+            a = "1.0.*"
+
+            [feature.test.dependencies]
+            b = "2.1.*"
+
+            [feature.py311.dependencies]
+            a = "1.1.*"
+            python = "3.11.*"
+
+            [environments]
+            test = { features = ["test"] }
+            test-py311 = { features = ["test", "py311"] }
+            """))
+
+        parsed = []
+        parse_spec = environments.pixi.parse_spec
+
+        def counting_parse_spec(name, version_text):
+            parsed.append(name)
+            return parse_spec(name, version_text)
+
+        monkeypatch.setattr(environments.pixi, "parse_spec", counting_parse_spec)
+
+        actual = environments.pixi.parse_pixi_environments(
+            ["test", "test-py311"], manifest_path
+        )
+        expected = [
+            [Spec("a", Version("1.0")), Spec("b", Version("2.1"))],
+            [
+                Spec("a", Version("1.1")),
+                Spec("b", Version("2.1")),
+                Spec("python", Version("3.11")),
+            ],
+        ]
+
+        assert [specs for specs, _ in actual] == expected
+        assert sorted(parsed) == ["a", "a", "b", "python"]
+
+
+class TestPyPIEnvironment:
+    @pytest.mark.parametrize(
+        ["name", "version_text", "expected_spec", "expected_warnings"],
+        (
+            pytest.param(
+                "a", ">=1.2", Spec("a", Version("1.2"), source="pypi"), [], id="lower"
+            ),
+            pytest.param(
+                "b",
+                ">=3.1,<4",
+                Spec("b", Version("3.1"), source="pypi"),
+                [],
+                id="lower_and_upper",
+            ),
+            pytest.param(
+                "c", "==1.6.*", Spec("c", Version("1.6"), source="pypi"), [], id="star"
+            ),
+            pytest.param(
+                "D_e",
+                "~=2.1",
+                Spec("d-e", Version("2.1"), source="pypi"),
+                [],
+                id="name",
+            ),
+            pytest.param(
+                "f",
+                ">1.9",
+                Spec("f", Version("1.9"), source="pypi"),
+                [
+                    "package must be pinned with an inclusive lower bound: '>1.9'."
+                    " Using the version as the lower bound instead."
+                ],
+                id="exclusive",
+            ),
+            pytest.param(
+                "g",
+                ">=1.9.1",
+                Spec("g", Version("1.9.1"), source="pypi"),
+                ["package should be pinned to a minor version (got 1.9.1)"],
+                id="patch",
+            ),
+            pytest.param("h", "*", Spec("h", None, source="pypi"), [], id="unpinned"),
+            pytest.param(
+                "i", "<2.0rc1", Spec("i", None, source="pypi"), [], id="upper_only"
+            ),
+            pytest.param(
+                "j",
+                {"version": ">=0.5", "extras": ["all"]},
+                Spec("j", Version("0.5"), source="pypi"),
+                [],
+                id="table",
+            ),
+            pytest.param(
+                "k", {"path": "."}, Spec("k", None, source="pypi"), [], id="source"
+            ),
+        ),
+    )
+    def test_parse_spec(self, name, version_text, expected_spec, expected_warnings):
+        actual_spec, (actual_name, actual_warnings) = environments.pypi.parse_spec(
+            name, version_text
+        )
+
+        assert actual_spec == expected_spec
+        assert actual_name == expected_spec.name
+        assert actual_warnings == expected_warnings
+
+    @pytest.mark.parametrize("version_text", (">=1.0a1", "===1.2", "^1.2"))
+    def test_parse_spec_error(self, version_text):
+        with pytest.raises(ValueError, match="Unsupported version spec: .*"):
+            environments.pypi.parse_spec("package", version_text)
+
+    @pytest.mark.parametrize(
+        ["requirement", "expected_spec"],
+        (
+            ("numpy>=1.24", Spec("numpy", Version("1.24"), source="pypi")),
+            (
+                "pandas[excel] >= 2.1, <3 ; python_version >= '3.11'",
+                Spec("pandas", Version("2.1"), source="pypi"),
+            ),
+            ("packaging", Spec("packaging", None, source="pypi")),
+        ),
+    )
+    def test_parse_requirement(self, requirement, expected_spec):
+        actual_spec, _ = environments.pypi.parse_requirement(requirement)
+
+        assert actual_spec == expected_spec
+
+    def test_parse_requirement_direct_reference(self):
+        requirement = "xarray @ https://example.com/xarray.tar.gz"
+
+        assert environments.pypi.parse_requirement(requirement) is None
+
+    def test_parse_pyproject_environment(self, monkeypatch):
+        data = textwrap.dedent("""\
+            [project]
+            name = "a"
+            dependencies = ["numpy>=1.24", "pandas>=2.1.1"]
+            """)
+        monkeypatch.setattr(
+            pathlib.Path, "open", lambda _, mode: io.BytesIO(data.encode())
+        )
+
+        actual_specs, actual_warnings = environments.pypi.parse_pyproject_environment(
+            "pyproject.toml", None
+        )
+
+        assert actual_specs == [
+            Spec("numpy", Version("1.24"), source="pypi"),
+            Spec("pandas", Version("2.1.1"), source="pypi"),
+        ]
+        assert actual_warnings == [
+            ("numpy", []),
+            ("pandas", ["package should be pinned to a minor version (got 2.1.1)"]),
+        ]
+
+
+class TestLockEnvironment:
+    def test_iter_lock_entries(self, tmp_path):
+        path = tmp_path / "pixi.lock"
+        path.write_text(textwrap.dedent("""\
+            version: 6
+            environments:
+              default:
+                packages: {}
+            packages:
+            - conda: https://example.com/a-1.0-0.conda
+              depends: [b >=1]
+            - pypi: https://example.com/c-1.0.whl
+              name: c
+            """))
+
+        actual = list(lock.iter_lock_entries(path))
+        expected = [
+            ("version", "6"),
+            ("environments", {"default": {"packages": {}}}),
+            (
+                "packages",
+                {"conda": "https://example.com/a-1.0-0.conda", "depends": ["b >=1"]},
+            ),
+            ("packages", {"pypi": "https://example.com/c-1.0.whl", "name": "c"}),
+        ]
+
+        assert actual == expected
+
+    @pytest.mark.parametrize(
+        ["value", "expected"],
+        (
+            (None, None),
+            (
+                "1707225421156",
+                dt.datetime(2024, 2, 6, 13, 17, 1, 156000, tzinfo=dt.UTC),
+            ),
+            ("1578324546", dt.datetime(2020, 1, 6, 15, 29, 6, tzinfo=dt.UTC)),
+        ),
+    )
+    def test_parse_lock_timestamp(self, value, expected):
+        assert lock.parse_lock_timestamp(value) == expected
+
+    def test_parse_pixi_lock_environments(self, tmp_path):
+        manifest_path = tmp_path / "pixi.toml"
+        manifest_path.write_text(textwrap.dedent("""\
+            [dependencies]
+            numpy = "1.24.*"
+
+            [pypi-dependencies]
+            Foo_Bar = ">=1.0"
+
+            [feature.py310.dependencies]
+            python = "3.10.*"
+
+            [environments]
+            min = { features = ["py310"] }
+            """))
+        base = "https://conda.anaconda.org/conda-forge"
+        (tmp_path / "pixi.lock").write_text(textwrap.dedent(f"""\
+            version: 6
+            environments:
+              min:
+                channels:
+                - url: https://conda.anaconda.org/conda-forge/
+                packages:
+                  linux-64:
+                  - conda: {base}/linux-64/numpy-1.24.4-py310h0_0.conda
+                  - conda: {base}/linux-64/python-3.10.14-h0_0_cpython.conda
+                  - conda: {base}/linux-64/zlib-1.3.1-h0_0.conda
+                  - pypi: https://example.com/foo_bar-1.2.0-py3-none-any.whl
+                  osx-arm64:
+                  - conda: {base}/osx-arm64/numpy-1.24.3-py310h0_0.conda
+            packages:
+            - conda: {base}/linux-64/numpy-1.24.4-py310h0_0.conda
+              timestamp: 1687803233000
+            - conda: {base}/osx-arm64/numpy-1.24.3-py310h0_0.conda
+              timestamp: 1682590100000
+            - conda: {base}/linux-64/python-3.10.14-h0_0_cpython.conda
+            - conda: {base}/linux-64/zlib-1.3.1-h0_0.conda
+            - pypi: https://example.com/foo_bar-1.2.0-py3-none-any.whl
+              name: foo-bar
+              version: 1.2.0
+            """))
+
+        [(specs, warnings)] = lock.parse_pixi_lock_environments(["min"], manifest_path)
+
+        assert specs == [
+            Spec("numpy", Version("1.24")),
+            Spec("python", Version("3.10")),
+            Spec("foo-bar", Version("1.2"), source="pypi"),
+        ]
+        assert specs[0].timestamp == dt.datetime(2023, 6, 26, 18, 13, 53, tzinfo=dt.UTC)
+        assert warnings == [
+            (
+                "numpy",
+                [
+                    "package is locked to different versions on different platforms."
+                    " Using the newest (1.24.4)."
+                ],
+            ),
+            ("python", []),
+            ("foo-bar", []),
+        ]
+
+    def test_parse_conda_lock_environment(self, tmp_path):
+        (tmp_path / "environment.yml").write_text(
+            "dependencies:\n  - numpy=1.24\n  - pandas=2.1\n"
+        )
+        path = tmp_path / "conda-lock.yml"
+        path.write_text(textwrap.dedent("""\
+            version: 1
+            metadata:
+              platforms: [linux-64]
+              sources: [environment.yml]
+            package:
+            - name: numpy
+              version: 1.24.4
+              manager: conda
+              platform: linux-64
+              url: https://conda.anaconda.org/conda-forge/linux-64/numpy-1.24.4-0.conda
+            - name: libzlib
+              version: 1.3.1
+              manager: conda
+              platform: linux-64
+              url: https://conda.anaconda.org/conda-forge/linux-64/libzlib-1.3.1-0.conda
+            """))
+
+        specs, warnings = lock.parse_conda_lock_environment(str(path), None)
+
+        assert specs == [Spec("numpy", Version("1.24")), Spec("pandas", None)]
+        assert warnings == [
+            ("numpy", []),
+            ("pandas", ["package is missing from the lock file"]),
+        ]
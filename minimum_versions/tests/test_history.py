@@ -0,0 +1,175 @@
+import asyncio
+import datetime as dt
+import os
+import subprocess
+import textwrap
+
+import pytest
+from click.testing import CliRunner
+
+from minimum_versions import history
+from minimum_versions.main import main
+from minimum_versions.policy import Policy
+from minimum_versions.snapshot import SnapshotFetcher, export_snapshot
+
+
+def commit(root, message, date):
+    env = os.environ | {
+        "GIT_AUTHOR_DATE": f"{date}T12:00:00+00:00",
+        "GIT_COMMITTER_DATE": f"{date}T12:00:00+00:00",
+    }
+    for args in (["add", "-A"], ["commit", "-q", "-m", message]):
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+            cwd=root,
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+
+
+@pytest.fixture
+def repository(tmp_path):
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+
+    envs = tmp_path / "envs"
+    envs.mkdir()
+    (envs / "env1.yaml").write_text("dependencies:\n  - numpy=1.24\n")
+    commit(tmp_path, "add env1", "2024-01-01")
+
+    (envs / "env1.yaml").write_text("dependencies:\n  - numpy=1.26\n")
+    (envs / "env2.yaml").write_text("dependencies:\n  - numpy=1.24\n")
+    commit(tmp_path, "bump numpy, add env2", "2024-02-01")
+
+    (tmp_path / "README.md").write_text("unrelated")
+    commit(tmp_path, "unrelated", "2024-03-01")
+
+    (envs / "env2.yaml").write_text("dependencies:\n  - numpy=1.25\n")
+    commit(tmp_path, "bump numpy", "2024-10-01")
+
+    yield tmp_path
+
+
+def test_parse_batch_output():
+    output = b"abc blob 3\nfoo\nmissing-ref missing\ndef blob 0\n\n"
+
+    assert history.parse_batch_output(output) == [b"foo", None, b""]
+
+
+def test_replay_history(repository, releases):
+    snapshot_path = repository / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+    policy = Policy({}, 12, channels=["conda-forge"], platforms=["noarch"])
+
+    environment_paths = {
+        "env1.yaml": str(repository / "envs" / "env1.yaml"),
+        "env2.yaml": str(repository / "envs" / "env2.yaml"),
+    }
+    results = asyncio.run(
+        history.replay_history(
+            policy, environment_paths, fetcher=SnapshotFetcher(snapshot_path)
+        )
+    )
+
+    actual = [(r.date, r.violations) for r in results]
+    expected = [
+        (dt.date(2024, 1, 1), {"env1.yaml": [], "env2.yaml": None}),
+        (dt.date(2024, 2, 1), {"env1.yaml": ["numpy"], "env2.yaml": []}),
+        # the policy caught up with the pin of env1
+        (dt.date(2024, 10, 1), {"env1.yaml": [], "env2.yaml": []}),
+    ]
+
+    assert actual == expected
+
+
+def test_replay_history_broken_revisions(repository, releases):
+    envs = repository / "envs"
+    (envs / "env1.yaml").write_text("dependencies:\n  - numpy=1.\n")
+    commit(repository, "malformed pin", "2024-11-01")
+    (envs / "env1.yaml").write_text("dependencies: [\n")
+    commit(repository, "malformed yaml", "2024-12-01")
+
+    snapshot_path = repository / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+    policy = Policy({}, 12, channels=["conda-forge"], platforms=["noarch"])
+
+    results = asyncio.run(
+        history.replay_history(
+            policy,
+            {"env1.yaml": str(envs / "env1.yaml")},
+            since=dt.date(2024, 10, 15),
+            fetcher=SnapshotFetcher(snapshot_path),
+        )
+    )
+
+    # broken revisions are reported like missing environments
+    actual = [(r.date, r.violations) for r in results]
+    expected = [
+        (dt.date(2024, 11, 1), {"env1.yaml": None}),
+        (dt.date(2024, 12, 1), {"env1.yaml": None}),
+    ]
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "specifiers", (pytest.param([], id="none"), pytest.param(["pixi:env1"], id="pixi"))
+)
+def test_history_command_without_repository(repository, monkeypatch, specifiers):
+    monkeypatch.chdir(repository)
+
+    policy_path = repository / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages: {}
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["history", "--policy", str(policy_path), *specifiers])
+
+    assert result.exit_code == 2
+    assert "Can't find the git repository" in result.output
+
+
+def test_history_command(repository, releases, monkeypatch):
+    monkeypatch.chdir(repository)
+
+    snapshot_path = repository / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+    policy_path = repository / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages: {}
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "history",
+            "--policy",
+            str(policy_path),
+            "--snapshot",
+            str(snapshot_path),
+            "--since",
+            "2024-01-15",
+            "envs/env1.yaml",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "2024-01-01" not in result.output
+    assert "2024-02-01" in result.output
+    assert "numpy" in result.output
@@ -0,0 +1,131 @@
+import datetime as dt
+import textwrap
+
+import pytest
+from click.testing import CliRunner
+from rattler import Version
+
+from minimum_versions import index
+from minimum_versions.main import main
+from minimum_versions.release import Release
+from minimum_versions.snapshot import export_snapshot
+
+
+@pytest.mark.parametrize(
+    ["text", "expected"],
+    (
+        ("numpy", index.PinQuery("numpy")),
+        ("numpy<1.26", index.PinQuery("numpy", "<", "1.26")),
+        ("python <= 3.10", index.PinQuery("python", "<=", "3.10")),
+        pytest.param("numpy~1.26", ValueError, id="invalid"),
+        pytest.param("numpy<1.x.", ValueError, id="invalid-version"),
+    ),
+)
+def test_parse_query(text, expected):
+    if expected is ValueError:
+        with pytest.raises(ValueError):
+            index.parse_query(text)
+        return
+
+    assert index.parse_query(text) == expected
+
+
+def test_pin_index(tmp_path):
+    path = tmp_path / "index.sqlite"
+    now = dt.datetime(2024, 6, 1, tzinfo=dt.UTC)
+
+    with index.PinIndex(path) as pin_index:
+        pin_index.update(
+            "repo1",
+            {
+                "env1": [
+                    ("numpy", "1.25", "", "1.24", "", ">"),
+                    ("python", "3.10", "", "3.10", "", "="),
+                ],
+                "env2": [("numpy", "", "", "1.24", "", "!")],
+            },
+            now=now,
+        )
+        pin_index.update(
+            "repo2", {"env1": [("numpy", "1.26", "", "1.24", "", ">")]}, now=now
+        )
+        # re-validating an environment replaces its pins
+        pin_index.update(
+            "repo1", {"env1": [("numpy", "1.24", "", "1.24", "", "=")]}, now=now
+        )
+
+        def query(text):
+            return [
+                (pin.repository, pin.environment, pin.required)
+                for pin in pin_index.query(index.parse_query(text))
+            ]
+
+        assert query("numpy") == [
+            ("repo1", "env1", "1.24"),
+            ("repo1", "env2", None),
+            ("repo2", "env1", "1.26"),
+        ]
+        assert query("numpy<1.26") == [("repo1", "env1", "1.24")]
+        assert query("python<=3.10") == []
+
+
+def test_validate_index_and_query(tmp_path):
+    releases = {
+        "python": [
+            Release(Version("3.10.0"), 0, dt.datetime(2021, 10, 5, tzinfo=dt.UTC)),
+            Release(Version("3.11.0"), 0, dt.datetime(2022, 10, 25, tzinfo=dt.UTC)),
+        ],
+    }
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages:
+            python: 30
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    env_path = tmp_path / "env.yaml"
+    env_path.write_text("dependencies:\n  - python=3.10\n")
+    index_path = tmp_path / "index.sqlite"
+
+    runner = CliRunner(env={"MINIMUM_VERSIONS_CACHE_DIR": str(tmp_path / "cache")})
+    result = runner.invoke(
+        main,
+        [
+            "validate",
+            "--policy",
+            str(policy_path),
+            "--snapshot",
+            str(snapshot_path),
+            "--today",
+            "2024-06-01",
+            "--index",
+            str(index_path),
+            "--repository",
+            "project",
+            str(env_path),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+
+    result = runner.invoke(
+        main,
+        ["query", "--index", str(index_path), "python<=3.10"],
+        terminal_width=200,
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "project" in result.output
+    assert "env.yaml" in result.output
+
+    result = runner.invoke(main, ["query", "--index", str(index_path), "numpy<1.x."])
+
+    assert result.exit_code == 2
+    assert "Invalid version in query" in result.output
@@ -0,0 +1,227 @@
+import datetime as dt
+import json
+import queue
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+from rattler import Version
+
+from minimum_versions import lsp
+from minimum_versions.environments import Spec
+from minimum_versions.release import Release
+from minimum_versions.snapshot import export_snapshot
+
+
+def test_conda_dependency_lines():
+    text = textwrap.dedent("""\
+        name: test
+        channels:
+          - conda-forge
+        dependencies:
+          - python=3.10
+          - numpy=1.26  # comment
+          - pip:
+            - requests==2.31
+        """)
+
+    actual = list(lsp.conda_dependency_lines(text))
+    expected = [(4, 4, 15, "python=3.10"), (5, 4, 14, "numpy=1.26")]
+
+    assert actual == expected
+
+
+def test_pixi_dependency_lines():
+    text = textwrap.dedent("""\
+        [workspace]
+        name = "test"
+
+        [dependencies]
+        python = "3.10.*"
+
+        [feature.test.pypi-dependencies]
+        pytest = ">=8.0"
+
+        [environments]
+        test = ["test"]
+        """)
+
+    actual = [
+        (lineno, source, line)
+        for lineno, _, _, source, line in lsp.pixi_dependency_lines(text)
+    ]
+    expected = [
+        (4, "conda", 'python = "3.10.*"'),
+        (7, "pypi", 'pytest = ">=8.0"'),
+    ]
+
+    assert actual == expected
+
+
+def test_parse_lines_cached():
+    lsp.parse_conda_line.cache_clear()
+
+    lsp.parse_document("conda", "dependencies:\n  - numpy=1.26\n")
+    lsp.parse_document("conda", "dependencies:\n  - numpy=1.26\n  - python=3.11\n")
+
+    info = lsp.parse_conda_line.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
+@pytest.mark.parametrize(
+    ["kind", "text"],
+    (
+        ("conda", "dependencies:\n  - numpy=1.\n"),
+        ("pixi", '[dependencies]\nnumpy = "1."\n'),
+    ),
+)
+def test_parse_document_partial_pin(kind, text):
+    [(_, _, _, parsed)] = lsp.parse_document(kind, text)
+
+    assert isinstance(parsed, ValueError)
+
+
+def test_violation_message_patch_override():
+    spec = Spec("numpy", Version("1.25"))
+    release = Release(Version("1.24.1"), 0, dt.datetime(2023, 1, 1))
+
+    assert lsp.violation_message(spec, release) == (
+        "numpy=1.25 is newer than the policy minimum 1.24.1 (2023-01-01)"
+    )
+
+
+class Client:
+    def __init__(self, args):
+        self.process = subprocess.Popen(
+            args, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        self.messages = queue.Queue()
+        self.reader = threading.Thread(target=self.read, daemon=True)
+        self.reader.start()
+
+    def read(self):
+        while (message := lsp.read_message(self.process.stdout)) is not None:
+            self.messages.put(message)
+
+    def send(self, message):
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+        self.process.stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        self.process.stdin.flush()
+
+    def receive(self, timeout=10):
+        return self.messages.get(timeout=timeout)
+
+
+@pytest.fixture
+def client(tmp_path, releases):
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages:
+            python: 30
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+
+    client = Client(
+        [
+            sys.executable,
+            "-c",
+            "from minimum_versions.main import main; main()",
+            "lsp",
+            "--policy",
+            str(policy_path),
+            "--snapshot",
+            str(snapshot_path),
+            "--today",
+            "2024-06-01",
+            "--debounce",
+            "0.05",
+        ]
+    )
+    yield client
+
+    client.process.kill()
+    client.process.wait()
+
+
+def test_language_server(client):
+    uri = "file:///project/ci/requirements/min-all-deps.yaml"
+
+    client.send({"id": 1, "method": "initialize", "params": {"capabilities": {}}})
+    response = client.receive()
+    assert response["id"] == 1
+    assert response["result"]["capabilities"]["textDocumentSync"] == 1
+
+    client.send({"method": "initialized", "params": {}})
+    client.send(
+        {
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {
+                    "uri": uri,
+                    "languageId": "yaml",
+                    "version": 1,
+                    "text": "dependencies:\n  - python=3.10\n  - numpy=1.26\n",
+                }
+            },
+        }
+    )
+    notification = client.receive()
+    assert notification["method"] == "textDocument/publishDiagnostics"
+    [diagnostic] = notification["params"]["diagnostics"]
+    assert diagnostic["range"]["start"] == {"line": 2, "character": 4}
+    assert diagnostic["severity"] == lsp.severity_error
+    assert diagnostic["message"] == (
+        "numpy=1.26 is newer than the policy minimum 1.24 (2022-12-18)"
+    )
+
+    # half-typed pins are reported instead of stopping the server
+    client.send(
+        {
+            "method": "textDocument/didChange",
+            "params": {
+                "textDocument": {"uri": uri, "version": 2},
+                "contentChanges": [
+                    {"text": "dependencies:\n  - python=3.10\n  - numpy=1.\n"}
+                ],
+            },
+        }
+    )
+    notification = client.receive()
+    [diagnostic] = notification["params"]["diagnostics"]
+    assert diagnostic["range"]["start"] == {"line": 2, "character": 4}
+    assert diagnostic["severity"] == lsp.severity_warning
+    assert "numpy=1." in diagnostic["message"]
+
+    # quick successive edits are only diagnosed once
+    for version, text in enumerate(["numpy=1.2", "numpy=1.24"], start=3):
+        client.send(
+            {
+                "method": "textDocument/didChange",
+                "params": {
+                    "textDocument": {"uri": uri, "version": version},
+                    "contentChanges": [
+                        {"text": f"dependencies:\n  - python=3.10\n  - {text}\n"}
+                    ],
+                },
+            }
+        )
+    notification = client.receive()
+    assert notification["params"]["diagnostics"] == []
+
+    client.send({"id": 2, "method": "shutdown"})
+    assert client.receive() == {"jsonrpc": "2.0", "id": 2, "result": None}
+    assert client.messages.empty()
+
+    client.send({"method": "exit"})
+    assert client.process.wait(timeout=10) == 0
@@ -0,0 +1,173 @@
+import textwrap
+import threading
+import urllib.request
+
+import pytest
+from click.testing import CliRunner
+from rattler import Version
+
+from minimum_versions import main as main_module
+from minimum_versions import metrics
+from minimum_versions.cache import ReleaseCache
+from minimum_versions.environments import Spec
+from minimum_versions.main import main
+from minimum_versions.policy import Policy
+from minimum_versions.snapshot import export_snapshot
+from minimum_versions.validation import ValidationResult
+
+
+def test_format_openmetrics():
+    gauge = metrics.MetricFamily("lag", "gauge", "The lag.")
+    gauge.add(1.5, environment='a "b"', package="numpy")
+    counter = metrics.MetricFamily("lookups", "counter", "The lookups.")
+    counter.add(3, result="hit")
+
+    actual = metrics.format_openmetrics([gauge, counter])
+    expected = textwrap.dedent("""\
+        # TYPE lag gauge
+        # HELP lag The lag.
+        lag{environment="a \\"b\\"",package="numpy"} 1.5
+        # TYPE lookups counter
+        # HELP lookups The lookups.
+        lookups_total{result="hit"} 3
+        # EOF
+        """)
+
+    assert actual == expected
+
+
+def test_collect_metrics(releases):
+    policy = Policy({"python": 30}, 12)
+    result = ValidationResult(
+        environments={
+            "env1": [Spec("numpy", Version("1.26")), Spec("python", Version("3.10"))],
+            "env2": [Spec("numpy", None)],
+        },
+        releases=releases,
+        policy_versions={
+            "numpy": releases["numpy"][0],
+            "python": releases["python"][0],
+        },
+        status={},
+        warnings={},
+        timings={"fetch": 0.5, "evaluate": 0.25},
+    )
+
+    lag, violations, durations, *_ = metrics.collect_metrics(policy, result)
+
+    assert [(labels["package"], round(value, 1)) for labels, value in lag.samples] == [
+        ("numpy", -8.9),
+        ("python", 0.0),
+    ]
+    assert violations.samples == [
+        ({"environment": "env1"}, 1),
+        ({"environment": "env2"}, 1),
+    ]
+    assert durations.samples == [({"step": "fetch"}, 0.5), ({"step": "evaluate"}, 0.25)]
+
+
+def test_metrics_server():
+    server = metrics.make_metrics_server(("127.0.0.1", 0), lambda: "# EOF\n")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert body == "# EOF\n"
+    assert content_type.startswith("application/openmetrics-text")
+
+
+def test_metrics_command(tmp_path, releases):
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages:
+            python: 30
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    env_path = tmp_path / "env.yaml"
+    env_path.write_text("dependencies:\n  - python=3.10\n  - numpy=1.26\n")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "metrics",
+            "--policy",
+            str(policy_path),
+            "--snapshot",
+            str(snapshot_path),
+            "--today",
+            "2024-06-01",
+            str(env_path),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    lines = result.output.splitlines()
+    assert 'minimum_versions_violations{environment="env.yaml"} 1' in lines
+    assert (
+        'minimum_versions_package_lag_months{environment="env.yaml",package="python"} 0'
+        in lines
+    )
+    assert lines[-1] == "# EOF"
+
+
+@pytest.mark.parametrize("low_memory", (False, True))
+def test_metrics_server_release_cache(tmp_path, monkeypatch, low_memory):
+    created = []
+
+    class RecordingFetcher:
+        def __init__(self, gateway=None, cache=None, low_memory=False):
+            self.cache = cache
+            created.append(self)
+
+    class FakeServer:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            pass
+
+        def serve_forever(self):
+            pass
+
+    monkeypatch.setattr(main_module, "ReleaseFetcher", RecordingFetcher)
+    monkeypatch.setattr(
+        main_module, "make_metrics_server", lambda address, collect: FakeServer()
+    )
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages: {}
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+
+    args = ["metrics", "--policy", str(policy_path), "--port", "0"]
+    if low_memory:
+        args.append("--low-memory")
+    result = CliRunner().invoke(main, args)
+
+    assert result.exit_code == 0, result.output
+    # the fetcher used for the scrapes keeps the releases in memory
+    assert isinstance(created[-1].cache, ReleaseCache)
@@ -0,0 +1,135 @@
+import asyncio
+import datetime as dt
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from rattler import Version
+
+from minimum_versions import pypi
+from minimum_versions.release import Release
+
+simple_pages = {
+    "numpy": {
+        "meta": {"api-version": "1.1"},
+        "name": "numpy",
+        "files": [
+            {
+                "filename": "numpy-1.26.0.tar.gz",
+                "upload-time": "2023-09-16T20:10:12.345678Z",
+            },
+            {
+                "filename": "numpy-1.26.0-cp312-cp312-manylinux_2_17_x86_64.whl",
+                "upload-time": "2023-09-16T19:50:01.000000Z",
+            },
+            {
+                "filename": "numpy-1.26.1-cp312-cp312-win_amd64.whl",
+                "upload-time": "2023-10-14T11:00:00.000000Z",
+                "yanked": "broken",
+            },
+            {
+                "filename": "numpy-1.25.0.tar.gz",
+                "upload-time": "2023-06-17T17:40:20.000000Z",
+            },
+        ],
+    },
+}
+json_pages = {
+    "numpy": {
+        "releases": {
+            "1.25.0": [{"upload_time_iso_8601": "2023-06-17T17:40:20.000000Z"}],
+            "1.26.0": [
+                {"upload_time_iso_8601": "2023-09-16T20:10:12.345678Z"},
+                {"upload_time_iso_8601": "2023-09-16T19:50:01.000000Z"},
+            ],
+            "1.26.1": [
+                {"upload_time_iso_8601": "2023-10-14T11:00:00Z", "yanked": True}
+            ],
+        }
+    }
+}
+
+expected_releases = [
+    Release(Version("1.25.0"), 0, dt.datetime(2023, 6, 17, 17, 40, 20, tzinfo=dt.UTC)),
+    Release(Version("1.26.0"), 0, dt.datetime(2023, 9, 16, 19, 50, 1, tzinfo=dt.UTC)),
+]
+
+
+class IndexHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts[0] == "simple":
+            page = simple_pages.get(parts[1])
+        else:
+            page = json_pages.get(parts[1])
+
+        self.server.requests.append(self.path)
+        if page is None:
+            self.send_error(404)
+            return
+
+        body = json.dumps(page).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", pypi.simple_api_media_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def index_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), IndexHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize(
+    ["filename", "expected"],
+    (
+        ("numpy-1.26.0.tar.gz", "1.26.0"),
+        ("scikit-learn-1.3.0.tar.gz", "1.3.0"),
+        ("numpy-1.26.0-cp312-cp312-manylinux_2_17_x86_64.whl", "1.26.0"),
+        ("numpy-1.26.0.exe", None),
+    ),
+)
+def test_version_from_filename(filename, expected):
+    assert pypi.version_from_filename(filename) == expected
+
+
+@pytest.mark.parametrize(
+    ["api", "prefix"], (("simple", "simple"), ("json", "pypi")), ids=["simple", "json"]
+)
+def test_pypi_fetcher(index_server, api, prefix):
+    host, port = index_server.server_address
+    fetcher = pypi.PyPIFetcher(index_url=f"http://{host}:{port}/{prefix}", api=api)
+
+    actual = asyncio.run(fetcher.fetch(["numpy", "unknown"]))
+
+    assert actual == {"numpy": expected_releases}
+    assert [r.timestamp for r in actual["numpy"]] == [
+        r.timestamp for r in expected_releases
+    ]
+
+
+def test_pypi_fetcher_coalesces_requests(index_server):
+    host, port = index_server.server_address
+    fetcher = pypi.PyPIFetcher(index_url=f"http://{host}:{port}/simple")
+    index_server.requests.clear()
+
+    async def fetch_concurrently():
+        return await asyncio.gather(fetcher.fetch(["numpy"]), fetcher.fetch(["numpy"]))
+
+    first, second = asyncio.run(fetch_concurrently())
+
+    assert first == second
+    assert index_server.requests == ["/simple/numpy/"]
@@ -0,0 +1,142 @@
+import asyncio
+import datetime as dt
+import textwrap
+from dataclasses import dataclass
+
+import pytest
+from click.testing import CliRunner
+from rattler import PackageName, Version
+
+from minimum_versions import main as main_module
+from minimum_versions import recording, release
+
+
+@dataclass
+class FakeRepoDataRecord:
+    name: PackageName
+    version: Version
+    build_number: int
+    timestamp: dt.datetime | None
+    subdir: str
+
+
+class FakeGateway:
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    async def query(self, channels, platforms, specs, recursive=True):
+        self.queries.append(list(specs))
+
+        return [
+            [
+                record
+                for record in self.records
+                if record.name.normalized in specs and record.subdir in platforms
+            ]
+            for _ in channels
+        ]
+
+
+@pytest.fixture
+def records():
+    timestamp = dt.datetime(2024, 3, 1, 12, tzinfo=dt.UTC)
+    yield [
+        FakeRepoDataRecord(
+            PackageName("numpy"), Version("1.26.0"), 0, timestamp, "linux-64"
+        ),
+        FakeRepoDataRecord(
+            PackageName("numpy"),
+            Version("1.26.0"),
+            1,
+            timestamp - dt.timedelta(days=2),
+            "osx-arm64",
+        ),
+        FakeRepoDataRecord(
+            PackageName("numpy"),
+            Version("2.0.0"),
+            0,
+            timestamp + dt.timedelta(days=90),
+            "linux-64",
+        ),
+        FakeRepoDataRecord(PackageName("numpy"), Version("2.0.1"), 0, None, "linux-64"),
+        FakeRepoDataRecord(
+            PackageName("tzdata"), Version("2024a"), 0, timestamp, "noarch"
+        ),
+    ]
+
+
+def test_record_and_replay(tmp_path, records):
+    channels = ["conda-forge"]
+    platforms = ["noarch", "linux-64", "osx-arm64"]
+    packages = ["numpy", "tzdata", "missing"]
+
+    gateway = recording.RecordingGateway(FakeGateway(records))
+    expected = asyncio.run(
+        release.ReleaseFetcher(gateway).fetch(channels, platforms, packages)
+    )
+    path = tmp_path / "recording.json.gz"
+    gateway.save(path)
+
+    replay = recording.ReplayGateway(path)
+    actual = asyncio.run(
+        release.ReleaseFetcher(replay).fetch(channels, platforms, packages)
+    )
+
+    assert actual == expected
+    assert [r.timestamp for r in actual["numpy"]] == [
+        r.timestamp for r in expected["numpy"]
+    ]
+
+
+def test_replay_recursive(tmp_path, records):
+    gateway = recording.RecordingGateway(FakeGateway(records))
+    asyncio.run(gateway.query(["conda-forge"], ["noarch"], ["tzdata"]))
+    path = tmp_path / "recording.json.gz"
+    gateway.save(path)
+
+    replay = recording.ReplayGateway(path)
+    with pytest.raises(ValueError, match="recursively"):
+        asyncio.run(replay.query(["conda-forge"], ["noarch"], ["tzdata"]))
+
+
+def test_record_command(tmp_path, monkeypatch, records):
+    fake_gateway = FakeGateway(records)
+    monkeypatch.setattr(main_module, "default_gateway", lambda: fake_gateway)
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch, linux-64]
+        policy:
+          packages: {}
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    env_path = tmp_path / "env.yaml"
+    env_path.write_text("dependencies:\n  - numpy=1.26\n")
+    output_path = tmp_path / "recording.json.gz"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main_module.main,
+        [
+            "snapshot",
+            "record",
+            "--policy",
+            str(policy_path),
+            "-o",
+            str(output_path),
+            str(env_path),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert fake_gateway.queries == [["numpy"], ["numpy"]]
+    assert {r.version for r in recording.load_recording(output_path)} == {
+        Version("1.26.0"),
+        Version("2.0.0"),
+        Version("2.0.1"),
+    }
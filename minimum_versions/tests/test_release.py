@@ -1,10 +1,14 @@
+import asyncio
 import datetime as dt
+import threading
 from dataclasses import dataclass
 
 import pytest
 from rattler import PackageName, Version
 
 from minimum_versions import release
+from minimum_versions.cache import ReleaseCache, SharedCache
+from minimum_versions.snapshot import decode_package_releases, encode_package_releases
 
 
 @dataclass
@@ -110,3 +114,257 @@ def test_group_packages(records, releases):
 def test_filter_releases(releases, predicate, expected):
     actual = release.filter_releases(predicate, releases)
     assert actual == expected
+
+
+class FakeGateway:
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    async def query(self, channels, platforms, specs, recursive=True):
+        self.queries.append(list(specs))
+        await asyncio.sleep(0)
+
+        return [[record for record in self.records if record.name.normalized in specs]]
+
+
+class SlowGateway(FakeGateway):
+    async def query(self, channels, platforms, specs, recursive=True):
+        await asyncio.sleep(0.1)
+        return await super().query(channels, platforms, specs, recursive=recursive)
+
+
+def test_fetch_releases_async(records):
+    gateway = FakeGateway(records)
+    fetcher = release.ReleaseFetcher(gateway)
+
+    actual = asyncio.run(
+        release.fetch_releases_async(
+            ["conda-forge"], ["noarch"], ["test1", "test2"], fetcher=fetcher
+        )
+    )
+    expected = {
+        "test1": [
+            release.Release(
+                version=Version("1.0.0"),
+                build_number=1,
+                timestamp=dt.datetime(2025, 12, 2, 20, 24, 40),
+            )
+        ],
+        "test2": [
+            release.Release(
+                version=Version("1.0.0"),
+                build_number=0,
+                timestamp=dt.datetime(2025, 12, 2, 20, 20, 40),
+            )
+        ],
+    }
+
+    assert actual == expected
+
+
+def test_release_fetcher_coalesces_queries(records):
+    gateway = FakeGateway(records)
+    fetcher = release.ReleaseFetcher(gateway)
+
+    async def fetch_concurrently():
+        return await asyncio.gather(
+            fetcher.fetch(["conda-forge"], ["noarch"], ["test1"]),
+            fetcher.fetch(["conda-forge"], ["noarch"], ["test1", "test2"]),
+            fetcher.fetch(["conda-forge"], ["noarch"], ["test2"]),
+        )
+
+    first, second, third = asyncio.run(fetch_concurrently())
+
+    assert gateway.queries == [["test1"], ["test2"]]
+    assert list(first) == ["test1"]
+    assert list(second) == ["test1", "test2"]
+    assert list(third) == ["test2"]
+
+
+def test_release_fetcher_cache(records):
+    gateway = FakeGateway(records)
+    cache = ReleaseCache(maxsize=10, ttl=None)
+    fetcher = release.ReleaseFetcher(gateway, cache=cache)
+
+    first = asyncio.run(fetcher.fetch(["conda-forge"], ["noarch"], ["test1"]))
+    second = asyncio.run(fetcher.fetch(["conda-forge"], ["noarch"], ["test1", "test2"]))
+
+    assert gateway.queries == [["test1"], ["test2"]]
+    assert first == {"test1": second["test1"]}
+    assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+
+
+def test_release_fetcher_shared_cache(tmp_path, records):
+    # two fetchers in separate threads stand in for concurrent processes
+    gateway = SlowGateway(records)
+    results = []
+
+    def fetch():
+        cache = SharedCache(
+            tmp_path,
+            encode=encode_package_releases,
+            decode=decode_package_releases,
+        )
+        fetcher = release.ReleaseFetcher(gateway, cache=cache)
+        results.append(
+            asyncio.run(fetcher.fetch(["conda-forge"], ["noarch"], ["test1", "test2"]))
+        )
+
+    threads = [threading.Thread(target=fetch) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert gateway.queries == [["test1", "test2"]]
+    assert results[0] == results[1]
+
+
+def test_release_fetcher_combines_subdirs(timestamps):
+    records = [
+        FakePackageRecord(
+            name=PackageName("test1"),
+            version=Version("1.0.0"),
+            build_number=0,
+            timestamp=timestamps[0],
+        ),
+        FakePackageRecord(
+            name=PackageName("test1"),
+            version=Version("1.0.0"),
+            build_number=1,
+            timestamp=timestamps[2],
+        ),
+        FakePackageRecord(
+            name=PackageName("test1"),
+            version=Version("1.1.0"),
+            build_number=0,
+            timestamp=timestamps[1],
+        ),
+    ]
+    fetcher = release.ReleaseFetcher(FakeGateway(records))
+
+    actual = asyncio.run(
+        fetcher.fetch(["conda-forge"], ["noarch", "linux-64"], ["test1", "missing"])
+    )
+    expected = {
+        "test1": [
+            release.Release(Version("1.0.0"), 1, timestamps[2]),
+            release.Release(Version("1.1.0"), 0, timestamps[1]),
+        ]
+    }
+
+    assert actual == expected
+    assert all(
+        a.timestamp == e.timestamp for a, e in zip(actual["test1"], expected["test1"])
+    )
+
+
+class ClearingGateway(FakeGateway):
+    def __init__(self, records):
+        super().__init__(records)
+        self.cleared = []
+
+    def clear_repodata_cache(self, channel, subdirs):
+        self.cleared.append((channel, list(subdirs)))
+
+
+def test_release_fetcher_low_memory(timestamps):
+    records = [
+        FakePackageRecord(
+            name=PackageName("test1"),
+            version=Version("1.0.0"),
+            build_number=0,
+            timestamp=timestamps[0],
+        ),
+        FakePackageRecord(
+            name=PackageName("test1"),
+            version=Version("1.0.0"),
+            build_number=1,
+            timestamp=timestamps[2],
+        ),
+        FakePackageRecord(
+            name=PackageName("test1"),
+            version=Version("1.1.0"),
+            build_number=0,
+            timestamp=timestamps[1],
+        ),
+    ]
+    channels = ["conda-forge"]
+    platforms = ["noarch", "linux-64"]
+    packages = ["test1", "missing"]
+
+    expected = asyncio.run(
+        release.ReleaseFetcher(FakeGateway(records)).fetch(
+            channels, platforms, packages
+        )
+    )
+
+    gateway = ClearingGateway(records)
+    fetcher = release.ReleaseFetcher(gateway, low_memory=True)
+    actual = asyncio.run(fetcher.fetch(channels, platforms, packages))
+
+    assert actual == expected
+    assert [[r.timestamp for r in v] for v in actual.values()] == [
+        [r.timestamp for r in v] for v in expected.values()
+    ]
+    assert gateway.cleared == [
+        ("conda-forge", ["noarch"]),
+        ("conda-forge", ["linux-64"]),
+    ]
+
+
+class PlatformGateway(FakeGateway):
+    # {platform: records}
+    async def query(self, channels, platforms, specs, recursive=True):
+        self.queries.append(list(specs))
+        await asyncio.sleep(0)
+
+        [platform] = platforms
+        return [
+            [
+                record
+                for record in self.records.get(platform, [])
+                if record.name.normalized in specs
+            ]
+        ]
+
+
+@pytest.mark.parametrize("low_memory", [False, True])
+def test_release_fetcher_per_platform(timestamps, low_memory):
+    records = {
+        "noarch": [
+            FakePackageRecord(PackageName("test1"), Version("1.0.0"), 0, timestamps[0]),
+            FakePackageRecord(PackageName("test1"), Version("1.1.0"), 0, timestamps[1]),
+        ],
+        "linux-64": [
+            FakePackageRecord(PackageName("test1"), Version("1.0.0"), 0, timestamps[2]),
+        ],
+    }
+    channels = ["conda-forge"]
+    platforms = ["noarch", "linux-64"]
+    packages = ["test1", "missing"]
+
+    expected = asyncio.run(
+        release.ReleaseFetcher(PlatformGateway(records)).fetch(
+            channels, platforms, packages
+        )
+    )
+
+    gateway = PlatformGateway(records)
+    fetcher = release.ReleaseFetcher(gateway, low_memory=low_memory)
+    combined, platform_releases = asyncio.run(
+        fetcher.fetch_per_platform(channels, platforms, packages)
+    )
+
+    assert len(gateway.queries) == 2
+    assert combined == expected
+    assert [r.timestamp for r in combined["test1"]] == [timestamps[2], timestamps[1]]
+    assert platform_releases.platforms == ("noarch", "linux-64")
+    assert platform_releases.timestamps == {
+        "test1": [(timestamps[0], timestamps[2]), (timestamps[1], None)]
+    }
+
+    on_linux = platform_releases.releases("test1", combined["test1"], "linux-64")
+    assert on_linux == [release.Release(Version("1.0.0"), 0, timestamps[2])]
+    assert on_linux[0].timestamp == timestamps[2]
@@ -0,0 +1,123 @@
+import datetime as dt
+import pickle
+import textwrap
+
+import pytest
+from click.testing import CliRunner
+from rattler import Version
+
+from minimum_versions import sharding
+from minimum_versions.environments import Spec
+from minimum_versions.main import main
+from minimum_versions.policy import Policy
+from minimum_versions.snapshot import export_snapshot
+from minimum_versions.validation import evaluate, evaluate_parallel
+
+
+@pytest.mark.parametrize(
+    ["text", "expected"],
+    (
+        ("1/2", (1, 2)),
+        ("3/3", (3, 3)),
+        pytest.param("0/2", ValueError, id="zero"),
+        pytest.param("3/2", ValueError, id="out of range"),
+        pytest.param("1", ValueError, id="invalid"),
+    ),
+)
+def test_parse_shard(text, expected):
+    if expected is ValueError:
+        with pytest.raises(ValueError):
+            sharding.parse_shard(text)
+        return
+
+    assert sharding.parse_shard(text) == expected
+
+
+def test_select_shard():
+    items = ["d", "b", "a", "c", "e"]
+
+    shards = [sharding.select_shard(items, index, 2) for index in (1, 2)]
+
+    assert shards == [["a", "c", "e"], ["d", "b"]]
+    assert sharding.select_shard(items[::-1], 1, 2) == ["e", "c", "a"]
+
+
+def test_pickle_version():
+    version = Version("1!2.0a1")
+
+    assert pickle.loads(pickle.dumps(version)) == version
+
+
+def test_evaluate_parallel(releases):
+    policy = Policy(
+        {"python": 30},
+        12,
+        channels=["conda-forge"],
+        platforms=["noarch"],
+        overrides={"numpy": Version("1.25")},
+    )
+    environments = {
+        "env1": [Spec("numpy", Version("1.26")), Spec("python", Version("3.10"))],
+        "env2": [Spec("numpy", Version("1.24"))],
+        "env3": [Spec("python", Version("3.11"))],
+    }
+    spec_warnings = {env: {} for env in environments}
+    today = dt.date(2024, 6, 1)
+
+    expected = evaluate(policy, environments, spec_warnings, releases, today)
+    actual = evaluate_parallel(
+        policy, environments, spec_warnings, releases, today, jobs=2
+    )
+
+    assert list(actual.status) == ["env1", "env2", "env3"]
+    assert actual.status == expected.status
+    assert actual.warnings == expected.warnings
+    assert actual.tables == expected.tables
+    assert actual.policy_versions == expected.policy_versions
+
+
+def test_validate_shard(tmp_path, releases):
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages:
+            python: 30
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    env_paths = []
+    for name, numpy_version in [("env1", "1.24"), ("env2", "1.26")]:
+        env_path = tmp_path / f"{name}.yaml"
+        env_path.write_text(
+            f"dependencies:\n  - python=3.10\n  - numpy={numpy_version}\n"
+        )
+        env_paths.append(str(env_path))
+
+    runner = CliRunner(env={"MINIMUM_VERSIONS_CACHE_DIR": str(tmp_path / "cache")})
+    outcomes = {}
+    for shard in ["1/2", "2/2"]:
+        result = runner.invoke(
+            main,
+            [
+                "validate",
+                "--policy",
+                str(policy_path),
+                "--snapshot",
+                str(snapshot_path),
+                "--today",
+                "2024-06-01",
+                "--shard",
+                shard,
+                *env_paths,
+            ],
+        )
+        outcomes[shard] = (result.exit_code, "env1.yaml" in result.output)
+
+    assert outcomes == {"1/2": (0, True), "2/2": (1, False)}
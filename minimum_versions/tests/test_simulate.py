@@ -0,0 +1,108 @@
+import datetime as dt
+import textwrap
+
+import pytest
+from click.testing import CliRunner
+from rattler import Version
+
+from minimum_versions import simulate
+from minimum_versions.environments import Spec
+from minimum_versions.main import main
+from minimum_versions.policy import Policy
+from minimum_versions.snapshot import export_snapshot
+
+
+def test_minimum_versions_grid(releases):
+    policy = Policy({}, 12)
+    months = [6, 12]
+    dates = [dt.date(2024, 1, 1), dt.date(2024, 6, 1)]
+
+    actual = policy.minimum_versions_grid(months, dates, "numpy", releases["numpy"])
+    expected = {
+        months_: {
+            date: Policy({}, months_).minimum_version(date, "numpy", releases["numpy"])
+            for date in dates
+        }
+        for months_ in months
+    }
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    ["packages", "expected_varied", "expected_violations"],
+    (
+        pytest.param(
+            None,
+            ["numpy"],
+            {6: {"env1": [], "env2": []}, 12: {"env1": [], "env2": ["numpy"]}},
+            id="default",
+        ),
+        pytest.param(
+            ["python"],
+            ["python"],
+            {6: {"env1": [], "env2": []}, 12: {"env1": [], "env2": []}},
+            id="package",
+        ),
+    ),
+)
+def test_simulate(releases, packages, expected_varied, expected_violations):
+    policy = Policy({"python": 30}, 9)
+    environments = {
+        "env1": [Spec("numpy", Version("1.24")), Spec("python", Version("3.10"))],
+        "env2": [Spec("numpy", Version("1.25"))],
+    }
+
+    varied, configurations = simulate.simulate(
+        policy, environments, releases, [6, 12], [dt.date(2024, 6, 1)], packages
+    )
+
+    assert varied == expected_varied
+    assert {c.months: c.violations for c in configurations} == expected_violations
+
+
+def test_simulate_command(tmp_path, releases):
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages:
+            python: 30
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    env_path = tmp_path / "env.yaml"
+    env_path.write_text("dependencies:\n  - python=3.10\n  - numpy=1.25\n")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "simulate",
+            "--policy",
+            str(policy_path),
+            "--snapshot",
+            str(snapshot_path),
+            "--months",
+            "6",
+            "--months",
+            "12",
+            "--date",
+            "2024-06-01",
+            str(env_path),
+        ],
+        terminal_width=200,
+    )
+
+    assert result.exit_code == 0, result.output
+    rows = [line.split() for line in result.output.splitlines() if "2024-06-01" in line]
+    assert [[cell for cell in row if cell != "│"] for row in rows] == [
+        ["6", "2024-06-01", "0/1", "0", "1.26"],
+        ["12", "2024-06-01", "1/1", "1", "1.24"],
+    ]
@@ -0,0 +1,187 @@
+import textwrap
+
+import pytest
+from click.testing import CliRunner
+
+from minimum_versions import main as main_module
+from minimum_versions import snapshot
+from minimum_versions.main import main
+
+
+def test_roundtrip(tmp_path, releases):
+    path = tmp_path / "snapshot.json.gz"
+    snapshot.export_snapshot(path, releases, ["conda-forge"], ["noarch"])
+
+    actual = snapshot.load_snapshot(
+        path, ["conda-forge"], ["noarch"], ["python", "numpy"]
+    )
+
+    assert actual == releases
+    assert all(
+        a.timestamp == e.timestamp
+        for name in releases
+        for a, e in zip(actual[name], releases[name])
+    )
+
+
+def test_export_reproducible(tmp_path, releases):
+    path1 = tmp_path / "snapshot1.json.gz"
+    path2 = tmp_path / "snapshot2.json.gz"
+
+    snapshot.export_snapshot(path1, releases, ["conda-forge"], ["noarch"])
+    snapshot.export_snapshot(path2, releases, ["conda-forge"], ["noarch"])
+
+    assert path1.read_bytes() == path2.read_bytes()
+
+
+@pytest.mark.parametrize(
+    ["channels", "platforms", "packages", "match"],
+    (
+        pytest.param(
+            ["conda-forge"], ["noarch"], ["numpy", "pandas"], "missing", id="missing"
+        ),
+        pytest.param(
+            ["conda-forge"],
+            ["noarch", "linux-64"],
+            ["numpy"],
+            "different channels or platforms",
+            id="platforms",
+        ),
+    ),
+)
+def test_load_snapshot_error(tmp_path, releases, channels, platforms, packages, match):
+    path = tmp_path / "snapshot.json.gz"
+    snapshot.export_snapshot(path, releases, ["conda-forge"], ["noarch"])
+
+    with pytest.raises(ValueError, match=match):
+        snapshot.load_snapshot(path, channels, platforms, packages)
+
+
+@pytest.mark.parametrize(
+    ["numpy_version", "expected_exit_code"], (("1.24", 0), ("1.26", 1))
+)
+def test_validate_with_snapshot(tmp_path, releases, numpy_version, expected_exit_code):
+    snapshot_path = tmp_path / "snapshot.json.gz"
+    snapshot.export_snapshot(snapshot_path, releases, ["conda-forge"], ["noarch"])
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages:
+            python: 30
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    env_path = tmp_path / "env.yaml"
+    env_path.write_text(textwrap.dedent(f"""\
+        dependencies:
+          - python=3.10
+          - numpy={numpy_version}
+        """))
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "validate",
+            "--policy",
+            str(policy_path),
+            "--snapshot",
+            str(snapshot_path),
+            "--today",
+            "2024-06-01",
+            "--cache-dir",
+            str(tmp_path / "cache"),
+            str(env_path),
+        ],
+    )
+
+    assert result.exit_code == expected_exit_code, result.output
+
+
+def test_roundtrip_unknown_pypi_package(tmp_path, releases):
+    path = tmp_path / "snapshot.json.gz"
+    pypi_releases = {"numpy": releases["numpy"], "private-pkg": None}
+    snapshot.export_snapshot(
+        path, {}, ["conda-forge"], ["noarch"], pypi_releases=pypi_releases
+    )
+
+    actual = snapshot.load_pypi_snapshot(path, ["numpy", "private-pkg"])
+    assert actual == {"numpy": releases["numpy"]}
+
+    with pytest.raises(ValueError, match="missing"):
+        snapshot.load_pypi_snapshot(path, ["requests"])
+
+
+def test_export_unknown_pypi_package(tmp_path, monkeypatch, releases):
+    monkeypatch.chdir(tmp_path)
+
+    class PartialIndex:
+        async def fetch(self, packages):
+            return {name: releases[name] for name in packages if name in releases}
+
+    make_fetchers = main_module.make_fetchers
+
+    def fake_make_fetchers(snapshot_path, *args, **kwargs):
+        # only replace the live index, replaying the snapshot stays as it is
+        if snapshot_path is None:
+            return None, PartialIndex()
+
+        return make_fetchers(snapshot_path, *args, **kwargs)
+
+    monkeypatch.setattr(main_module, "make_fetchers", fake_make_fetchers)
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch]
+        policy:
+          packages: {}
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    (tmp_path / "pyproject.toml").write_text(textwrap.dedent("""\
+        [project]
+        name = "project"
+        dependencies = ["numpy>=1.24", "private-pkg>=1.0"]
+        """))
+    snapshot_path = tmp_path / "snapshot.json.gz"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "snapshot",
+            "export",
+            "--policy",
+            str(policy_path),
+            "-o",
+            str(snapshot_path),
+            "pyproject:pyproject.toml",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+
+    result = runner.invoke(
+        main,
+        [
+            "validate",
+            "--policy",
+            str(policy_path),
+            "--snapshot",
+            str(snapshot_path),
+            "--today",
+            "2024-06-01",
+            "--cache-dir",
+            str(tmp_path / "cache"),
+            "pyproject:pyproject.toml",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "Not found on the package index" in result.output
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from rattler import Version
+from rattler.exceptions import SolverError
+
+from minimum_versions import solve
+from minimum_versions.environments import Spec
+from minimum_versions.policy import Policy
+
+
+class FakeSolver:
+    def __init__(self, unsolvable):
+        self.unsolvable = unsolvable
+        self.calls = []
+
+    async def __call__(self, channels, specs, gateway, platforms, virtual_packages):
+        self.calls.append((list(specs), platforms[0]))
+        if self.unsolvable in specs:
+            raise SolverError(f"cannot solve {self.unsolvable}")
+
+        return []
+
+
+@pytest.mark.parametrize(
+    ["platforms", "expected"],
+    (
+        (["noarch", "linux-64", "osx-arm64"], ["linux-64", "osx-arm64"]),
+        (["noarch"], ["linux-64"]),
+    ),
+)
+def test_solve_platforms(platforms, expected):
+    assert solve.solve_platforms(platforms) == expected
+
+
+@pytest.mark.parametrize(
+    ["platform", "expected"],
+    (
+        ("linux-64", {"__unix", "__linux", "__glibc", "__archspec"}),
+        ("osx-arm64", {"__unix", "__osx", "__archspec"}),
+        ("win-64", {"__win", "__archspec"}),
+    ),
+)
+def test_virtual_packages(platform, expected):
+    actual = {p.name.normalized for p in solve.virtual_packages(platform)}
+
+    assert actual == expected
+
+
+def test_solve_environments(tmp_path, monkeypatch):
+    solver = FakeSolver(unsolvable="b=2.0")
+    monkeypatch.setattr(solve, "solve", solver)
+
+    policy = Policy({}, 12, channels=["conda-forge"], platforms=["noarch", "linux-64"])
+    environments = {
+        "env1": [Spec("a", Version("1.0")), Spec("b", Version("2.0"))],
+        "env2": [Spec("b", Version("2.1")), Spec("a", Version("1.0"))],
+        # PyPI dependencies are not passed to the conda solver
+        "env3": [
+            Spec("a", Version("1.0")),
+            Spec("b", Version("2.1")),
+            Spec("requests", Version("2.31"), source="pypi"),
+        ],
+    }
+    cache = solve.SolveCache(tmp_path)
+
+    actual = asyncio.run(solve.solve_environments(policy, environments, None, cache))
+
+    assert actual == {
+        "env1": {
+            "linux-64": solve.SolveResult(solvable=False, message="cannot solve b=2.0")
+        },
+        "env2": {"linux-64": solve.SolveResult(solvable=True)},
+        "env3": {"linux-64": solve.SolveResult(solvable=True)},
+    }
+    # identical spec sets are only solved once
+    assert solver.calls == [
+        (["a=1.0", "b=2.0"], "linux-64"),
+        (["a=1.0", "b=2.1"], "linux-64"),
+    ]
+
+    cached = asyncio.run(solve.solve_environments(policy, environments, None, cache))
+
+    assert cached == actual
+    assert len(solver.calls) == 2
+
+
+def test_solve_cache_expiration(tmp_path):
+    cache = solve.SolveCache(tmp_path, ttl=-1)
+    cache.put("key", solve.SolveResult(solvable=True))
+
+    assert cache.get("key") is None
+    assert solve.SolveCache(tmp_path).get("key") == solve.SolveResult(solvable=True)
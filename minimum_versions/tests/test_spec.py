@@ -1,7 +1,11 @@
+import datetime as dt
+
 import pytest
 from rattler import Version
 
 from minimum_versions.environments import Spec, conda
+from minimum_versions.environments.spec import compare_versions, find_violations
+from minimum_versions.release import Release
 
 
 @pytest.mark.parametrize(
@@ -23,3 +27,31 @@ def test_parse_conda_spec(text, expected_spec, expected_name, expected_warnings)
     assert actual_spec == expected_spec
     assert actual_name == expected_name
     assert actual_warnings == expected_warnings
+
+
+def test_parse_conda_spec_invalid_version():
+    with pytest.raises(ValueError, match="Invalid version in 'numpy=1.'"):
+        conda.parse_spec("numpy=1.")
+
+
+@pytest.mark.parametrize(
+    ["pin", "policy", "expected"],
+    (
+        ("1.24", "1.24.0", False),
+        ("1.25", "1.24.0", True),
+        ("0.3.1", "0.3.1", False),
+        ("0.3", "0.3.1", False),
+        ("0.3.2", "0.3.1", True),
+    ),
+)
+def test_compare_versions(pin, policy, expected):
+    environments = {"env1": [Spec("package3", Version(pin))]}
+    policy_versions = {
+        "package3": Release(Version(policy), 0, dt.datetime(2023, 1, 1)),
+    }
+
+    status, _ = compare_versions(environments, policy_versions, [])
+    violations = find_violations(environments, policy_versions, [])
+
+    assert status == {"env1": expected}
+    assert violations == {"env1": ["package3"] if expected else []}
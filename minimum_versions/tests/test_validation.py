@@ -0,0 +1,262 @@
+import asyncio
+import datetime as dt
+import textwrap
+
+import pytest
+from click.testing import CliRunner
+from rattler import Version
+
+from minimum_versions import main
+from minimum_versions.environments import Spec
+from minimum_versions.policy import Policy
+from minimum_versions.release import PlatformReleases, Release
+from minimum_versions.validation import (
+    ResultCache,
+    merge_warnings,
+    validate_environments,
+)
+
+
+class FakePlatformFetcher:
+    def __init__(self, fetcher, platform_releases):
+        self.fetcher = fetcher
+        self.platform_releases = platform_releases
+
+    async def fetch_per_platform(self, channels, platforms, packages):
+        releases = await self.fetcher.fetch(channels, platforms, packages)
+        return releases, self.platform_releases
+
+
+def test_merge_warnings():
+    spec_warnings = {"env1": {"a": ["w1"]}, "env2": {}}
+    violation_warnings = {"env1": {"a": ["w2"], "b": ["w3"]}, "env2": {"c": ["w4"]}}
+
+    actual = merge_warnings(spec_warnings, violation_warnings)
+    expected = {"env1": {"a": ["w1", "w2"], "b": ["w3"]}, "env2": {"c": ["w4"]}}
+
+    assert actual == expected
+
+
+def test_validate_environments(fake_fetcher):
+    releases = {
+        "a": [
+            Release(Version("1.1.0"), 0, dt.datetime(2023, 1, 5)),
+            Release(Version("1.2.0"), 0, dt.datetime(2023, 8, 1)),
+        ],
+        "b": [
+            Release(Version("2.0.0"), 0, dt.datetime(2022, 3, 1)),
+            Release(Version("2.1.0"), 0, dt.datetime(2024, 2, 1)),
+        ],
+    }
+    fetcher = fake_fetcher(releases)
+    policy = Policy({}, 12, exclude=["c"])
+    parsed_environments = {
+        "env1": ([Spec("a", Version("1.1")), Spec("c", None)], [("c", ["w"])]),
+        "env2": ([Spec("a", Version("1.2")), Spec("b", Version("2.1"))], []),
+    }
+
+    result = asyncio.run(
+        validate_environments(
+            policy, parsed_environments, dt.date(2024, 6, 1), fetcher=fetcher
+        )
+    )
+
+    assert fetcher.requested == [["a", "b"]]
+    assert result.environments == {
+        "env1": [Spec("a", Version("1.1"))],
+        "env2": [Spec("a", Version("1.2")), Spec("b", Version("2.1"))],
+    }
+    assert result.status == {"env1": False, "env2": True}
+    assert {n: r.version for n, r in result.policy_versions.items()} == {
+        "a": Version("1.1.0"),
+        "b": Version("2.0.0"),
+    }
+
+
+def test_validate_environments_result_cache(tmp_path, monkeypatch, fake_fetcher):
+    releases = {
+        "a": [
+            Release(Version("1.1.0"), 0, dt.datetime(2023, 1, 5)),
+            Release(Version("1.2.0"), 0, dt.datetime(2023, 8, 1)),
+        ],
+    }
+    policy = Policy({}, 12)
+    parsed_environments = {
+        "env1": ([Spec("a", Version("1.1"))], [("a", [])]),
+        "env2": ([Spec("a", Version("1.2")), Spec("b", None)], [("b", [])]),
+    }
+    releases["b"] = releases["a"]
+    cache = ResultCache(tmp_path)
+
+    def validate(today):
+        return asyncio.run(
+            validate_environments(
+                policy,
+                parsed_environments,
+                today,
+                fetcher=fake_fetcher(releases),
+                result_cache=cache,
+            )
+        )
+
+    expected = validate(dt.date(2024, 6, 1))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("evaluated the policy again")
+
+    with monkeypatch.context() as m:
+        m.setattr(policy, "minimum_version", fail)
+        actual = validate(dt.date(2024, 6, 1))
+
+    assert actual.status == expected.status == {"env1": False, "env2": True}
+    assert actual.warnings == expected.warnings
+    assert [list(row) for row in expected.tables["env2"]] == actual.tables["env2"]
+    assert actual.policy_versions == expected.policy_versions
+
+    # a different date replaces the entries instead of adding new ones
+    later = validate(dt.date(2025, 6, 1))
+    assert later.policy_versions["a"].version == Version("1.2.0")
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_validate_environments_per_platform(fake_fetcher):
+    releases = {
+        "a": [
+            Release(Version("1.1.0"), 0, dt.datetime(2023, 1, 5)),
+            Release(Version("1.2.0"), 0, dt.datetime(2023, 5, 1)),
+        ],
+    }
+    # 1.2.0 was released on linux-64 after the cutoff date
+    platform_releases = PlatformReleases(
+        ("noarch", "linux-64"),
+        {
+            "a": [
+                (dt.datetime(2023, 1, 5), dt.datetime(2023, 1, 5)),
+                (dt.datetime(2023, 5, 1), dt.datetime(2023, 8, 1)),
+            ]
+        },
+    )
+    fetcher = FakePlatformFetcher(fake_fetcher(releases), platform_releases)
+    policy = Policy({}, 12, platforms=["noarch", "linux-64"])
+    parsed_environments = {
+        "env1": ([Spec("a", Version("1.1"))], []),
+        "env2": ([Spec("a", Version("1.2"))], []),
+    }
+
+    result = asyncio.run(
+        validate_environments(
+            policy,
+            parsed_environments,
+            dt.date(2024, 6, 1),
+            fetcher=fetcher,
+            per_platform=True,
+        )
+    )
+
+    assert result.status == {"env1": False, "env2": False}
+    assert result.policy_versions["a"].version == Version("1.2.0")
+    assert result.platform_versions == {
+        "a": {"linux-64": Release(Version("1.1.0"), 0, dt.datetime(2023, 1, 5))}
+    }
+    assert result.warnings == {
+        "env1": {},
+        "env2": {"a": ["Newer than the policy minimum on linux-64 (1.1)"]},
+    }
+
+
+def test_validate_per_platform_cli(tmp_path, monkeypatch, fake_fetcher):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("COLUMNS", "200")
+
+    releases = {
+        "a": [
+            Release(Version("1.1.0"), 0, dt.datetime(2023, 1, 5)),
+            Release(Version("1.2.0"), 0, dt.datetime(2023, 5, 1)),
+        ],
+    }
+    platform_releases = PlatformReleases(
+        ("noarch", "linux-64"),
+        {
+            "a": [
+                (dt.datetime(2023, 1, 5), dt.datetime(2023, 1, 5)),
+                (dt.datetime(2023, 5, 1), dt.datetime(2023, 8, 1)),
+            ]
+        },
+    )
+    fetcher = FakePlatformFetcher(fake_fetcher(releases), platform_releases)
+    monkeypatch.setattr(main, "make_fetchers", lambda *args, **kwargs: (fetcher, None))
+
+    policy_path = tmp_path / "policy.yaml"
+    policy_path.write_text(textwrap.dedent("""\
+        channels: [conda-forge]
+        platforms: [noarch, linux-64]
+        policy:
+          packages: {}
+          default: 12
+          overrides: {}
+          exclude: []
+          ignored_violations: []
+        """))
+    (tmp_path / "env1.yaml").write_text("dependencies:\n  - a=1.2\n")
+
+    args = [
+        "validate",
+        "--policy",
+        str(policy_path),
+        "--today",
+        "2024-06-01",
+        "--cache-dir",
+        str(tmp_path / "cache"),
+        "--per-platform",
+        "env1.yaml",
+    ]
+    result = CliRunner().invoke(main.main, args)
+
+    assert result.exit_code == 0, result.output
+    assert "Platforms" in result.output
+    assert "linux-64: 1.1" in result.output
+
+
+def test_validate_environments_per_platform_requires_channels(fake_fetcher):
+    with pytest.raises(ValueError, match="querying the channels"):
+        asyncio.run(
+            validate_environments(
+                Policy({}, 12),
+                {},
+                dt.date(2024, 6, 1),
+                fetcher=fake_fetcher({}),
+                per_platform=True,
+            )
+        )
+
+
+def test_validate_environments_unknown_pypi_package(fake_fetcher):
+    releases = {"a": [Release(Version("1.1.0"), 0, dt.datetime(2023, 1, 5))]}
+    parsed_environments = {
+        "env1": (
+            [Spec("a", Version("1.1")), Spec("private", None, source="pypi")],
+            [],
+        ),
+    }
+
+    class EmptyIndex:
+        async def fetch(self, packages):
+            return {}
+
+    result = asyncio.run(
+        validate_environments(
+            Policy({}, 12),
+            parsed_environments,
+            dt.date(2024, 6, 1),
+            fetcher=fake_fetcher(releases),
+            pypi_fetcher=EmptyIndex(),
+        )
+    )
+
+    assert result.status == {"env1": False}
+    assert result.environments == {"env1": [Spec("a", Version("1.1"))]}
+    assert result.warnings == {
+        "env1": {
+            "private": ["Not found on the package index. Skipping this dependency."]
+        }
+    }
@@ -0,0 +1,45 @@
+import pytest
+from rattler import Version
+
+from minimum_versions import versions
+
+
+def test_parse_version():
+    assert versions.parse_version("1.26") is versions.parse_version("1.26")
+
+
+@pytest.mark.parametrize(
+    ["text", "expected"], (("1.26.0", "1.26"), ("1.26.3", "1.26"), ("3", "3.0"))
+)
+def test_minor_version(text, expected):
+    actual = versions.minor_version(Version(text))
+
+    assert actual is versions.parse_version(expected)
+
+
+@pytest.mark.parametrize(
+    ["version", "other", "expected"],
+    (
+        ("1.26", "1.26", False),
+        ("1.26", "1.25", True),
+        ("1.25", "1.26", False),
+        ("1.26.1", "1.26", True),
+    ),
+)
+def test_is_newer(version, other, expected):
+    actual = versions.is_newer(
+        versions.parse_version(version), versions.parse_version(other)
+    )
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    ["text", "expected"],
+    (("1.26.0", "1.26"), ("1.26", "1.26"), ("0.3.1", "0.3.1"), ("3", "3.0")),
+)
+def test_comparison_version(text, expected):
+    actual = versions.comparison_version(versions.parse_version(text))
+
+    assert actual == Version(expected)
+    assert not versions.is_newer(versions.parse_version(expected), actual)
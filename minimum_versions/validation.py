@@ -0,0 +1,499 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import pathlib
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+
+from tlz.dicttoolz import keyfilter, merge, merge_with, valmap
+from tlz.itertoolz import concat, unique
+
+from minimum_versions.cache import atomic_write
+from minimum_versions.changes import cached_releases
+from minimum_versions.closure import check_dependency_closure
+from minimum_versions.environments import compare_versions
+from minimum_versions.formatting import bump_table_rows
+from minimum_versions.policy import find_platform_versions, find_policy_versions
+from minimum_versions.pypi import fetch_pypi_releases
+from minimum_versions.release import ReleaseFetcher, fetch_releases_async
+from minimum_versions.sharding import load_shared_releases, split_shards
+from minimum_versions.snapshot import decode_release, encode_release, export_snapshot
+from minimum_versions.solve import solve_environments
+from minimum_versions.versions import comparison_version, is_newer, minor_version
+
+
+@dataclass
+class ValidationResult:
+    environments: dict
+    releases: dict
+    policy_versions: dict
+    status: dict
+    warnings: dict
+    solves: dict = field(default_factory=dict)
+    tables: dict = field(default_factory=dict)
+    # durations of the individual steps, in seconds
+    timings: dict = field(default_factory=dict)
+    # {name: {platform: release}}, where the minimum of a platform diverges
+    platform_versions: dict = field(default_factory=dict)
+
+
+def release_digest(releases):
+    data = json.dumps([encode_release(release) for release in releases])
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def result_key(policy, specs, warnings, digests):
+    # the date is stored in the entry instead, so each day replaces the entries of the
+    # previous day instead of adding new ones
+    data = json.dumps(
+        [
+            repr(policy),
+            [
+                [spec.name, str(spec.version), spec.source, str(spec.timestamp)]
+                for spec in specs
+            ],
+            warnings,
+            [digests.get(spec.name) for spec in specs],
+        ]
+    )
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root):
+        self.root = root
+
+    def get(self, key, today):
+        path = self.root / f"{key}.json"
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("date") != today.isoformat():
+            return None
+
+        return entry
+
+    def put(self, key, today, entry):
+        data = {"date": today.isoformat(), **entry}
+        atomic_write(self.root / f"{key}.json", json.dumps(data))
+
+
+def merge_warnings(*warnings):
+    def merge_lists(v):
+        return list(concat(v))
+
+    def merge_env(values):
+        return merge_with(merge_lists, *values)
+
+    return merge_with(merge_env, *warnings)
+
+
+def filter_excluded(policy, parsed_environments):
+    spec_warnings = {
+        env: {n: w for n, w in warnings_ if n not in policy.exclude}
+        for env, (_, warnings_) in parsed_environments.items()
+    }
+    environments = {
+        env: [spec for spec in specs if spec.name not in policy.exclude]
+        for env, (specs, _) in parsed_environments.items()
+    }
+
+    return environments, spec_warnings
+
+
+def find_packages(environments, source=None):
+    return list(
+        unique(
+            spec.name
+            for spec in concat(environments.values())
+            if source is None or spec.source == source
+        )
+    )
+
+
+def is_unknown(spec, package_releases):
+    # the PyPI index doesn't know every package, e.g. private ones
+    return spec.source == "pypi" and spec.name not in package_releases
+
+
+def drop_unknown_packages(environments, package_releases):
+    warnings = {
+        env: {
+            spec.name: ["Not found on the package index. Skipping this dependency."]
+            for spec in specs
+            if is_unknown(spec, package_releases)
+        }
+        for env, specs in environments.items()
+    }
+    environments = {
+        env: [spec for spec in specs if not is_unknown(spec, package_releases)]
+        for env, specs in environments.items()
+    }
+
+    return environments, warnings
+
+
+def find_sources(environments):
+    conda_packages = find_packages(environments, source="conda")
+    # packages available from conda take precedence over the ones from PyPI
+    pypi_packages = [
+        name
+        for name in find_packages(environments, source="pypi")
+        if name not in conda_packages
+    ]
+
+    return conda_packages, pypi_packages
+
+
+async def fetch_environment_releases(
+    policy, environments, fetcher=None, pypi_fetcher=None
+):
+    conda_packages, pypi_packages = find_sources(environments)
+
+    return await asyncio.gather(
+        fetch_releases_async(
+            policy.channels, policy.platforms, conda_packages, fetcher=fetcher
+        ),
+        fetch_pypi_releases(pypi_packages, fetcher=pypi_fetcher),
+    )
+
+
+async def fetch_platform_releases(policy, environments, fetcher, pypi_fetcher=None):
+    conda_packages, pypi_packages = find_sources(environments)
+
+    (conda_releases, platform_releases), pypi_releases = await asyncio.gather(
+        fetcher.fetch_per_platform(policy.channels, policy.platforms, conda_packages),
+        fetch_pypi_releases(pypi_packages, fetcher=pypi_fetcher),
+    )
+
+    return conda_releases, pypi_releases, platform_releases
+
+
+def platform_warnings(environments, platform_versions):
+    warnings = {}
+    for env, specs in environments.items():
+        warnings[env] = {}
+        for spec in specs:
+            if spec.version is None:
+                continue
+
+            messages = [
+                f"Newer than the policy minimum on {platform}"
+                f" ({minor_version(release.version)})"
+                for platform, release in platform_versions.get(spec.name, {}).items()
+                if is_newer(spec.version, comparison_version(release.version))
+            ]
+            if messages:
+                warnings[env][spec.name] = messages
+
+    return warnings
+
+
+def environment_tables(environments, policy_versions, package_releases, warnings):
+    release_lookup = {
+        n: {r.version: r for r in releases} for n, releases in package_releases.items()
+    }
+
+    return {
+        env: bump_table_rows(specs, policy_versions, release_lookup, warnings[env])
+        for env, specs in environments.items()
+    }
+
+
+def evaluate(
+    policy, environments, spec_warnings, package_releases, today, result_cache=None
+):
+    keys = {}
+    cached = {}
+    if result_cache is not None:
+        digests = valmap(release_digest, package_releases)
+        keys = {
+            env: result_key(policy, specs, spec_warnings[env], digests)
+            for env, specs in environments.items()
+        }
+        cached = {
+            env: entry
+            for env, key in keys.items()
+            if (entry := result_cache.get(key, today)) is not None
+        }
+
+    pending = keyfilter(lambda env: env not in cached, environments)
+    policy_versions = find_policy_versions(
+        policy,
+        today,
+        keyfilter(set(find_packages(pending)).__contains__, package_releases),
+    )
+
+    status, violation_warnings = compare_versions(
+        pending, policy_versions, policy.ignored_violations
+    )
+    warnings = merge_warnings(
+        keyfilter(pending.__contains__, spec_warnings), violation_warnings
+    )
+    tables = environment_tables(pending, policy_versions, package_releases, warnings)
+
+    for env in pending:
+        if env not in keys:
+            continue
+
+        result_cache.put(
+            keys[env],
+            today,
+            {
+                "status": status[env],
+                "rows": tables[env],
+                "warnings": warnings[env],
+                "policy_versions": {
+                    spec.name: encode_release(policy_versions[spec.name])
+                    for spec in pending[env]
+                },
+            },
+        )
+
+    for env, entry in cached.items():
+        status[env] = entry["status"]
+        warnings[env] = entry["warnings"]
+        tables[env] = entry["rows"]
+        policy_versions.update(valmap(decode_release, entry["policy_versions"]))
+
+    return ValidationResult(
+        environments=environments,
+        releases=package_releases,
+        policy_versions=policy_versions,
+        status={env: status[env] for env in environments},
+        warnings={env: warnings[env] for env in environments},
+        tables={env: tables[env] for env in environments},
+    )
+
+
+def evaluate_shard(
+    policy, environments, spec_warnings, snapshot_path, today, result_cache=None
+):
+    package_releases = load_shared_releases(snapshot_path, find_packages(environments))
+
+    return evaluate(
+        policy,
+        environments,
+        spec_warnings,
+        package_releases,
+        today,
+        result_cache=result_cache,
+    )
+
+
+def merge_results(*results):
+    return ValidationResult(
+        **{
+            f.name: merge(*(getattr(result, f.name) for result in results))
+            for f in fields(ValidationResult)
+        }
+    )
+
+
+def evaluate_parallel(
+    policy,
+    environments,
+    spec_warnings,
+    package_releases,
+    today,
+    result_cache=None,
+    jobs=2,
+):
+    shards = split_shards(environments, jobs)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # the workers read the release data from a snapshot instead of receiving
+        # a copy with every shard
+        snapshot_path = pathlib.Path(tmpdir) / "releases.json.gz"
+        export_snapshot(
+            snapshot_path, package_releases, policy.channels, policy.platforms
+        )
+
+        with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+            futures = [
+                executor.submit(
+                    evaluate_shard,
+                    policy,
+                    shard,
+                    keyfilter(shard.__contains__, spec_warnings),
+                    snapshot_path,
+                    today,
+                    result_cache,
+                )
+                for shard in shards
+            ]
+            merged = merge_results(*(future.result() for future in futures))
+
+    return ValidationResult(
+        environments=environments,
+        releases=package_releases,
+        policy_versions=merged.policy_versions,
+        status={env: merged.status[env] for env in environments},
+        warnings={env: merged.warnings[env] for env in environments},
+        tables={env: merged.tables[env] for env in environments},
+    )
+
+
+async def validate_environments(
+    policy,
+    parsed_environments,
+    today=None,
+    fetcher=None,
+    recursive=False,
+    solve=False,
+    solve_cache=None,
+    pypi_fetcher=None,
+    result_cache=None,
+    jobs=1,
+    per_platform=False,
+):
+    if fetcher is None:
+        fetcher = ReleaseFetcher()
+    if per_platform and not hasattr(fetcher, "fetch_per_platform"):
+        raise ValueError("Per-platform minimum versions require querying the channels.")
+
+    gateway = getattr(fetcher, "gateway", None)
+    if recursive and gateway is None:
+        raise ValueError("Checking the dependency closure requires a gateway.")
+    if solve and gateway is None:
+        raise ValueError("Solving the environments requires a gateway.")
+
+    environments, spec_warnings = filter_excluded(policy, parsed_environments)
+
+    start = time.perf_counter()
+    if per_platform:
+        conda_releases, pypi_releases, platform_releases = (
+            await fetch_platform_releases(
+                policy, environments, fetcher, pypi_fetcher=pypi_fetcher
+            )
+        )
+    else:
+        conda_releases, pypi_releases = await fetch_environment_releases(
+            policy, environments, fetcher=fetcher, pypi_fetcher=pypi_fetcher
+        )
+    package_releases = merge(pypi_releases, conda_releases)
+    fetched = time.perf_counter()
+
+    environments, unknown_warnings = drop_unknown_packages(
+        environments, package_releases
+    )
+    spec_warnings = merge_warnings(spec_warnings, unknown_warnings)
+
+    if today is None:
+        today = datetime.date.today()
+
+    if jobs > 1 and len(environments) > 1:
+        result = evaluate_parallel(
+            policy,
+            environments,
+            spec_warnings,
+            package_releases,
+            today,
+            result_cache=result_cache,
+            jobs=jobs,
+        )
+    else:
+        result = evaluate(
+            policy,
+            environments,
+            spec_warnings,
+            package_releases,
+            today,
+            result_cache=result_cache,
+        )
+    if per_platform:
+        result.platform_versions = find_platform_versions(
+            policy, today, result.policy_versions, conda_releases, platform_releases
+        )
+        result.warnings = merge_warnings(
+            result.warnings, platform_warnings(environments, result.platform_versions)
+        )
+    result.timings = {
+        "fetch": fetched - start,
+        "evaluate": time.perf_counter() - fetched,
+    }
+
+    if recursive:
+        transitive_warnings = await check_dependency_closure(
+            policy, environments, today, gateway
+        )
+        result.warnings = merge_warnings(result.warnings, transitive_warnings)
+
+    if solve:
+        result.solves = await solve_environments(
+            policy, environments, gateway, cache=solve_cache
+        )
+        result.status = {
+            env: status
+            or any(not r.solvable for r in result.solves.get(env, {}).values())
+            for env, status in result.status.items()
+        }
+
+    return result
+
+
+async def validate_changed_environments(
+    policy,
+    parsed_environments,
+    changes,
+    previous,
+    today=None,
+    fetcher=None,
+    pypi_fetcher=None,
+):
+    # changes: {env: names of the changed packages}
+    environments, spec_warnings = filter_excluded(
+        policy, {env: parsed_environments[env] for env in changes}
+    )
+
+    cached_packages = previous["packages"]
+    fetch = {
+        env: [
+            spec
+            for spec in specs
+            if spec.name in changes[env] or spec.name not in cached_packages
+        ]
+        for env, specs in environments.items()
+    }
+    conda_releases, pypi_releases = await fetch_environment_releases(
+        policy, fetch, fetcher=fetcher, pypi_fetcher=pypi_fetcher
+    )
+    package_releases = merge(pypi_releases, conda_releases)
+
+    if today is None:
+        today = datetime.date.today()
+
+    policy_versions = find_policy_versions(policy, today, package_releases)
+    for name in find_packages(environments):
+        if name in policy_versions or name not in cached_packages:
+            continue
+
+        policy_versions[name], package_releases[name] = cached_releases(
+            cached_packages[name]
+        )
+
+    environments, unknown_warnings = drop_unknown_packages(
+        environments, package_releases
+    )
+    spec_warnings = merge_warnings(spec_warnings, unknown_warnings)
+
+    status, violation_warnings = compare_versions(
+        environments, policy_versions, policy.ignored_violations
+    )
+    warnings = merge_warnings(spec_warnings, violation_warnings)
+
+    return ValidationResult(
+        environments=environments,
+        releases=package_releases,
+        policy_versions=policy_versions,
+        status=status,
+        warnings=warnings,
+        tables=environment_tables(
+            environments, policy_versions, package_releases, warnings
+        ),
+    )
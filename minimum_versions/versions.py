@@ -0,0 +1,34 @@
+from functools import lru_cache
+
+from rattler import Version
+
+# bounded, so long-running processes like the metrics exporter don't grow forever
+cache_size = 16384
+
+
+@lru_cache(maxsize=cache_size)
+def parse_version(text: str) -> Version:
+    # identical version texts map to the same object
+    return Version(text)
+
+
+@lru_cache(maxsize=cache_size)
+def minor_version(version: Version) -> Version:
+    # the projection is interned as well, so a pin like "1.26" and the projection of
+    # the release 1.26.0 are the same object
+    return parse_version(str(version.extend_to_length(2).with_segments(0, 2)))
+
+
+def is_newer(version: Version, other: Version) -> bool:
+    # interned versions that are the same object are equal
+    return version is not other and version > other
+
+
+def comparison_version(version: Version) -> Version:
+    # pins are compared with the major.minor projection of x.y.0 policy versions, but
+    # with the full version of patch releases, e.g. from overrides
+    segments = version.segments()
+    if len(segments) > 3 or (len(segments) == 3 and segments[2] != [0]):
+        return version
+
+    return minor_version(version)